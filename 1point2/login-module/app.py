@@ -1,26 +1,113 @@
+import os
+import secrets
+
 from flask import Flask
 from login_controller import LoginController
 from login_service import LoginService
 from user_repository import UserRepository
 from password_hasher import PasswordHasher
+from pooled_password_hasher import PooledPasswordHasher
+from rate_limiter import RateLimiter, MemoryBucketStore, SqliteBucketStore
+from negative_cache import NegativeCache
+from user_cache import UserCache
+from token_service import TokenService
 
 # 数据库配置
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'root',
     'password': 'your_password',
-    'database': 'login_system'
+    'database': 'login_system',
+    # 连接池配置：最大连接数、连接最长使用时间（秒）、空闲多久后检测连接（秒）、等待连接的超时（秒）
+    'pool_size': 10,
+    'pool_max_lifetime': 1800,
+    'pool_ping_interval': 30,
+    'pool_timeout': 5,
+    # 登录日志批量写入配置：每批最多条数、最长等待时间（秒）、最多缓冲条数
+    'audit_batch_size': 200,
+    'audit_flush_interval': 1.0,
+    'audit_queue_size': 10000
+}
+
+# 密码哈希配置：目标哈希耗时（秒，启动时据此选择成本因子）、工作线程数（None为CPU核数）、
+# 最多排队的验证请求数、每个请求等待验证结果的最长时间（秒）
+HASHER_CONFIG = {
+    'target_seconds': 0.25,
+    'workers': None,
+    'queue_size': 64,
+    'timeout': 2.0
+}
+
+# 登录限流配置：每个IP每秒补充的次数和突发上限、每个用户名每秒补充的失败次数和突发上限，
+# store_path 为本地 SQLite 文件路径时多个进程共享限流状态，为 None 时只在本进程内限流；
+# 不存在的用户名缓存的有效期（秒）和最多条数
+RATE_LIMIT_CONFIG = {
+    'ip_rate': 1.0,
+    'ip_burst': 20,
+    'username_rate': 0.1,
+    'username_burst': 5,
+    'store_path': None,
+    'unknown_username_ttl': 300,
+    'unknown_username_max': 100000
+}
+
+# 用户缓存配置：缓存的有效期（秒，多进程部署时其他进程的修改最多这么久生效）、最多缓存的用户数
+USER_CACHE_CONFIG = {
+    'ttl': 60,
+    'max_size': 10000
 }
 
-def create_app():
-    """创建并配置Flask应用"""
+# 令牌配置：HMAC 密钥、访问令牌和刷新令牌的有效期（秒）
+# 多进程部署时必须通过环境变量 LOGIN_TOKEN_SECRET 为所有进程设置相同的密钥，
+# 未设置时每次启动随机生成，重启后已签发的令牌全部失效
+TOKEN_CONFIG = {
+    'secret': os.environ.get('LOGIN_TOKEN_SECRET') or secrets.token_hex(32),
+    'access_ttl': 900,
+    'refresh_ttl': 14 * 24 * 3600
+}
+
+# 登录记录是否在后台写入（登录响应不等待数据库写入）
+DEFERRED_LOGIN_AUDIT = True
+
+def create_app(db_config=None):
+    """
+    创建并配置Flask应用
+    db_config: 数据库配置，默认使用 DB_CONFIG；测试时可传入 {'pool': ConnectionPool(...)}
+    """
     app = Flask(__name__)
     
     # 初始化组件
-    password_hasher = PasswordHasher()
-    user_repository = UserRepository(DB_CONFIG)
-    login_service = LoginService(user_repository, password_hasher)
-    login_controller = LoginController(login_service)
+    rounds = PasswordHasher.calibrate(HASHER_CONFIG['target_seconds'])
+    password_hasher = PooledPasswordHasher(
+        PasswordHasher(rounds),
+        workers=HASHER_CONFIG['workers'],
+        queue_size=HASHER_CONFIG['queue_size'],
+        timeout=HASHER_CONFIG['timeout']
+    )
+    unknown_usernames = NegativeCache(
+        RATE_LIMIT_CONFIG['unknown_username_ttl'], RATE_LIMIT_CONFIG['unknown_username_max']
+    )
+    user_cache = UserCache(USER_CACHE_CONFIG['ttl'], USER_CACHE_CONFIG['max_size'])
+    user_repository = UserRepository(db_config or DB_CONFIG, unknown_usernames, user_cache)
+    if RATE_LIMIT_CONFIG['store_path']:
+        bucket_store = SqliteBucketStore(RATE_LIMIT_CONFIG['store_path'])
+    else:
+        bucket_store = MemoryBucketStore()
+    token_service = TokenService(
+        TOKEN_CONFIG['secret'], TOKEN_CONFIG['access_ttl'], TOKEN_CONFIG['refresh_ttl']
+    )
+    login_service = LoginService(
+        user_repository,
+        password_hasher,
+        DEFERRED_LOGIN_AUDIT,
+        ip_limiter=RateLimiter(RATE_LIMIT_CONFIG['ip_rate'], RATE_LIMIT_CONFIG['ip_burst'], bucket_store),
+        username_limiter=RateLimiter(
+            RATE_LIMIT_CONFIG['username_rate'], RATE_LIMIT_CONFIG['username_burst'], bucket_store
+        ),
+        # 修改密码后吊销此前签发的全部令牌
+        on_password_changed=token_service.revoke_user
+    )
+    login_controller = LoginController(login_service, token_service)
     
     # 注册路由
     app.add_url_rule(
@@ -28,6 +115,26 @@ def create_app():
         view_func=login_controller.handle_login_request, 
         methods=['POST']
     )
+    app.add_url_rule(
+        '/api/token/refresh',
+        view_func=login_controller.handle_refresh_request,
+        methods=['POST']
+    )
+    app.add_url_rule(
+        '/api/logout',
+        view_func=login_controller.handle_logout_request,
+        methods=['POST']
+    )
+    app.add_url_rule(
+        '/api/password',
+        view_func=login_controller.handle_change_password_request,
+        methods=['POST']
+    )
+    app.add_url_rule(
+        '/api/me',
+        view_func=login_controller.handle_current_user_request,
+        methods=['GET']
+    )
     
     return app
 
@@ -0,0 +1,102 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+# 通知后台线程退出的标记
+_STOP = object()
+
+# Flask 应用日志（名为 'app'）的子日志，沿用应用配置的处理器
+logger = logging.getLogger('app.audit')
+
+
+class AuditLogWriter:
+    """登录日志批量写入类，仅负责在后台线程中缓冲记录并批量写入"""
+
+    def __init__(self, write_batch, batch_size=200, flush_interval=1.0, queue_size=10000, put_timeout=1.0):
+        """
+        write_batch: 写入一批记录的函数，接收记录列表，成功返回True
+        batch_size: 攒够多少条记录立即写入
+        flush_interval: 第一条记录入队后最多等待多久写入（秒）
+        queue_size: 最多缓冲的记录数
+        put_timeout: 队列满时调用方等待的最长时间（秒），超时后由调用方同步写入
+        """
+        self._write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(queue_size)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='login-audit-writer', daemon=True)
+        self._thread.start()
+        # 进程退出前写完缓冲中的记录
+        atexit.register(self.close)
+
+    def write(self, record):
+        """缓冲一条记录，不等待数据库写入"""
+        if self._closed:
+            return self._write_batch([record])
+        try:
+            self._queue.put(record, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            # 数据库跟不上写入速度，由调用方同步写入，拖慢请求形成反压
+            return self._write_batch([record])
+
+    def flush(self):
+        """等待已缓冲的记录全部写入"""
+        self._queue.join()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        stopping = False
+        while not stopping:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+            else:
+                if record is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                else:
+                    batch.append(record)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch):
+        try:
+            self._write_batch(batch)
+        except Exception:
+            logger.exception("批量写入 %d 条登录日志失败", len(batch))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def close(self):
+        """停止后台线程，写完缓冲中的全部记录"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        # 关闭过程中仍可能有记录入队
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if remaining:
+            self._flush(remaining)
+        atexit.unregister(self.close)
@@ -0,0 +1,237 @@
+"""
+登录性能测试：用 SQLite 数据库代替 MySQL 启动 create_app()，并发请求 POST /api/login，
+统计吞吐量、延迟分位数，以及时间花在 bcrypt、数据库和 Flask 上的比例
+用法: python benchmark_login.py [--users 100] [--requests 2000] [--concurrency 16]
+                                [--mix 70,20,10] [--rounds 10] [--workers 4]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import bcrypt
+
+import app as login_app
+from connection_pool import ConnectionPool
+
+# SQLite 版本的 login_db.sql
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP NULL
+);
+CREATE TABLE login_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NULL REFERENCES users(id),
+    login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    success BOOLEAN NOT NULL,
+    error_message VARCHAR(255)
+);
+CREATE INDEX idx_login_logs_user_time ON login_logs (user_id, login_time);
+CREATE INDEX idx_login_logs_ip_time ON login_logs (ip_address, login_time);
+CREATE INDEX idx_login_logs_time ON login_logs (login_time);
+"""
+
+KINDS = ('valid', 'wrong_password', 'unknown_user')
+
+
+class Profiler:
+    """统计被包装方法的耗时：按请求线程累计，也按类别汇总全部线程"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.totals = defaultdict(float)
+
+    def wrap(self, obj, name, category):
+        original = getattr(obj, name)
+
+        def wrapper(*args, **kwargs):
+            # 嵌套调用（如 record_login 调用 write_login_records）只统计最外层
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+                if depth == 0:
+                    elapsed = time.perf_counter() - start
+                    with self._lock:
+                        self.totals[category] += elapsed
+                    times = getattr(self._local, 'times', None)
+                    if times is not None:
+                        times[category] += elapsed
+
+        setattr(obj, name, wrapper)
+
+    def start_request(self):
+        self._local.times = defaultdict(float)
+
+    def end_request(self):
+        times, self._local.times = self._local.times, None
+        return times
+
+
+def create_database(path, users, rounds):
+    """建表并写入 users 个用户，密码为 password{i}，使用真实的 bcrypt 哈希"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
+        ((f"user{i}", bcrypt.hashpw(f"password{i}".encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8'),
+          f"user{i}@example.com") for i in range(users))
+    )
+    conn.commit()
+    conn.close()
+
+
+def make_requests(count, users, mix, seed=42):
+    """按比例生成 (类型, 用户名, 密码, IP) 请求列表"""
+    rng = random.Random(seed)
+    requests = []
+    for kind in rng.choices(KINDS, weights=mix, k=count):
+        i = rng.randrange(users)
+        if kind == 'valid':
+            username, password = f"user{i}", f"password{i}"
+        elif kind == 'wrong_password':
+            username, password = f"user{i}", 'wrong'
+        else:
+            username, password = f"nobody{rng.randrange(users * 10)}", 'wrong'
+        # 模拟大量不同的客户端IP
+        ip_address = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+        requests.append((kind, username, password, ip_address))
+    return requests
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录性能测试')
+    parser.add_argument('--users', type=int, default=100, help='预先创建的用户数')
+    parser.add_argument('--requests', type=int, default=2000, help='请求总数')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发客户端线程数')
+    parser.add_argument('--mix', default='70,20,10', help='正确密码,错误密码,不存在的用户 的请求比例')
+    parser.add_argument('--rounds', type=int, default=10, help='用户密码哈希的 bcrypt 成本因子')
+    parser.add_argument('--workers', type=int, default=None, help='密码验证工作线程数，默认为CPU核数')
+    parser.add_argument('--sync-audit', action='store_true', help='登录记录同步写入（默认后台批量写入）')
+    parser.add_argument('--no-rate-limit', action='store_true', help='关闭登录限流')
+    args = parser.parse_args()
+    mix = [float(x) for x in args.mix.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'login_benchmark.db')
+        start = time.perf_counter()
+        create_database(path, args.users, args.rounds)
+        print(f"创建 {args.users} 个用户（成本因子 {args.rounds}）: {time.perf_counter() - start:.1f} 秒")
+
+        login_app.HASHER_CONFIG['workers'] = args.workers
+        login_app.DEFERRED_LOGIN_AUDIT = not args.sync_audit
+        pool = ConnectionPool(
+            lambda: sqlite3.connect(path, timeout=10, check_same_thread=False), paramstyle='qmark'
+        )
+        flask_app = login_app.create_app({'pool': pool})
+        login_service = flask_app.view_functions['handle_login_request'].__self__.login_service
+        user_repository = login_service.user_repository
+        pooled_hasher = login_service.password_hasher
+        # 与测试数据一致，避免登录成功时重新哈希
+        pooled_hasher.hasher.rounds = args.rounds
+        if args.no_rate_limit:
+            login_service.ip_limiter = login_service.username_limiter = None
+
+        profiler = Profiler()
+        # 请求线程中的耗时：bcrypt 包括在工作线程池排队的时间，数据库包括等待连接的时间
+        profiler.wrap(pooled_hasher, 'verify_password', 'bcrypt')
+        profiler.wrap(pooled_hasher, 'hash_password', 'bcrypt')
+        for name in ('find_by_username', 'record_login', 'update_password_hash'):
+            profiler.wrap(user_repository, name, 'database')
+        # 工作线程和后台写入线程中的耗时
+        profiler.wrap(pooled_hasher.hasher, 'verify_password', 'bcrypt_compute')
+        profiler.wrap(user_repository, 'write_login_records', 'audit_write')
+
+        requests = make_requests(args.requests, args.users, mix)
+        results = []
+        results_lock = threading.Lock()
+        next_index = iter(range(len(requests)))
+        index_lock = threading.Lock()
+
+        def client():
+            test_client = flask_app.test_client()
+            local_results = []
+            while True:
+                with index_lock:
+                    i = next(next_index, None)
+                if i is None:
+                    break
+                kind, username, password, ip_address = requests[i]
+                profiler.start_request()
+                request_start = time.perf_counter()
+                response = test_client.post(
+                    '/api/login',
+                    json={'username': username, 'password': password},
+                    environ_base={'REMOTE_ADDR': ip_address}
+                )
+                latency = time.perf_counter() - request_start
+                local_results.append((kind, response.status_code, latency, profiler.end_request()))
+            with results_lock:
+                results.extend(local_results)
+
+        threads = [threading.Thread(target=client) for _ in range(args.concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        # 等待后台登录记录全部写入
+        flush_start = time.perf_counter()
+        user_repository.close()
+        flush_time = time.perf_counter() - flush_start
+        pooled_hasher.close()
+
+    print(f"\nCPU核数: {os.cpu_count()}，密码验证工作线程: {pooled_hasher.workers}，并发客户端: {args.concurrency}，"
+          f"登录记录: {'同步写入' if args.sync_audit else '后台批量写入'}")
+    print(f"请求数: {len(results)}，耗时: {elapsed:.2f} 秒，吞吐量: {len(results) / elapsed:.1f} 请求/秒")
+
+    print(f"\n{'请求类型':<16}{'数量':>8}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}  状态码")
+    for kind in KINDS + ('all',):
+        rows = [r for r in results if kind == 'all' or r[0] == kind]
+        if not rows:
+            continue
+        latencies = sorted(r[2] * 1000 for r in rows)
+        statuses = ', '.join(f"{code}x{n}" for code, n in sorted(Counter(r[1] for r in rows).items()))
+        print(f"{kind:<16}{len(rows):>8}{percentile(latencies, 50):>10.2f}{percentile(latencies, 90):>10.2f}"
+              f"{percentile(latencies, 99):>10.2f}{latencies[-1]:>10.2f}  {statuses}")
+
+    # 请求线程中的时间构成：总延迟 - bcrypt - 数据库 = Flask 与其余业务逻辑
+    total = sum(r[2] for r in results)
+    bcrypt_time = sum(r[3]['bcrypt'] for r in results)
+    database_time = sum(r[3]['database'] for r in results)
+    other_time = total - bcrypt_time - database_time
+    print("\n请求线程中的时间构成:")
+    for name, value in (('bcrypt（含排队）', bcrypt_time), ('数据库（含等待连接）', database_time),
+                        ('Flask 及其他', other_time)):
+        print(f"  {name:<20}{value:>10.2f} 秒  {value / total * 100:>5.1f}%")
+    print("后台线程中的时间:")
+    print(f"  {'bcrypt 计算':<20}{profiler.totals['bcrypt_compute']:>10.2f} 秒")
+    print(f"  {'登录记录批量写入':<20}{profiler.totals['audit_write']:>10.2f} 秒"
+          f"（测试结束后等待写完 {flush_time:.2f} 秒）")
+
+
+if __name__ == '__main__':
+    main()
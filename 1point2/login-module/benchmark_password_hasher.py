@@ -0,0 +1,68 @@
+"""
+密码验证性能测试：比较不同工作线程数下每秒能完成的登录密码验证次数
+用法: python benchmark_password_hasher.py [--rounds 12] [--clients 32] [--seconds 5] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import threading
+import time
+
+from password_hasher import PasswordHasher
+from pooled_password_hasher import HasherBusy, PooledPasswordHasher
+
+
+def run(verify, clients, seconds, hashed_password):
+    """clients 个线程模拟并发登录，持续 seconds 秒，返回 (完成次数, 被拒绝次数)"""
+    counts = {'done': 0, 'busy': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            try:
+                verify('correct horse', hashed_password)
+                key = 'done'
+            except HasherBusy:
+                key = 'busy'
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts['done'], counts['busy']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='密码验证性能测试')
+    parser.add_argument('--rounds', type=int, default=None, help='bcrypt 成本因子，默认按 0.25 秒自动选择')
+    parser.add_argument('--clients', type=int, default=32, help='并发登录的客户端线程数')
+    parser.add_argument('--seconds', type=float, default=5, help='每项测试的持续时间（秒）')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='要测试的工作线程数')
+    parser.add_argument('--processes', action='store_true', help='使用进程池')
+    args = parser.parse_args()
+
+    rounds = args.rounds or PasswordHasher.calibrate()
+    hasher = PasswordHasher(rounds)
+    hashed_password = hasher.hash_password('correct horse')
+    print(f"CPU核数: {os.cpu_count()}，成本因子: {rounds}，并发客户端: {args.clients}")
+    print(f"{'方式':<20}{'登录/秒':>10}{'拒绝/秒':>10}")
+
+    # 对比：在请求线程中直接验证（改造前的做法）
+    done, busy = run(hasher.verify_password, args.clients, args.seconds, hashed_password)
+    print(f"{'请求线程内验证':<20}{done / args.seconds:>10.1f}{busy / args.seconds:>10.1f}")
+
+    for workers in args.workers:
+        pooled = PooledPasswordHasher(hasher, workers=workers, use_processes=args.processes,
+                                      timeout=max(2.0, args.seconds))
+        try:
+            done, busy = run(pooled.verify_password, args.clients, args.seconds, hashed_password)
+        finally:
+            pooled.close()
+        print(f"{f'工作线程 x{workers}':<20}{done / args.seconds:>10.1f}{busy / args.seconds:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
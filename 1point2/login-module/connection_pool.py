@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """等待可用连接超时"""
+
+
+class PoolClosed(Exception):
+    """连接池已关闭"""
+
+
+class ConnectionPool:
+    """数据库连接池类，仅负责连接的复用、检测和回收"""
+
+    def __init__(self, connect, max_size=10, max_lifetime=1800, ping_interval=30,
+                 timeout=5, paramstyle='format'):
+        """
+        connect: 无参函数，返回一个新的 DB-API 连接（mysql.connector、sqlite3 等均可）
+        max_size: 最多同时存在的连接数
+        max_lifetime: 连接的最长使用时间（秒），超过后关闭重建，避免被服务器端超时断开
+        ping_interval: 连接空闲超过该时间（秒）后，取出前先检测是否可用
+        timeout: 连接都被占用时等待的最长时间（秒）
+        paramstyle: 驱动的参数占位符风格，'format' 为 %s（MySQL），'qmark' 为 ?（SQLite）
+        """
+        self._connect = connect
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.timeout = timeout
+        self.paramstyle = paramstyle
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # 空闲连接: [连接, 创建时间, 最后使用时间]，后进先出，常用的连接保持活跃
+        self._idle = deque()
+        self._closed = False
+        # 每个线程当前持有的连接，同一线程内嵌套取用时复用
+        self._local = threading.local()
+
+    @contextmanager
+    def connection(self):
+        """
+        取出一个连接，用完自动归还
+        同一线程内嵌套调用得到同一个连接，一次请求内的多次查询只占用一个连接
+        """
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held[0]
+            finally:
+                self._local.depth -= 1
+            return
+
+        entry = self._checkout()
+        self._local.held = entry
+        self._local.depth = 1
+        try:
+            yield entry[0]
+        finally:
+            self._local.held = None
+            # 归还前结束事务：未提交的修改被丢弃；只读查询在 REPEATABLE READ 下也会留下快照，
+            # 不结束的话下次取用这个连接时会读到旧数据。回滚失败说明连接已不可用
+            broken = not self._rollback(entry[0])
+            self._checkin(entry, broken)
+
+    def _checkout(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"{self.timeout} 秒内没有可用的数据库连接")
+        try:
+            now = time.monotonic()
+            while True:
+                with self._lock:
+                    if self._closed:
+                        raise PoolClosed("数据库连接池已关闭")
+                    entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    return [self._connect(), now, now]
+                if now - entry[1] >= self.max_lifetime:
+                    self._close(entry[0])
+                    continue
+                if now - entry[2] >= self.ping_interval and not self._ping(entry[0]):
+                    self._close(entry[0])
+                    continue
+                return entry
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, entry, broken):
+        try:
+            if not broken and time.monotonic() - entry[1] < self.max_lifetime:
+                entry[2] = time.monotonic()
+                with self._lock:
+                    # 连接池关闭后归还的连接直接关闭
+                    if not self._closed:
+                        self._idle.append(entry)
+                        return
+            self._close(entry[0])
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _ping(connection):
+        """检测连接是否可用"""
+        try:
+            if hasattr(connection, 'ping'):
+                connection.ping()
+            else:
+                connection.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _rollback(connection):
+        """回滚未提交的事务，连接已不可用时返回False"""
+        try:
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """关闭所有空闲连接，正在使用的连接在归还时关闭，之后不能再取用连接"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+        for entry in idle:
+            self._close(entry[0])
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+
+
+class InvalidationLog:
+    """
+    失效记录类，仅负责判断某次读取开始后键是否被失效过
+    缓存用它拒绝写入读取期间已过时的数据：A 读到旧数据，B 提交修改并使缓存失效，A 再写入缓存
+    本类不加锁，由使用它的缓存在自己的锁内调用
+    """
+
+    def __init__(self, max_size=100000):
+        """
+        max_size: 最多记住的键数，超出时淘汰最早失效的；
+        读取期间有记录被淘汰时，无法确定读到的数据是否过时，按已失效处理
+        """
+        self.max_size = max_size
+        self._seq = 0
+        # 键 -> 最后一次失效的序号，按序号排序
+        self._invalidated = OrderedDict()
+        # 已淘汰的记录中最大的序号
+        self._forgotten = 0
+
+    def begin(self):
+        """读取数据库之前调用，返回的标记交给 changed_since"""
+        return self._seq
+
+    def invalidate(self, key):
+        self._seq += 1
+        self._invalidated.pop(key, None)
+        self._invalidated[key] = self._seq
+        while len(self._invalidated) > self.max_size:
+            _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def invalidate_all(self):
+        self._seq += 1
+        self._invalidated.clear()
+        self._forgotten = self._seq
+
+    def changed_since(self, key, token):
+        """begin 返回 token 之后键是否被失效过"""
+        return self._forgotten > token or self._invalidated.get(key, 0) > token
@@ -1,10 +1,16 @@
+import math
+
 from flask import request, jsonify
+from pooled_password_hasher import HasherBusy
+from rate_limiter import RateLimited
+from token_service import InvalidToken
 
 class LoginController:
     """登录控制器类，仅负责处理HTTP请求和响应"""
     
-    def __init__(self, login_service):
+    def __init__(self, login_service, token_service):
         self.login_service = login_service
+        self.token_service = token_service
         
     def handle_login_request(self):
         """处理登录HTTP请求"""
@@ -25,7 +31,19 @@ class LoginController:
         user_agent = request.user_agent.string
         
         # 调用服务层处理业务逻辑
-        user = self.login_service.login(username, password, ip_address, user_agent)
+        try:
+            user = self.login_service.login(username, password, ip_address, user_agent)
+        except RateLimited as e:
+            return jsonify({
+                'success': False,
+                'message': '登录尝试过于频繁，请稍后再试'
+            }), 429, {'Retry-After': str(max(1, math.ceil(e.retry_after)))}
+        except HasherBusy:
+            # 密码验证排队已满，让客户端稍后重试，而不是占着请求线程等待
+            return jsonify({
+                'success': False,
+                'message': '登录请求过多，请稍后再试'
+            }), 503, {'Retry-After': '1'}
         
         # 构建并返回响应
         if user:
@@ -35,7 +53,9 @@ class LoginController:
                 'data': {
                     'user_id': user.get_id(),
                     'username': user.get_username(),
-                    'email': user.get_email()
+                    'email': user.get_email(),
+                    # 之后的请求携带访问令牌，不再发送密码
+                    **self.token_service.issue(user)
                 }
             }), 200
         else:
@@ -43,3 +63,108 @@ class LoginController:
                 'success': False,
                 'message': '用户名或密码不正确'
             }), 401
+    
+    def handle_refresh_request(self):
+        """用刷新令牌换取新的访问令牌和刷新令牌"""
+        data = request.get_json(silent=True) or {}
+        try:
+            tokens = self.token_service.refresh(data.get('refresh_token'))
+        except InvalidToken as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 401
+        return jsonify({
+            'success': True,
+            'message': '令牌已刷新',
+            'data': tokens
+        }), 200
+    
+    def handle_logout_request(self):
+        """退出登录，吊销请求头中的访问令牌和请求体中的刷新令牌"""
+        access_token = self._bearer_token()
+        if access_token:
+            self.token_service.revoke(access_token)
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            self.token_service.revoke(data['refresh_token'], 'refresh')
+        return jsonify({
+            'success': True,
+            'message': '已退出登录'
+        }), 200
+    
+    def handle_change_password_request(self):
+        """修改密码，此前签发的令牌全部失效，返回新的一对令牌"""
+        try:
+            claims = self.authenticate()
+        except InvalidToken as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 401, {'WWW-Authenticate': 'Bearer'}
+        data = request.get_json(silent=True) or {}
+        old_password = data.get('old_password')
+        new_password = data.get('new_password')
+        if not old_password or not new_password:
+            return jsonify({
+                'success': False,
+                'message': '原密码和新密码不能为空'
+            }), 400
+        
+        try:
+            user = self.login_service.change_password(
+                claims['name'], old_password, new_password, request.remote_addr
+            )
+        except RateLimited as e:
+            return jsonify({
+                'success': False,
+                'message': '尝试过于频繁，请稍后再试'
+            }), 429, {'Retry-After': str(max(1, math.ceil(e.retry_after)))}
+        except HasherBusy:
+            return jsonify({
+                'success': False,
+                'message': '请求过多，请稍后再试'
+            }), 503, {'Retry-After': '1'}
+        if not user:
+            return jsonify({
+                'success': False,
+                'message': '原密码不正确'
+            }), 403
+        return jsonify({
+            'success': True,
+            'message': '密码已修改',
+            'data': self.token_service.issue(user)
+        }), 200
+    
+    def handle_current_user_request(self):
+        """返回访问令牌对应的用户，只验证令牌签名，不访问数据库"""
+        try:
+            claims = self.authenticate()
+        except InvalidToken as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 401, {'WWW-Authenticate': 'Bearer'}
+        return jsonify({
+            'success': True,
+            'data': {
+                'user_id': claims['sub'],
+                'username': claims['name']
+            }
+        }), 200
+    
+    def authenticate(self):
+        """
+        验证请求头 Authorization: Bearer <访问令牌>
+        返回: 令牌内容；没有令牌或令牌无效时抛出 InvalidToken
+        """
+        token = self._bearer_token()
+        if not token:
+            raise InvalidToken("缺少访问令牌")
+        return self.token_service.verify(token)
+    
+    def _bearer_token(self):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer':
+            return None
+        return token.strip() or None
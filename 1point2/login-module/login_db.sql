@@ -9,14 +9,32 @@ CREATE TABLE users (
     last_login TIMESTAMP NULL
 );
 
--- 登录日志表，记录登录历史
+-- 登录日志表，记录登录历史（用户名不存在时 user_id 为空）
 CREATE TABLE login_logs (
     id INT AUTO_INCREMENT PRIMARY KEY,
-    user_id INT NOT NULL,
+    user_id INT NULL,
     login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     ip_address VARCHAR(45),
     user_agent TEXT,
     success BOOLEAN NOT NULL,
     error_message VARCHAR(255),
-    FOREIGN KEY (user_id) REFERENCES users(id)
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    -- 按用户、按IP查询一段时间内的登录尝试
+    INDEX idx_login_logs_user_time (user_id, login_time),
+    INDEX idx_login_logs_ip_time (ip_address, login_time),
+    -- 归档任务按时间查找旧记录
+    INDEX idx_login_logs_time (login_time)
+);
+
+-- 登录日志归档表，超过保留期的记录由 login_log_retention.py 分批移入
+-- （MySQL 的分区表不支持外键，因此用归档代替按时间分区）
+CREATE TABLE login_logs_archive (
+    id INT PRIMARY KEY,
+    user_id INT NULL,
+    login_time TIMESTAMP NULL,
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    success BOOLEAN NOT NULL,
+    error_message VARCHAR(255),
+    INDEX idx_login_logs_archive_time (login_time)
 );
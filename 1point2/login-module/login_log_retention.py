@@ -0,0 +1,42 @@
+"""
+登录日志保留任务：把超过保留期的登录记录分批移到 login_logs_archive
+每批一个短事务，批次之间暂停，不长时间锁表，可在业务运行时执行（如每天由 cron 调用一次）
+用法: python login_log_retention.py [--days 90] [--batch-size 5000] [--pause 0.5]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from app import DB_CONFIG
+from user_repository import UserRepository
+
+
+def archive_old_logs(user_repository, days, batch_size=5000, pause=0.5):
+    """归档 days 天前的登录记录，返回归档的总条数"""
+    before = datetime.now() - timedelta(days=days)
+    total = 0
+    while True:
+        moved = user_repository.archive_login_logs(before, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        time.sleep(pause)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='归档超过保留期的登录日志')
+    parser.add_argument('--days', type=int, default=90, help='login_logs 中保留的天数')
+    parser.add_argument('--batch-size', type=int, default=5000, help='每批归档的记录数')
+    parser.add_argument('--pause', type=float, default=0.5, help='批次之间暂停的秒数')
+    args = parser.parse_args()
+
+    user_repository = UserRepository(DB_CONFIG)
+    try:
+        total = archive_old_logs(user_repository, args.days, args.batch_size, args.pause)
+        print(f"已归档 {total} 条 {args.days} 天前的登录记录")
+    finally:
+        user_repository.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,99 @@
+from rate_limiter import RateLimited
+
 class LoginService:
     """登录服务类，仅负责处理登录业务逻辑"""
     
-    def __init__(self, user_repository, password_hasher):
+    def __init__(self, user_repository, password_hasher, deferred_audit=False,
+                 ip_limiter=None, username_limiter=None, on_password_changed=None):
         # 依赖注入，不直接创建依赖对象，提高可测试性
         self.user_repository = user_repository
         self.password_hasher = password_hasher
+        # 为True时登录记录在后台写入，响应不等待数据库
+        self.deferred_audit = deferred_audit
+        # 可选的限流：同一IP的每次登录都消耗令牌，同一用户名只有登录失败才消耗令牌
+        self.ip_limiter = ip_limiter
+        self.username_limiter = username_limiter
+        # 可选的回调，用户修改密码后以用户id调用（如吊销此前签发的令牌）
+        self.on_password_changed = on_password_changed
         
     def login(self, username, password, ip_address, user_agent):
         """
         处理登录逻辑
         返回: 成功时返回用户对象，失败时返回None
+        超出频率限制时抛出 RateLimited，此时不访问数据库，也不验证密码
         """
+        self._check_rate_limit(username, ip_address)
+        
+        # 近期已确认不存在的用户名，不再查询数据库和重复记录日志
+        if self.user_repository.is_unknown_username(username):
+            self._login_failed(username)
+            return None
+        
         # 查找用户
         user = self.user_repository.find_by_username(username)
         user_id = user.id if user else None
         
         # 验证用户是否存在
         if not user:
-            self.user_repository.log_login_attempt(
-                user_id, ip_address, user_agent, False, "用户名不存在"
+            self.user_repository.record_login(
+                user_id, ip_address, user_agent, False, "用户名不存在", deferred=self.deferred_audit
             )
+            self._login_failed(username)
             return None
         
         # 验证密码
         if not self.password_hasher.verify_password(password, user.get_password_hash()):
-            self.user_repository.log_login_attempt(
-                user_id, ip_address, user_agent, False, "密码不正确"
+            self.user_repository.record_login(
+                user_id, ip_address, user_agent, False, "密码不正确", deferred=self.deferred_audit
             )
+            self._login_failed(username)
             return None
         
-        # 登录成功，更新最后登录时间并记录日志
-        self.user_repository.update_last_login(user.get_id())
-        self.user_repository.log_login_attempt(
-            user_id, ip_address, user_agent, True
+        # 成本因子已提高时，趁有明文密码重新哈希；失败不影响本次登录
+        if self.password_hasher.needs_rehash(user.get_password_hash()):
+            try:
+                self.user_repository.update_password_hash(
+                    user.get_id(), self.password_hasher.hash_password(password)
+                )
+            except Exception as e:
+                print(f"重新哈希密码失败: {str(e)}")
+        
+        # 登录成功，在一个事务中更新最后登录时间并记录日志
+        self.user_repository.record_login(
+            user_id, ip_address, user_agent, True, deferred=self.deferred_audit
         )
         
         return user
+    
+    def change_password(self, username, old_password, new_password, ip_address):
+        """
+        修改密码，需要验证原密码
+        返回: 成功时返回用户对象，用户不存在或原密码不正确时返回None
+        超出频率限制时抛出 RateLimited，与登录共用限流，防止借此猜测密码
+        """
+        self._check_rate_limit(username, ip_address)
+        user = self.user_repository.find_by_username(username)
+        if not user or not self.password_hasher.verify_password(old_password, user.get_password_hash()):
+            self._login_failed(username)
+            return None
+        self.user_repository.update_password_hash(user.get_id(), self.password_hasher.hash_password(new_password))
+        # 登录时的重新哈希密码不变，不经过这里，已签发的令牌继续有效
+        if self.on_password_changed is not None:
+            self.on_password_changed(user.get_id())
+        return user
+    
+    def _check_rate_limit(self, username, ip_address):
+        """检查IP和用户名的频率限制，超出时抛出 RateLimited"""
+        if self.ip_limiter is not None:
+            wait = self.ip_limiter.hit(f"ip:{ip_address}")
+            if wait:
+                raise RateLimited(wait)
+        if self.username_limiter is not None:
+            wait = self.username_limiter.check(f"user:{username}")
+            if wait:
+                raise RateLimited(wait)
+    
+    def _login_failed(self, username):
+        """登录失败消耗该用户名的令牌"""
+        if self.username_limiter is not None:
+            self.username_limiter.hit(f"user:{username}")
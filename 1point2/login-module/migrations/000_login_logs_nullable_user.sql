@@ -0,0 +1,7 @@
+-- 登录日志允许 user_id 为空
+-- 在已有数据库上执行：mysql login_system < migrations/000_login_logs_nullable_user.sql
+-- 新建的数据库直接使用 login_db.sql，已包含以下改动
+
+-- 不存在的用户名也要记录登录尝试，这些记录的 user_id 为空（外键对 NULL 不做检查）；
+-- 登录记录批量写入后，一条写不进去的记录会使整批失败
+ALTER TABLE login_logs MODIFY user_id INT NULL;
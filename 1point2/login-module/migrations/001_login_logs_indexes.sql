@@ -0,0 +1,24 @@
+-- 登录日志表的索引与归档表
+-- 在已有数据库上执行：mysql login_system < migrations/001_login_logs_indexes.sql
+-- 新建的数据库直接使用 login_db.sql，已包含以下改动
+
+-- "某用户最近 N 分钟的失败次数"、"某 IP 的登录尝试"按时间范围查询，不再全表扫描；
+-- login_time 单列索引供归档任务按时间查找旧记录
+ALTER TABLE login_logs
+    ADD INDEX idx_login_logs_user_time (user_id, login_time),
+    ADD INDEX idx_login_logs_ip_time (ip_address, login_time),
+    ADD INDEX idx_login_logs_time (login_time);
+
+-- 归档表：login_log_retention.py 把超过保留期的记录分批移到这里
+-- MySQL 的分区表不支持外键，因此用归档代替按时间分区；
+-- 归档表没有外键，需要时可以按月分区或直接导出后清空
+CREATE TABLE IF NOT EXISTS login_logs_archive (
+    id INT PRIMARY KEY,
+    user_id INT NULL,
+    login_time TIMESTAMP NULL,
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    success BOOLEAN NOT NULL,
+    error_message VARCHAR(255),
+    INDEX idx_login_logs_archive_time (login_time)
+);
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+from invalidation_log import InvalidationLog
+
+
+class NegativeCache:
+    """不存在的用户名缓存类，仅负责在有效期内记住查不到的键"""
+
+    def __init__(self, ttl=300, max_size=100000):
+        """
+        ttl: 记录的有效期（秒），过期后重新查询数据库
+        max_size: 最多记录的键数，超出时淘汰最早加入的
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._expires = OrderedDict()
+        # 失效过的键，防止把失效前的查询结果写回缓存
+        self._invalidations = InvalidationLog(max_size)
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._expires[key]
+                return False
+            return True
+
+    def begin_read(self):
+        """查询数据库之前调用，返回的标记交给 add"""
+        with self._lock:
+            return self._invalidations.begin()
+
+    def add(self, key, token=None):
+        """
+        记住查不到的键
+        token: begin_read 的返回值；查询期间该键已被失效（如刚创建了该用户）时不记录
+        """
+        with self._lock:
+            if token is not None and self._invalidations.changed_since(key, token):
+                return
+            self._expires.pop(key, None)
+            self._expires[key] = time.monotonic() + self.ttl
+            while len(self._expires) > self.max_size:
+                self._expires.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._invalidations.invalidate(key)
+            self._expires.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations.invalidate_all()
+            self._expires.clear()
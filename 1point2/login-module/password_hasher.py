@@ -1,16 +1,45 @@
+import time
+
 import bcrypt
 
 class PasswordHasher:
     """密码处理类，仅负责密码的哈希和验证"""
-    
+
+    def __init__(self, rounds=12):
+        # bcrypt 成本因子，每加 1 哈希耗时翻倍
+        self.rounds = rounds
+
+    @staticmethod
+    def calibrate(target_seconds=0.25, min_rounds=12, max_rounds=16):
+        """
+        测量本机的哈希耗时，选出耗时不超过 target_seconds 的最大成本因子
+        不低于 min_rounds，已有的哈希不会因为换到较慢的机器而降低强度
+        """
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibrate', bcrypt.gensalt(min_rounds))
+        elapsed = time.perf_counter() - start
+
+        rounds = min_rounds
+        while rounds < max_rounds and elapsed * 2 <= target_seconds:
+            rounds += 1
+            elapsed *= 2
+        return rounds
+
     def hash_password(self, password):
         """对密码进行哈希处理"""
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(self.rounds)
         return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
-    
+
     def verify_password(self, password, hashed_password):
         """验证密码与哈希值是否匹配"""
         return bcrypt.checkpw(
             password.encode('utf-8'),
             hashed_password.encode('utf-8')
         )
+
+    def needs_rehash(self, hashed_password):
+        """哈希值的成本因子低于当前设置时需要重新哈希（格式: $2b$12$...）"""
+        try:
+            return int(hashed_password.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
@@ -0,0 +1,64 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+
+class HasherBusy(Exception):
+    """哈希任务排队已满或等待超时"""
+
+
+class PooledPasswordHasher:
+    """密码处理线程池类，仅负责把哈希计算交给工作线程（或进程）执行并限制并发"""
+
+    def __init__(self, hasher, workers=None, queue_size=64, timeout=2.0, use_processes=False):
+        """
+        hasher: 实际计算哈希的 PasswordHasher
+        workers: 工作线程数，默认为CPU核数（bcrypt 计算时释放GIL，线程即可并行）
+        queue_size: 工作线程都在忙时最多排队的任务数，超出时立即拒绝
+        timeout: 每个请求等待结果的最长时间（秒）
+        use_processes: 为True时使用进程池
+        """
+        self.hasher = hasher
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        # 正在计算和排队的任务总数上限
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=self.workers)
+
+    @property
+    def rounds(self):
+        return self.hasher.rounds
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("密码验证请求过多")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # 任务结束（包括调用方已超时放弃的任务）才释放名额，正在计算的任务始终计入并发数
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HasherBusy(f"密码验证超过 {self.timeout} 秒")
+
+    def hash_password(self, password):
+        """对密码进行哈希处理"""
+        return self._run(self.hasher.hash_password, password)
+
+    def verify_password(self, password, hashed_password):
+        """验证密码与哈希值是否匹配"""
+        return self._run(self.hasher.verify_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password):
+        """哈希值的成本因子是否低于当前设置"""
+        return self.hasher.needs_rehash(hashed_password)
+
+    def close(self):
+        """等待正在计算的任务完成并关闭工作线程"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimited(Exception):
+    """请求超出频率限制"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"请求过于频繁，请 {retry_after:.0f} 秒后再试")
+        # 需要等待的秒数
+        self.retry_after = retry_after
+
+
+class MemoryBucketStore:
+    """令牌桶状态的进程内存储，超出 max_keys 时淘汰最久未使用的键"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def transact(self, key, update):
+        """
+        原子地读取并更新一个键的状态
+        update: 接收当前状态（没有时为None），返回 (新状态, 结果)
+        """
+        with self._lock:
+            state, result = update(self._buckets.get(key))
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return result
+
+
+class SqliteBucketStore:
+    """令牌桶状态的本地 SQLite 文件存储，同一台机器上的多个进程共享限流状态"""
+
+    # 每执行多少次更新清理一次早已回满的令牌桶
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, idle_seconds=3600):
+        """
+        path: SQLite 数据库文件路径
+        idle_seconds: 超过该时间未使用的令牌桶会被清理（此时已回满，与不存在等价）
+        """
+        self.idle_seconds = idle_seconds
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+        )
+        self._lock = threading.Lock()
+        self._updates = 0
+
+    def transact(self, key, update):
+        """原子地读取并更新一个键的状态，跨进程由 SQLite 写锁保证"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                state, result = update(row)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key,) + tuple(state)
+                )
+                self._updates += 1
+                if self._updates % self.PRUNE_EVERY == 0:
+                    self._conn.execute(
+                        "DELETE FROM rate_limit_buckets WHERE updated < ?", (time.time() - self.idle_seconds,)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+
+class RateLimiter:
+    """令牌桶限流类，仅负责按键限制请求频率"""
+
+    def __init__(self, rate, burst, store=None):
+        """
+        rate: 每秒补充的令牌数
+        burst: 令牌桶容量，即允许的突发请求数
+        store: 令牌桶状态存储，默认为进程内存储；多进程部署时可使用 SqliteBucketStore
+        """
+        self.rate = rate
+        self.burst = burst
+        self.store = store or MemoryBucketStore()
+
+    def _take(self, key, cost):
+        def update(state):
+            # 使用墙上时间，多个进程共享状态时时间一致
+            now = time.time()
+            tokens, updated = state or (self.burst, now)
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= max(cost, 1):
+                return (tokens - cost, now), 0
+            return (tokens, now), (max(cost, 1) - tokens) / self.rate
+
+        return self.store.transact(key, update)
+
+    def check(self, key):
+        """检查是否还有令牌，不消耗；返回需要等待的秒数，0表示允许"""
+        return self._take(key, 0)
+
+    def hit(self, key):
+        """消耗一个令牌；返回需要等待的秒数，0表示允许（令牌不足时不消耗）"""
+        return self._take(key, 1)
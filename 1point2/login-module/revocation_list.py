@@ -0,0 +1,61 @@
+import heapq
+import threading
+import time
+
+
+class RevocationList:
+    """令牌吊销列表类，仅负责在令牌过期前记住被吊销的令牌id和用户"""
+
+    def __init__(self):
+        # 令牌id（整数，比字符串紧凑）-> 过期时间，过期后令牌本身已失效，记录随之清除
+        self._revoked = {}
+        # (过期时间, 令牌id) 小顶堆，按过期顺序清除
+        self._expiry = []
+        # 用户id -> 时间戳，在此之前签发的该用户令牌全部失效（如修改密码后）
+        self._users_revoked_before = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, token_id, expires):
+        """吊销一个令牌，expires 为令牌的过期时间（Unix时间戳）"""
+        self.revoke_if_new(token_id, expires)
+
+    def revoke_if_new(self, token_id, expires):
+        """
+        吊销一个令牌，检查和写入在同一把锁内完成
+        返回: 本次调用吊销了令牌时为True，令牌此前已被吊销时为False
+        """
+        with self._lock:
+            self._purge(time.time())
+            if token_id in self._revoked:
+                return False
+            self._revoked[token_id] = expires
+            heapq.heappush(self._expiry, (expires, token_id))
+            return True
+
+    def revoke_user(self, user_id, before=None):
+        """吊销用户在 before（默认为现在，精确到秒以下）之前签发的所有令牌"""
+        with self._lock:
+            self._users_revoked_before[user_id] = before if before is not None else time.time()
+
+    def is_revoked(self, token_id, user_id, issued_at):
+        """令牌是否已被吊销（不加锁，读取单个键是原子的）"""
+        if token_id in self._revoked:
+            return True
+        revoked_before = self._users_revoked_before.get(user_id)
+        return revoked_before is not None and issued_at < revoked_before
+
+    def prune_users(self, max_token_age):
+        """清除早于最长令牌有效期的用户吊销记录，这些时间之前签发的令牌已全部过期"""
+        cutoff = time.time() - max_token_age
+        with self._lock:
+            self._users_revoked_before = {
+                user_id: before for user_id, before in self._users_revoked_before.items() if before > cutoff
+            }
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def _purge(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            _, token_id = heapq.heappop(self._expiry)
+            self._revoked.pop(token_id, None)
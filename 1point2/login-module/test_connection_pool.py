@@ -0,0 +1,199 @@
+"""
+ConnectionPool 测试，用 SQLite 文件数据库代替 MySQL
+运行: python -m pytest test_connection_pool.py
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from connection_pool import ConnectionPool, PoolClosed, PoolTimeout
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+    conn.execute("INSERT INTO users (id, email) VALUES (1, 'old@example.com')")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def opened():
+    """连接池创建过的全部连接"""
+    return []
+
+
+@pytest.fixture
+def make_pool(db_path, opened):
+    pools = []
+
+    def make(**options):
+        def connect():
+            conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+            opened.append(conn)
+            return conn
+        pool = ConnectionPool(connect, paramstyle='qmark', **options)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def read_email(conn):
+    return conn.execute("SELECT email FROM users WHERE id = 1").fetchone()[0]
+
+
+def test_checkin_reuses_connection(make_pool, opened):
+    pool = make_pool()
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(opened) == 1
+
+
+def test_nested_checkout_in_same_thread_shares_connection(make_pool, opened):
+    pool = make_pool()
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+    assert len(opened) == 1
+
+
+def test_return_rolls_back_uncommitted_changes(make_pool, db_path):
+    pool = make_pool()
+    with pool.connection() as conn:
+        conn.execute("BEGIN")
+        conn.execute("UPDATE users SET email = 'lost@example.com' WHERE id = 1")
+
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert read_email(conn) == 'old@example.com'
+
+
+def test_return_ends_read_snapshot(make_pool, db_path):
+    pool = make_pool()
+    with pool.connection() as conn:
+        # 只读事务留下的快照，归还时不结束的话下次取用会读到旧数据
+        conn.execute("BEGIN")
+        assert read_email(conn) == 'old@example.com'
+
+    writer = sqlite3.connect(db_path)
+    writer.execute("UPDATE users SET email = 'new@example.com' WHERE id = 1")
+    writer.commit()
+    writer.close()
+
+    with pool.connection() as conn:
+        assert read_email(conn) == 'new@example.com'
+
+
+def test_broken_connection_is_discarded(make_pool, opened):
+    pool = make_pool()
+    with pool.connection() as conn:
+        # 连接在使用中断开，归还时回滚失败
+        conn.close()
+    with pool.connection() as conn:
+        assert read_email(conn) == 'old@example.com'
+    assert len(opened) == 2
+
+
+def test_idle_connection_failing_ping_is_replaced(make_pool, opened):
+    pool = make_pool(ping_interval=0)
+    with pool.connection() as conn:
+        pass
+    conn.close()
+    with pool.connection() as replacement:
+        assert replacement is not conn
+        assert read_email(replacement) == 'old@example.com'
+    assert len(opened) == 2
+
+
+def test_expired_connection_is_not_reused(make_pool, opened):
+    pool = make_pool(max_lifetime=0)
+    with pool.connection():
+        pass
+    with pool.connection():
+        pass
+    assert len(opened) == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        read_email(opened[0])
+
+
+def test_exhausted_pool_times_out(make_pool):
+    pool = make_pool(max_size=1, timeout=0.1)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.connection():
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    try:
+        assert holding.wait(5)
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+    # 连接归还后可以再次取用
+    with pool.connection() as conn:
+        assert read_email(conn) == 'old@example.com'
+
+
+def test_failed_connect_releases_slot(db_path):
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError("connection refused")
+        return sqlite3.connect(db_path, check_same_thread=False)
+
+    pool = ConnectionPool(connect, max_size=1, timeout=0.1, paramstyle='qmark')
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.connection():
+            pass
+    with pool.connection() as conn:
+        assert read_email(conn) == 'old@example.com'
+    pool.close()
+
+
+def test_close_closes_connections_in_use(make_pool, opened):
+    pool = make_pool()
+    with pool.connection() as conn:
+        # 另一个线程取用并归还一个连接，关闭时它是空闲连接
+        idle = []
+
+        def use_other():
+            with pool.connection() as other:
+                idle.append(other)
+
+        thread = threading.Thread(target=use_other)
+        thread.start()
+        thread.join()
+        assert idle[0] is not conn
+
+        pool.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            read_email(idle[0])
+        # 正在使用的连接在归还前仍可用
+        assert read_email(conn) == 'old@example.com'
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        read_email(conn)
+    with pytest.raises(PoolClosed):
+        with pool.connection():
+            pass
@@ -0,0 +1,162 @@
+"""
+UserCache、NegativeCache 测试，包括读取数据库期间缓存被失效的竞争
+运行: python -m pytest test_user_cache.py
+"""
+import sqlite3
+
+import pytest
+
+from connection_pool import ConnectionPool
+from negative_cache import NegativeCache
+from user import User
+from user_cache import UserCache
+from user_repository import UserRepository
+
+
+def make_user(user_id=1, username='alice', password_hash='old-hash'):
+    return User(user_id=user_id, username=username, password_hash=password_hash, email=f'{username}@example.com')
+
+
+def test_put_and_get():
+    cache = UserCache()
+    cache.put(make_user())
+    assert cache.get('alice').get_password_hash() == 'old-hash'
+
+
+def test_put_after_discard_id_during_read_is_dropped():
+    cache = UserCache()
+    token = cache.begin_read()
+    cache.discard_id(1)
+    cache.put(make_user(), token)
+    assert cache.get('alice') is None
+
+    # 失效之后开始的读取可以正常缓存
+    cache.put(make_user(password_hash='new-hash'), cache.begin_read())
+    assert cache.get('alice').get_password_hash() == 'new-hash'
+
+
+def test_discard_of_other_user_does_not_block_put():
+    cache = UserCache()
+    token = cache.begin_read()
+    cache.discard_id(2)
+    cache.discard('bob')
+    cache.put(make_user(), token)
+    assert cache.get('alice') is not None
+
+
+def test_clear_during_read_drops_put():
+    cache = UserCache()
+    token = cache.begin_read()
+    cache.clear()
+    cache.put(make_user(), token)
+    assert cache.get('alice') is None
+
+
+def test_forgotten_invalidations_are_treated_as_changed():
+    cache = UserCache(max_size=2)
+    token = cache.begin_read()
+    for user_id in range(2, 6):
+        cache.discard_id(user_id)
+    # 失效记录已被淘汰，无法确定用户1是否被失效过
+    cache.put(make_user(), token)
+    assert cache.get('alice') is None
+
+
+def test_negative_cache_add_after_discard_during_read_is_dropped():
+    cache = NegativeCache()
+    token = cache.begin_read()
+    cache.discard('alice')
+    cache.add('alice', token)
+    assert 'alice' not in cache
+
+    cache.add('bob', token)
+    assert 'bob' in cache
+
+
+class HookedConnection:
+    """在第一次 fetchone 之前调用 hook，模拟查询与返回结果之间其他线程的操作"""
+
+    def __init__(self, conn, hook):
+        self._conn = conn
+        self._hook = hook
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def __init__(self):
+                self._cursor = conn._conn.cursor()
+
+            def execute(self, *args):
+                return self._cursor.execute(*args)
+
+            def fetchone(self):
+                row = self._cursor.fetchone()
+                hook, conn._hook = conn._hook, None
+                if hook is not None:
+                    hook()
+                return row
+
+            def close(self):
+                self._cursor.close()
+
+        return Cursor()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'users.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE,
+                    password_hash TEXT, email TEXT UNIQUE, last_login TIMESTAMP)""")
+    conn.execute("INSERT INTO users (id, username, password_hash, email) "
+                 "VALUES (1, 'alice', 'old-hash', 'alice@example.com')")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def make_repository(db_path, hook):
+    hooks = [hook]
+
+    def connect():
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        return HookedConnection(conn, hooks.pop() if hooks else None)
+    pool = ConnectionPool(connect, paramstyle='qmark')
+    return UserRepository({'pool': pool}, NegativeCache(), UserCache())
+
+
+def commit(db_path, query, params):
+    conn = sqlite3.connect(db_path)
+    conn.execute(query, params)
+    conn.commit()
+    conn.close()
+
+
+def test_password_change_during_lookup_is_not_cached(db_path):
+    def change_password():
+        # 查询已读到旧数据之后，另一个线程修改了密码并使缓存失效
+        commit(db_path, "UPDATE users SET password_hash = 'new-hash' WHERE id = 1", ())
+        repository.invalidate_user(1)
+
+    repository = make_repository(db_path, change_password)
+    # 本次查询返回读到的旧数据，但不能写入缓存
+    assert repository.find_by_username('alice').get_password_hash() == 'old-hash'
+    assert repository.user_cache.get('alice') is None
+    assert repository.find_by_username('alice').get_password_hash() == 'new-hash'
+    repository.close()
+
+
+def test_user_created_during_lookup_is_not_remembered_as_unknown(db_path):
+    def create_user():
+        commit(db_path, "INSERT INTO users (id, username, password_hash, email) VALUES (2, 'bob', 'h', 'b@x')", ())
+        repository.unknown_usernames.discard('bob')
+
+    repository = make_repository(db_path, create_user)
+    assert repository.find_by_username('bob') is None
+    assert not repository.is_unknown_username('bob')
+    assert repository.find_by_username('bob').get_id() == 2
+    repository.close()
@@ -0,0 +1,110 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+
+from revocation_list import RevocationList
+
+
+class InvalidToken(Exception):
+    """令牌格式错误、签名不符、已过期或已被吊销"""
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class TokenService:
+    """令牌服务类，仅负责签发、验证、刷新和吊销 HMAC 签名的无状态令牌"""
+
+    def __init__(self, secret, access_ttl=900, refresh_ttl=14 * 24 * 3600, revocation_list=None):
+        """
+        secret: HMAC 密钥（字节或字符串），多进程部署时所有进程必须相同
+        access_ttl: 访问令牌有效期（秒），较短，泄露后的影响有限
+        refresh_ttl: 刷新令牌有效期（秒），用于换取新的访问令牌，每次使用后作废
+        revocation_list: 吊销列表，默认为进程内的 RevocationList
+        """
+        self._key = secret.encode('utf-8') if isinstance(secret, str) else secret
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.revocation_list = revocation_list or RevocationList()
+
+    def issue(self, user):
+        """为登录成功的用户签发访问令牌和刷新令牌"""
+        return self._issue_pair(user.get_id(), user.get_username())
+
+    def verify(self, token, token_type='access'):
+        """
+        验证令牌，不访问数据库，也不计算 bcrypt
+        返回: 令牌内容 {'sub': 用户id, 'name': 用户名, 'typ', 'iat', 'exp', 'jti'}
+        """
+        try:
+            payload_part, signature_part = token.split('.')
+            signature = _b64decode(signature_part)
+            expected = self._sign(payload_part.encode('ascii'))
+        except (AttributeError, ValueError):
+            raise InvalidToken("令牌格式错误")
+        if not hmac.compare_digest(signature, expected):
+            raise InvalidToken("令牌签名无效")
+        claims = json.loads(_b64decode(payload_part))
+        if claims.get('typ') != token_type:
+            raise InvalidToken("令牌类型错误")
+        if claims['exp'] <= time.time():
+            raise InvalidToken("令牌已过期")
+        if self.revocation_list.is_revoked(claims['jti'], claims['sub'], claims['iat']):
+            raise InvalidToken("令牌已被吊销")
+        return claims
+
+    def refresh(self, refresh_token):
+        """用刷新令牌换取新的一对令牌，旧的刷新令牌随即作废"""
+        claims = self.verify(refresh_token, 'refresh')
+        # 同一个刷新令牌的并发请求都能通过 verify，只有先吊销它的那个可以换取新令牌
+        if not self.revocation_list.revoke_if_new(claims['jti'], claims['exp']):
+            raise InvalidToken("令牌已被吊销")
+        return self._issue_pair(claims['sub'], claims['name'])
+
+    def revoke(self, token, token_type='access'):
+        """吊销一个令牌（如退出登录），令牌无效时忽略"""
+        try:
+            claims = self.verify(token, token_type)
+        except InvalidToken:
+            return False
+        self.revocation_list.revoke(claims['jti'], claims['exp'])
+        return True
+
+    def revoke_user(self, user_id):
+        """吊销用户此前签发的所有令牌（如修改密码后）"""
+        self.revocation_list.revoke_user(user_id)
+        self.revocation_list.prune_users(max(self.access_ttl, self.refresh_ttl))
+
+    def _issue_pair(self, user_id, username):
+        return {
+            'access_token': self._encode(user_id, username, 'access', self.access_ttl),
+            'refresh_token': self._encode(user_id, username, 'refresh', self.refresh_ttl),
+            'token_type': 'Bearer',
+            'expires_in': self.access_ttl
+        }
+
+    def _encode(self, user_id, username, token_type, ttl):
+        now = time.time()
+        claims = {
+            'sub': user_id,
+            'name': username,
+            'typ': token_type,
+            # 保留小数部分：吊销用户令牌后同一秒内签发的新令牌仍然有效
+            'iat': now,
+            'exp': int(now) + ttl,
+            # 64位随机整数作为令牌id，吊销列表中占用空间小
+            'jti': secrets.randbits(64)
+        }
+        payload_part = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        return f"{payload_part}.{_b64encode(self._sign(payload_part.encode('ascii')))}"
+
+    def _sign(self, data):
+        return hmac.new(self._key, data, hashlib.sha256).digest()
@@ -1,11 +1,22 @@
 class User:
-    """用户模型类，仅负责存储和提供用户数据"""
+    """用户模型类，仅负责存储和提供用户数据（不可修改，可在缓存中安全共享）"""
+    
+    __slots__ = ('id', 'username', 'password_hash', 'email')
     
     def __init__(self, user_id, username, password_hash, email):
-        self.id = user_id
-        self.username = username
-        self.password_hash = password_hash
-        self.email = email
+        object.__setattr__(self, 'id', user_id)
+        object.__setattr__(self, 'username', username)
+        object.__setattr__(self, 'password_hash', password_hash)
+        object.__setattr__(self, 'email', email)
+        
+    def __setattr__(self, name, value):
+        raise AttributeError("User 对象不可修改")
+        
+    def __delattr__(self, name):
+        raise AttributeError("User 对象不可修改")
+        
+    def __repr__(self):
+        return f"User(id={self.id!r}, username={self.username!r})"
         
     def get_id(self):
         return self.id
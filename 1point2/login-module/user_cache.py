@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+from invalidation_log import InvalidationLog
+
+
+class UserCache:
+    """用户缓存类，仅负责按用户名缓存 User 对象，过期或超出容量时淘汰"""
+
+    def __init__(self, ttl=60, max_size=10000):
+        """
+        ttl: 缓存的有效期（秒），其他进程修改用户信息后最多这么久生效
+        max_size: 最多缓存的用户数，超出时淘汰最久未使用的
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        # 用户名 -> (User, 过期时间)，按最近使用排序
+        self._users = OrderedDict()
+        # 用户id -> 用户名，按id失效时使用
+        self._usernames = {}
+        # 失效过的用户id和用户名，防止把失效前读到的旧数据写回缓存
+        self._invalidations = InvalidationLog(max_size)
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        """返回缓存的 User，没有或已过期时返回None"""
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                self._remove(username)
+                return None
+            self._users.move_to_end(username)
+            return user
+
+    def begin_read(self):
+        """从数据库读取用户之前调用，返回的标记交给 put"""
+        with self._lock:
+            return self._invalidations.begin()
+
+    def put(self, user, token=None):
+        """
+        缓存用户
+        token: begin_read 的返回值；读取期间该用户已被失效（如修改了密码）时不缓存读到的旧数据
+        """
+        with self._lock:
+            if token is not None and (self._invalidations.changed_since(('id', user.id), token) or
+                                      self._invalidations.changed_since(('name', user.username), token)):
+                return
+            # 用户名可能已改，先移除同一id的旧记录
+            self._remove(self._usernames.get(user.id))
+            self._remove(user.username)
+            self._users[user.username] = (user, time.monotonic() + self.ttl)
+            self._usernames[user.id] = user.username
+            while len(self._users) > self.max_size:
+                username, (oldest, _) = self._users.popitem(last=False)
+                self._usernames.pop(oldest.id, None)
+
+    def discard(self, username):
+        """按用户名失效"""
+        with self._lock:
+            self._invalidations.invalidate(('name', username))
+            self._remove(username)
+
+    def discard_id(self, user_id):
+        """按用户id失效（修改密码、邮箱等只知道id时使用）"""
+        with self._lock:
+            self._invalidations.invalidate(('id', user_id))
+            self._remove(self._usernames.get(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._invalidations.invalidate_all()
+            self._users.clear()
+            self._usernames.clear()
+
+    def _remove(self, username):
+        entry = self._users.pop(username, None)
+        if entry is not None:
+            self._usernames.pop(entry[0].id, None)
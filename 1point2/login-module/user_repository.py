@@ -1,82 +1,351 @@
-import mysql.connector
+import logging
+import threading
+from datetime import datetime
+
+try:
+    import mysql.connector
+except ImportError:
+    # 使用 SQLite 等替代数据库测试时不需要安装 MySQL 驱动
+    mysql = None
+
+from audit_log_writer import AuditLogWriter
+from connection_pool import ConnectionPool
 from user import User
 
+# DB_CONFIG 中的连接池配置项 -> ConnectionPool 的参数，其余配置项作为数据库连接参数
+POOL_OPTIONS = {
+    'pool_size': 'max_size',
+    'pool_max_lifetime': 'max_lifetime',
+    'pool_ping_interval': 'ping_interval',
+    'pool_timeout': 'timeout'
+}
+
+# DB_CONFIG 中的登录日志批量写入配置项 -> AuditLogWriter 的参数
+AUDIT_OPTIONS = {
+    'audit_batch_size': 'batch_size',
+    'audit_flush_interval': 'flush_interval',
+    'audit_queue_size': 'queue_size',
+    'audit_put_timeout': 'put_timeout'
+}
+
+# Flask 应用日志（名为 'app'）的子日志，沿用应用配置的处理器
+logger = logging.getLogger('app.audit')
+
 class UserRepository:
     """用户数据访问类，仅负责与数据库交互"""
-    
-    def __init__(self, db_config):
+
+    def __init__(self, db_config, unknown_usernames=None, user_cache=None):
+        """
+        db_config: 数据库配置，可以包含连接池配置项（见 POOL_OPTIONS）和登录日志写入配置项（见 AUDIT_OPTIONS）；
+        也可以用 'pool' 直接传入一个 ConnectionPool（如测试时使用 SQLite 的连接池）
+        unknown_usernames: 可选的 NegativeCache，记住查不到的用户名，有效期内不再查询数据库
+        user_cache: 可选的 UserCache，按用户名缓存查到的用户，有效期内不再查询数据库
+        """
         self.db_config = db_config
-        
-    def _get_connection(self):
-        """创建并返回数据库连接"""
-        return mysql.connector.connect(
-            host=self.db_config['host'],
-            user=self.db_config['user'],
-            password=self.db_config['password'],
-            database=self.db_config['database']
-        )
-    
+        self.unknown_usernames = unknown_usernames
+        self.user_cache = user_cache
+        self.pool = db_config.get('pool') or self._create_pool(db_config)
+        # 后台批量写入登录记录，首次延迟写入时创建
+        self._audit_writer = None
+        self._audit_lock = threading.Lock()
+
+    @staticmethod
+    def _create_pool(db_config):
+        """按配置创建 MySQL 连接池"""
+        if mysql is None:
+            raise ImportError("未安装MySQL驱动，请运行: pip install mysql-connector-python")
+        options = {POOL_OPTIONS[key]: value for key, value in db_config.items() if key in POOL_OPTIONS}
+        connect_args = {key: value for key, value in db_config.items()
+                        if key not in POOL_OPTIONS and key not in AUDIT_OPTIONS and key != 'pool'}
+        return ConnectionPool(lambda: mysql.connector.connect(**connect_args), **options)
+
+    def session(self):
+        """
+        在当前线程中持有一个连接，期间本类的所有操作都使用这个连接
+        用法: with repository.session(): ...
+        """
+        return self.pool.connection()
+
+    def _sql(self, query):
+        """按驱动的参数风格转换占位符"""
+        if self.pool.paramstyle == 'qmark':
+            return query.replace('%s', '?')
+        return query
+
+    def is_unknown_username(self, username):
+        """用户名是否在近期已确认不存在（不查询数据库）"""
+        return self.unknown_usernames is not None and username in self.unknown_usernames
+
+    def create_user(self, username, password_hash, email):
+        """创建用户，返回新用户的id"""
+        with self.session() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    self._sql("INSERT INTO users (username, password_hash, email) VALUES (%s, %s, %s)"),
+                    (username, password_hash, email)
+                )
+                user_id = cursor.lastrowid
+            finally:
+                cursor.close()
+            connection.commit()
+        if self.unknown_usernames is not None:
+            self.unknown_usernames.discard(username)
+        return user_id
+
     def find_by_username(self, username):
-        """根据用户名查找用户"""
-        connection = None
-        try:
-            connection = self._get_connection()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT id, username, password_hash, email FROM users WHERE username = %s", (username,))
-            user_data = cursor.fetchone()
-            
-            if user_data:
-                return User(
-                    user_id=user_data['id'],
-                    username=user_data['username'],
-                    password_hash=user_data['password_hash'],
-                    email=user_data['email']
+        """根据用户名查找用户，优先读取缓存"""
+        if self.user_cache is not None:
+            user = self.user_cache.get(username)
+            if user is not None:
+                return user
+
+        # 查询前取得标记：查询期间用户被修改或创建时，不把查到的旧结果写入缓存
+        user_token = self.user_cache.begin_read() if self.user_cache is not None else None
+        unknown_token = self.unknown_usernames.begin_read() if self.unknown_usernames is not None else None
+        with self.session() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    self._sql("SELECT id, username, password_hash, email FROM users WHERE username = %s"),
+                    (username,)
                 )
+                user_data = cursor.fetchone()
+            finally:
+                cursor.close()
+
+        if user_data is None:
+            if self.unknown_usernames is not None:
+                self.unknown_usernames.add(username, unknown_token)
             return None
-        finally:
-            if connection:
-                connection.close()
-    
+
+        user_id, username, password_hash, email = user_data
+        user = User(
+            user_id=user_id,
+            username=username,
+            password_hash=password_hash,
+            email=email
+        )
+        if self.user_cache is not None:
+            self.user_cache.put(user, user_token)
+        return user
+
     def update_last_login(self, user_id):
         """更新用户最后登录时间"""
-        connection = None
         try:
-            connection = self._get_connection()
-            cursor = connection.cursor()
-            cursor.execute(
-                "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s", 
-                (user_id,)
-            )
-            connection.commit()
+            with self.session() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(
+                        self._sql("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s"),
+                        (user_id,)
+                    )
+                finally:
+                    cursor.close()
+                connection.commit()
             return True
         except Exception as e:
-            if connection:
-                connection.rollback()
+            # 连接池已回滚事务，连接不可用时会被丢弃
             print(f"更新最后登录时间失败: {str(e)}")
             return False
+
+    def update_password_hash(self, user_id, password_hash):
+        """更新用户的密码哈希值"""
+        self._update_user(user_id, "UPDATE users SET password_hash = %s WHERE id = %s", password_hash)
+
+    def update_email(self, user_id, email):
+        """更新用户的邮箱"""
+        self._update_user(user_id, "UPDATE users SET email = %s WHERE id = %s", email)
+
+    def _update_user(self, user_id, query, value):
+        try:
+            with self.session() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(self._sql(query), (value, user_id))
+                finally:
+                    cursor.close()
+                connection.commit()
         finally:
-            if connection:
-                connection.close()
-    
+            # 无论是否成功都使缓存失效，下次登录重新读取
+            self.invalidate_user(user_id)
+
+    def invalidate_user(self, user_id):
+        """
+        使该用户的缓存失效
+        在其他地方直接修改了 users 表（如修改密码、邮箱）后调用
+        """
+        if self.user_cache is not None:
+            self.user_cache.discard_id(user_id)
+
     def log_login_attempt(self, user_id, ip_address, user_agent, success, error_message=None):
         """记录登录尝试信息"""
-        connection = None
         try:
-            connection = self._get_connection()
-            cursor = connection.cursor()
-            cursor.execute(
-                """INSERT INTO login_logs 
-                   (user_id, ip_address, user_agent, success, error_message) 
-                   VALUES (%s, %s, %s, %s, %s)""",
-                (user_id, ip_address, user_agent, success, error_message)
-            )
-            connection.commit()
+            with self.session() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(
+                        self._sql("""INSERT INTO login_logs
+                           (user_id, ip_address, user_agent, success, error_message)
+                           VALUES (%s, %s, %s, %s, %s)"""),
+                        (user_id, ip_address, user_agent, success, error_message)
+                    )
+                finally:
+                    cursor.close()
+                connection.commit()
             return True
         except Exception as e:
-            if connection:
-                connection.rollback()
             print(f"记录登录日志失败: {str(e)}")
             return False
-        finally:
-            if connection:
-                connection.close()
+
+    def record_login(self, user_id, ip_address, user_agent, success, error_message=None, deferred=False):
+        """
+        记录一次登录：写入登录日志，登录成功时同时更新最后登录时间
+        两条语句在同一个连接、同一个事务中执行，只提交一次
+        deferred: 为True时放入后台队列批量写入，立即返回，不等待数据库
+        """
+        # 时间在调用时确定，延迟写入也记录真实的登录时间
+        record = (user_id, datetime.now(), ip_address, user_agent, success, error_message)
+        if deferred:
+            return self._get_audit_writer().write(record)
+        return self.write_login_records([record])
+
+    def _get_audit_writer(self):
+        with self._audit_lock:
+            if self._audit_writer is None:
+                options = {AUDIT_OPTIONS[key]: value for key, value in self.db_config.items()
+                           if key in AUDIT_OPTIONS}
+                self._audit_writer = AuditLogWriter(self.write_login_records, **options)
+            return self._audit_writer
+
+    def write_login_records(self, records):
+        """
+        批量写入登录记录，所有记录在一个事务中写入
+        整批失败时重试一次，仍失败则逐条写入，只丢弃本身写不进去的记录
+        records: (user_id, login_time, ip_address, user_agent, success, error_message) 元组列表
+        返回: 全部写入时为True
+        """
+        for attempt in (1, 2):
+            try:
+                self._insert_login_records(records)
+                return True
+            except Exception as e:
+                # 连接池已回滚事务并丢弃不可用的连接，重试时使用新连接
+                logger.warning("批量写入 %d 条登录记录失败（第%d次）: %s", len(records), attempt, e)
+        if len(records) == 1:
+            logger.error("登录记录写入失败，已丢弃: %r", records[0])
+            return False
+
+        lost = 0
+        for record in records:
+            try:
+                self._insert_login_records([record])
+            except Exception as e:
+                lost += 1
+                logger.error("登录记录写入失败，已丢弃: %r: %s", record, e)
+        return lost == 0
+
+    def _insert_login_records(self, records):
+        # 同一用户多次登录成功只需更新一次最后登录时间
+        last_logins = {}
+        for user_id, login_time, _, _, success, _ in records:
+            if success and (user_id not in last_logins or login_time > last_logins[user_id]):
+                last_logins[user_id] = login_time
+
+        with self.session() as connection:
+            cursor = connection.cursor()
+            try:
+                if last_logins:
+                    cursor.executemany(
+                        self._sql("UPDATE users SET last_login = %s WHERE id = %s"),
+                        [(login_time, user_id) for user_id, login_time in last_logins.items()]
+                    )
+                # 多行 INSERT，一批记录只需一条语句
+                cursor.execute(
+                    self._sql("""INSERT INTO login_logs
+                       (user_id, login_time, ip_address, user_agent, success, error_message)
+                       VALUES """ + ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(records))),
+                    [value for record in records for value in record]
+                )
+            finally:
+                cursor.close()
+            connection.commit()
+
+    def count_failed_logins(self, user_id, since):
+        """统计用户自 since 起的登录失败次数（使用 idx_login_logs_user_time 索引）"""
+        return self._count(
+            "SELECT COUNT(*) FROM login_logs WHERE user_id = %s AND login_time >= %s AND success = FALSE",
+            (user_id, since)
+        )
+
+    def count_login_attempts_by_ip(self, ip_address, since, failed_only=False):
+        """统计IP自 since 起的登录尝试次数（使用 idx_login_logs_ip_time 索引）"""
+        query = "SELECT COUNT(*) FROM login_logs WHERE ip_address = %s AND login_time >= %s"
+        if failed_only:
+            query += " AND success = FALSE"
+        return self._count(query, (ip_address, since))
+
+    def recent_login_attempts(self, user_id, limit=20):
+        """
+        用户最近的登录记录，按时间倒序
+        返回: (login_time, ip_address, user_agent, success, error_message) 元组列表
+        """
+        with self.session() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    self._sql("""SELECT login_time, ip_address, user_agent, success, error_message
+                       FROM login_logs WHERE user_id = %s
+                       ORDER BY login_time DESC LIMIT %s"""),
+                    (user_id, limit)
+                )
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def _count(self, query, params):
+        with self.session() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self._sql(query), params)
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+
+    def archive_login_logs(self, before, batch_size=5000):
+        """
+        把 before 之前的一批登录记录移到 login_logs_archive，一批在一个事务中完成
+        返回: 本批移动的记录数，为0时表示已全部归档
+        """
+        with self.session() as connection:
+            cursor = connection.cursor()
+            try:
+                # 按 idx_login_logs_time 索引取一批旧记录的id，每批锁定的行数有限
+                cursor.execute(
+                    self._sql("SELECT id FROM login_logs WHERE login_time < %s ORDER BY login_time LIMIT %s"),
+                    (before, batch_size)
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    return 0
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(
+                    self._sql(f"""INSERT INTO login_logs_archive
+                       (id, user_id, login_time, ip_address, user_agent, success, error_message)
+                       SELECT id, user_id, login_time, ip_address, user_agent, success, error_message
+                       FROM login_logs WHERE id IN ({placeholders})"""),
+                    ids
+                )
+                cursor.execute(self._sql(f"DELETE FROM login_logs WHERE id IN ({placeholders})"), ids)
+            finally:
+                cursor.close()
+            connection.commit()
+            return len(ids)
+
+    def close(self):
+        """写完后台队列中的登录记录，并关闭连接池中的连接"""
+        with self._audit_lock:
+            writer, self._audit_writer = self._audit_writer, None
+        if writer is not None:
+            writer.close()
+        self.pool.close()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内存占用测试脚本
+对比求职记录使用普通字典与 JobRecord（__slots__ + 字符串驻留）时的单条内存占用
+用法: python benchmark_job_record.py [记录数]
+"""
+
+import gc
+import json
+import random
+import sys
+import tracemalloc
+
+from job_record import JobRecord
+
+COMPANIES = ["阿里巴巴", "腾讯", "字节跳动", "百度", "美团", "京东", "网易", "小米"]
+POSITIONS = ["Python开发工程师", "Java后端工程师", "前端开发工程师", "数据分析师", "算法工程师"]
+LOCATIONS = ["北京", "上海", "深圳", "杭州", "广州", "成都"]
+SOURCES = ["拉勾网", "BOSS直聘", "猎聘", "内推", ""]
+STATUSES = ["已投递", "待面试", "面试中", "已通过", "已拒绝", "已放弃"]
+
+
+def generate_json(count):
+    """生成与 seven.py 数据文件格式相同的 JSON 文本"""
+    rng = random.Random(42)
+    jobs = []
+    for job_id in range(1, count + 1):
+        jobs.append({
+            'id': job_id,
+            'company': f"{rng.choice(COMPANIES)}{job_id}",
+            'position': rng.choice(POSITIONS),
+            'salary': f"{rng.randint(10, 30)}k-{rng.randint(31, 60)}k",
+            'location': rng.choice(LOCATIONS),
+            'apply_date': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'description': "",
+            'requirements': "",
+            'contact': "",
+            'phone': "",
+            'email': "",
+            'source': rng.choice(SOURCES),
+            'status': rng.choice(STATUSES),
+            'notes': "",
+            'update_time': "2024-06-01 12:00:00"
+        })
+    return json.dumps({'next_id': count + 1, 'jobs': jobs}, ensure_ascii=False)
+
+
+def measure(text, convert):
+    """解析 JSON 并按 convert 转换记录，返回保留下来的内存字节数"""
+    gc.collect()
+    tracemalloc.start()
+    jobs = convert(json.loads(text)['jobs'])
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, jobs
+
+
+def main():
+    """运行内存测试"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"生成 {count} 条测试记录...")
+    text = generate_json(count)
+
+    dict_size, dict_jobs = measure(text, lambda jobs: jobs)
+    record_size, record_jobs = measure(text, lambda jobs: [JobRecord.from_dict(job) for job in jobs])
+
+    # 校验无损往返
+    if [job.to_dict() for job in record_jobs] != dict_jobs:
+        print("JobRecord 与 JSON 往返结果不一致")
+        return 1
+
+    print("-" * 50)
+    print(f"{'存储方式':<20}{'总内存(MB)':>14}{'单条(字节)':>14}")
+    print("-" * 50)
+    print(f"{'dict':<20}{dict_size / 1024 / 1024:>14.1f}{dict_size / count:>14.0f}")
+    print(f"{'JobRecord':<20}{record_size / 1024 / 1024:>14.1f}{record_size / count:>14.0f}")
+    print("-" * 50)
+    print(f"内存减少: {(1 - record_size / dict_size) * 100:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
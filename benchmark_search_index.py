@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+搜索性能测试脚本
+对比 seven.py 中原有的线性扫描搜索与倒排索引搜索的耗时
+以及批处理 search 进程在没有索引文件（冷启动）和已有索引文件（热启动）时的耗时
+用法: python benchmark_search_index.py [记录数]
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from job_search_index import JobSearchIndex
+
+COMPANIES = ["阿里巴巴", "腾讯", "字节跳动", "百度", "美团", "京东", "网易", "小米", "华为", "拼多多",
+             "Microsoft", "Google", "Amazon", "Shopee", "SAP"]
+POSITIONS = ["Python开发工程师", "Java后端工程师", "前端开发工程师", "数据分析师", "算法工程师",
+             "测试开发工程师", "运维工程师", "产品经理", "Go开发工程师", "大数据开发工程师"]
+LOCATIONS = ["北京", "上海", "深圳", "杭州", "广州", "成都", "南京", "武汉", "西安", "苏州"]
+STATUSES = ["已投递", "待面试", "面试中", "已通过", "已拒绝", "已放弃"]
+
+QUERIES = [
+    {'company': '腾讯'},
+    {'position': 'python'},
+    {'location': '京'},
+    {'company': '字节', 'location': '北京'},
+    {'position': '工程师', 'status': '面试中'},
+    {'company': 'goo', 'position': '算法', 'location': '深圳', 'status': '已通过'},
+    {'company': '不存在的公司'},
+]
+
+
+def generate_jobs(count):
+    """生成测试用的求职记录"""
+    rng = random.Random(42)
+    jobs = []
+    for job_id in range(1, count + 1):
+        jobs.append({
+            'id': job_id,
+            'company': f"{rng.choice(COMPANIES)}{rng.randint(1, 500)}部",
+            'position': rng.choice(POSITIONS),
+            'location': rng.choice(LOCATIONS),
+            'status': rng.choice(STATUSES)
+        })
+    return jobs
+
+
+def linear_search(jobs, company='', position='', location='', status=''):
+    """原有的线性扫描搜索"""
+    company, position, location = company.lower(), position.lower(), location.lower()
+    results = []
+    for job in jobs:
+        match = True
+        if company and company not in job['company'].lower():
+            match = False
+        if position and position not in job['position'].lower():
+            match = False
+        if location and location not in job['location'].lower():
+            match = False
+        if status and status != job['status']:
+            match = False
+        if match:
+            results.append(job['id'])
+    return results
+
+
+def main():
+    """运行性能测试"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"生成 {count} 条测试记录...")
+    jobs = generate_jobs(count)
+    jobs_by_id = {job['id']: job for job in jobs}
+
+    start = time.perf_counter()
+    index = JobSearchIndex()
+    index.build(jobs)
+    print(f"建立索引耗时: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print("-" * 80)
+    print(f"{'查询条件':<50}{'结果数':>8}{'线性扫描(ms)':>12}{'索引(ms)':>10}")
+    print("-" * 80)
+    for query in QUERIES:
+        start = time.perf_counter()
+        expected = linear_search(jobs, **query)
+        linear_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        actual = index.search(jobs_by_id, **query)
+        index_ms = (time.perf_counter() - start) * 1000
+
+        if actual != expected:
+            print(f"结果不一致: {query}")
+            return 1
+
+        label = ', '.join(f"{k}={v}" for k, v in query.items())
+        print(f"{label:<50}{len(actual):>8}{linear_ms:>12.2f}{index_ms:>10.2f}")
+    print("-" * 80)
+
+    # 增量维护的耗时
+    start = time.perf_counter()
+    for job in jobs[:1000]:
+        index.remove(job)
+        job['status'] = '已放弃'
+        index.add(job)
+    print(f"增量更新1000条记录耗时: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return benchmark_search_process(generate_jobs(count))
+
+
+def benchmark_search_process(jobs):
+    """分别运行两次 seven.py search 进程：第一次建立并保存索引，第二次加载索引文件"""
+    seven = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seven.py')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_file = os.path.join(tmpdir, 'jobs.json')
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump({'generation': 1, 'next_id': len(jobs) + 1, 'jobs': jobs}, f, ensure_ascii=False)
+        command = [sys.executable, seven, '--data-file', data_file, 'search', '--company', '腾讯', '--limit', '1']
+
+        print("-" * 80)
+        for label in ("search 进程（冷启动，建立索引）", "search 进程（热启动，加载索引文件）"):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:<40}{elapsed:>10.1f} ms")
+            if not os.path.exists(data_file + '.idx'):
+                print("search 进程没有保存索引文件")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
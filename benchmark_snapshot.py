@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动性能测试脚本
+对比 seven.py 使用JSON数据文件和二进制快照时 JobApplicationSystem 的启动耗时
+用法: python benchmark_snapshot.py [记录数]
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from job_snapshot import json_to_snapshot
+from seven import JobApplicationSystem
+
+COMPANIES = ["阿里巴巴", "腾讯", "字节跳动", "百度", "美团", "京东", "网易", "小米"]
+POSITIONS = ["Python开发工程师", "Java后端工程师", "前端开发工程师", "数据分析师", "算法工程师"]
+LOCATIONS = ["北京", "上海", "深圳", "杭州", "广州", "成都"]
+STATUSES = ["已投递", "待面试", "面试中", "已通过", "已拒绝", "已放弃"]
+
+
+def write_json(path, count):
+    """生成与 seven.py 数据文件格式相同的 JSON 文件"""
+    rng = random.Random(42)
+    jobs = []
+    for job_id in range(1, count + 1):
+        jobs.append({
+            'id': job_id,
+            'company': f"{rng.choice(COMPANIES)}{job_id}",
+            'position': rng.choice(POSITIONS),
+            'salary': f"{rng.randint(10, 30)}k-{rng.randint(31, 60)}k",
+            'location': rng.choice(LOCATIONS),
+            'apply_date': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'description': "负责核心业务系统的设计与开发",
+            'requirements': "三年以上相关工作经验",
+            'contact': "",
+            'phone': "",
+            'email': "",
+            'source': "BOSS直聘",
+            'status': rng.choice(STATUSES),
+            'notes': "",
+            'update_time': "2024-06-01 12:00:00"
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'next_id': count + 1, 'jobs': jobs}, f, ensure_ascii=False, indent=2)
+
+
+def time_startup(data_file):
+    """返回创建 JobApplicationSystem 的耗时(秒)，屏蔽其输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        system = JobApplicationSystem(data_file)
+        elapsed = time.perf_counter() - start
+    return elapsed, system
+
+
+def main():
+    """运行启动性能测试"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file = os.path.join(tmp_dir, 'jobs.json')
+        snap_file = os.path.join(tmp_dir, 'jobs.snap')
+
+        print(f"生成 {count} 条测试记录...")
+        write_json(json_file, count)
+        json_to_snapshot(json_file, snap_file)
+
+        json_time, json_system = time_startup(json_file)
+        snap_time, snap_system = time_startup(snap_file)
+
+        # 抽查记录一致
+        for job_id in (1, count // 2, count):
+            if json_system._find_job_by_id(job_id) != snap_system._find_job_by_id(job_id):
+                print(f"记录 {job_id} 不一致")
+                return 1
+
+        print("-" * 50)
+        print(f"{'数据格式':<16}{'文件大小(MB)':>16}{'启动耗时(s)':>16}")
+        print("-" * 50)
+        print(f"{'JSON':<16}{os.path.getsize(json_file) / 1024 / 1024:>16.1f}{json_time:>16.3f}")
+        print(f"{'快照':<16}{os.path.getsize(snap_file) / 1024 / 1024:>16.1f}{snap_time:>16.3f}")
+        print("-" * 50)
+
+        snap_system._jobs_by_id.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
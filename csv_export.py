@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+流式CSV导出工具
+功能：按 RFC 4180 规则（逗号分隔、CRLF换行、必要时加双引号并转义）逐行生成CSV，
+内存占用与记录条数无关。供 seven.py 命令行导出和网页版的流式下载共用
+"""
+
+import csv
+
+# UTF-8 BOM，便于 Excel 正确识别中文
+BOM = '\ufeff'
+
+
+class _RowBuffer:
+    """csv.writer 的写入目标，暂存已生成的行文本"""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def take(self):
+        """取出并清空暂存的文本"""
+        text = ''.join(self.parts)
+        self.parts = []
+        return text
+
+
+def _cell(row, key):
+    """取出单元格的值：key 可以是字段名，也可以是接收整行的函数"""
+    value = key(row) if callable(key) else row[key]
+    return '' if value is None else value
+
+
+def iter_csv(rows, columns, bom=True, chunk_rows=500):
+    """
+    逐块生成CSV文本
+
+    Args:
+        rows: 记录的可迭代对象，每条记录支持 row[key] 访问（dict、sqlite3.Row 等）
+        columns: (表头, 字段名或取值函数) 的序列，决定导出的列及顺序
+        bom: 是否在开头输出 UTF-8 BOM
+        chunk_rows: 每块包含的行数
+
+    Yields:
+        str: CSV文本块
+    """
+    buffer = _RowBuffer()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+
+    if bom:
+        buffer.write(BOM)
+    writer.writerow([header for header, _ in columns])
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_cell(row, key) for _, key in columns])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.take()
+            pending = 0
+
+    tail = buffer.take()
+    if tail:
+        yield tail
+
+
+def write_csv(rows, fileobj, columns, bom=True):
+    """
+    将记录逐块写入已打开的文本文件（应以 newline='' 打开）
+
+    Returns:
+        int: 写入的记录条数
+    """
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    for chunk in iter_csv(counted(rows), columns, bom=bom):
+        fileobj.write(chunk)
+    return count
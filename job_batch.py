@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+命令行批处理工具
+功能：为 seven.py 和 job_management_system.py 的非交互子命令提供共用的输入输出：
+从文件或标准输入批量读取记录（JSON 数组、{"jobs": [...]} 或 JSON Lines），
+以 JSON 输出结果，并把系统的提示信息转到标准错误，保证标准输出只有 JSON
+"""
+
+import json
+import sys
+from contextlib import contextmanager, redirect_stdout
+
+
+def _open_input(source):
+    """打开输入文件，'-' 表示标准输入"""
+    if source == '-':
+        return sys.stdin, False
+    return open(source, 'r', encoding='utf-8'), True
+
+
+def read_records(source):
+    """
+    逐条读取记录
+
+    JSON Lines 格式逐行解析，内存占用与记录条数无关；
+    JSON 数组、{"jobs": [...]}（数据文件格式）或多行排版的单个记录对象需整体解析
+
+    Args:
+        source: 文件路径，'-' 表示标准输入
+
+    Yields:
+        dict: 记录
+
+    Raises:
+        ValueError: 输入格式错误，或输入中没有任何记录（避免导入了0条却报告成功）
+    """
+    count = 0
+    for record in _parse_records(source):
+        count += 1
+        yield record
+    if not count:
+        raise ValueError("输入中没有记录")
+
+
+def _parse_records(source):
+    """按输入格式逐条解析记录，见 read_records"""
+    f, should_close = _open_input(source)
+    try:
+        first = ''
+        for first in f:
+            if first.strip():
+                break
+
+        try:
+            record = json.loads(first)
+        except ValueError:
+            record = None
+
+        if isinstance(record, dict) and 'jobs' not in record:
+            # JSON Lines：每行一条记录
+            yield record
+            for line_no, line in enumerate(f, 2):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"第 {line_no} 行不是有效的JSON: {e}") from None
+                if not isinstance(record, dict):
+                    raise ValueError(f"第 {line_no} 行不是JSON对象")
+                yield record
+            return
+
+        text = first + f.read()
+        if not text.strip():
+            return
+        data = json.loads(text)
+        if isinstance(data, dict):
+            # 数据文件格式取 jobs 字段，否则是排版成多行的单条记录
+            data = data['jobs'] if 'jobs' in data else [data]
+        if not isinstance(data, list):
+            raise ValueError("输入应为JSON数组、JSON Lines 或包含 jobs 字段的对象")
+        for record in data:
+            if not isinstance(record, dict):
+                raise ValueError("记录应为JSON对象")
+            yield record
+    finally:
+        if should_close:
+            f.close()
+
+
+def read_ids(source):
+    """
+    读取记录ID列表：JSON 数组，或每行一个ID（也可以是带 id 字段的 JSON 对象）
+
+    Returns:
+        list: 记录ID
+    """
+    f, should_close = _open_input(source)
+    try:
+        text = f.read()
+    finally:
+        if should_close:
+            f.close()
+
+    stripped = text.strip()
+    if stripped.startswith('['):
+        items = json.loads(stripped)
+    else:
+        items = [json.loads(line) for line in stripped.splitlines() if line.strip()]
+
+    ids = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get('id')
+        if not isinstance(item, int) or isinstance(item, bool):
+            raise ValueError(f"无效的记录ID: {item!r}")
+        ids.append(item)
+    return ids
+
+
+def dump_json(data, stream=None):
+    """输出一个 JSON 值并换行"""
+    stream = stream or sys.stdout
+    json.dump(data, stream, ensure_ascii=False)
+    stream.write('\n')
+
+
+def dump_json_array(items, stream=None):
+    """
+    逐条输出 JSON 数组，无需先在内存中拼出整个列表
+
+    Returns:
+        int: 输出的条数
+    """
+    stream = stream or sys.stdout
+    stream.write('[')
+    count = 0
+    for item in items:
+        if count:
+            stream.write(',\n')
+        json.dump(item, stream, ensure_ascii=False)
+        count += 1
+    stream.write(']\n')
+    return count
+
+
+@contextmanager
+def quiet_stdout():
+    """
+    把代码块内 print 的提示信息转到标准错误
+
+    Yields:
+        标准输出流，JSON 结果应写到这里
+    """
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr):
+        yield stdout
+
+
+def parse_fields(pairs):
+    """把命令行的 字段=值 列表解析为字典"""
+    record = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition('=')
+        if not sep or not key:
+            raise ValueError(f"字段格式应为 字段=值: {pair}")
+        record[key] = value
+    return record
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+岗位变更推送
+功能：为 job_management_web.py 的 Server-Sent Events 接口分发岗位变更。
+一个后台线程轮询变更日志，把新提交的变更分发给所有订阅者，
+订阅者再多也只有一个轮询循环访问数据库；没有订阅者时线程自动退出
+"""
+
+import queue
+import threading
+import time
+
+from jobs_repository import JobRepository
+
+
+class Subscription:
+    """一个订阅者的变更队列"""
+
+    def __init__(self, maxsize, since):
+        self.queue = queue.Queue(maxsize)
+        # 订阅时已同步到的序号，新启动的轮询线程从全部订阅者中最小的序号开始
+        self.since = since
+        # 订阅者处理太慢、队列已满时被移除，需重新同步
+        self.overflowed = False
+
+    def get(self, timeout):
+        """
+        取出下一批变更
+
+        Returns:
+            list: JobChange 列表；超时时返回空列表，已被移除时返回None
+        """
+        if self.overflowed:
+            return None
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None if self.overflowed else []
+
+
+class ChangeFeed:
+    """变更日志的单线程轮询与分发"""
+
+    def __init__(self, connect, interval=0.5, batch_size=500, queue_size=100):
+        """
+        Args:
+            connect: 无参函数，返回新的数据库连接（在轮询线程中调用）
+            interval: 没有新变更时的轮询间隔（秒）
+            batch_size: 每次查询的最多变更条数
+            queue_size: 每个订阅者最多积压的批数
+        """
+        self._connect = connect
+        self.interval = interval
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, since):
+        """
+        添加订阅者，必要时启动轮询线程
+
+        Args:
+            since: 订阅者将从数据库补发到的起点序号。轮询线程启动后才读取起点，
+                如果从最新序号开始，订阅者补发之后、线程读取之前提交的变更就会漏掉；
+                因此从订阅者的序号开始，重复的变更由订阅者按序号跳过
+        """
+        subscription = Subscription(self.queue_size, since)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='job-change-feed', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """移除订阅者"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _publish(self, changes):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(changes)
+            except queue.Full:
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+
+    def _start_seq(self, repo):
+        """轮询的起点：订阅者中最小的序号"""
+        with self._lock:
+            watermarks = [subscription.since for subscription in self._subscribers]
+        if not watermarks:
+            return repo.latest_seq()
+        # 已被清理的变更无法补发，这样的订阅者补发时会收到 reset，不必等待它
+        return max(min(watermarks), repo.oldest_since())
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            repo = JobRepository(conn)
+            last_seq = self._start_seq(repo)
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        self._thread = None
+                        return
+                changes = repo.changes_since(last_seq, self.batch_size)
+                if changes:
+                    last_seq = changes[-1].seq
+                    self._publish(changes)
+                if len(changes) < self.batch_size:
+                    time.sleep(self.interval)
+        except Exception as e:
+            print(f"变更推送线程异常退出: {e}")
+            with self._lock:
+                self._thread = None
+                subscribers, self._subscribers = self._subscribers, set()
+            for subscription in subscribers:
+                subscription.overflowed = True
+        finally:
+            conn.close()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+数据文件多进程共享工具
+功能：为 seven.py 提供基于 fcntl 的建议性文件锁、写临时文件再重命名的原子写入，
+以及读取数据文件代数(generation)的轻量变更检测，使多个进程可以安全地共用同一个数据文件
+"""
+
+import json
+import os
+import re
+from contextlib import contextmanager
+
+from job_snapshot import HEADER, SnapshotReader, is_snapshot
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 等平台没有 fcntl，退化为不加锁
+    fcntl = None
+
+# JSON 数据文件开头的代数字段
+_GENERATION_PATTERN = re.compile(rb'^\s*\{\s*"generation"\s*:\s*(\d+)')
+
+
+class FileLock:
+    """
+    基于锁文件的建议性读写锁
+
+    读取时加共享锁，写入时加排他锁，只在实际读写文件期间持有，
+    不会把各进程的交互操作串行化
+    """
+
+    def __init__(self, lock_file):
+        self.lock_file = lock_file
+
+    @contextmanager
+    def _locked(self, operation):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, 'a') as f:
+            fcntl.flock(f.fileno(), operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def shared(self):
+        """共享锁（读）"""
+        return self._locked(fcntl.LOCK_SH if fcntl else None)
+
+    def exclusive(self):
+        """排他锁（写）"""
+        return self._locked(fcntl.LOCK_EX if fcntl else None)
+
+
+def atomic_write_json(path, data, compact=False):
+    """
+    先写同目录下的临时文件并落盘，再重命名覆盖目标文件，读者不会看到写了一半的文件
+
+    Args:
+        compact: 为True时不缩进、不留空格（索引、统计等供程序读取的文件）
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if compact:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_generation(path):
+    """
+    读取数据文件的代数，只读取文件开头几个字节
+
+    Returns:
+        int: 代数；文件不存在或没有代数字段（旧格式）时返回None
+    """
+    try:
+        if is_snapshot(path):
+            with open(path, 'rb') as f:
+                header = f.read(HEADER.size)
+            return SnapshotReader.generation_from_header(header)
+        with open(path, 'rb') as f:
+            head = f.read(256)
+    except OSError:
+        return None
+    match = _GENERATION_PATTERN.match(head)
+    return int(match.group(1)) if match else None
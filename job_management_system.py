@@ -7,26 +7,41 @@
 包含：岗位的添加、列表展示、筛选查询、删除和修改功能
 """
 
+import argparse
 import sqlite3
 import os
 import sys
 from datetime import datetime
 
+from csv_export import write_csv
+from jobs_repository import (
+    COLUMN_LABELS, JOB_FIELDS, DB_FILE, JobRepository, VersionConflict, connect
+)
+from job_batch import (
+    dump_json, dump_json_array, parse_fields, quiet_stdout, read_ids, read_records
+)
+
+# CSV导出的列：(表头, 字段名)
+CSV_COLUMNS = [(label, name) for name, label in COLUMN_LABELS.items()]
+
 class JobManagementSystem:
-    def __init__(self):
+    # 分页浏览时每页的条数
+    PAGE_SIZE = 20
+    
+    def __init__(self, db_file=DB_FILE):
         # 数据库文件名
-        self.db_file = 'job_management.db'
+        self.db_file = db_file
         # 连接数据库
         self.conn = None
-        self.cursor = None
+        self.repo = None
         self.connect_db()
         self.create_table()
     
     def connect_db(self):
         """连接到SQLite数据库"""
         try:
-            self.conn = sqlite3.connect(self.db_file)
-            self.cursor = self.conn.cursor()
+            self.conn = connect(self.db_file)
+            self.repo = JobRepository(self.conn)
             print(f"成功连接到数据库 {self.db_file}")
         except sqlite3.Error as e:
             print(f"数据库连接失败: {e}")
@@ -34,28 +49,11 @@ class JobManagementSystem:
     
     def create_table(self):
         """创建岗位表"""
-        create_table_sql = '''
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            company_name TEXT NOT NULL,
-            job_title TEXT NOT NULL,
-            salary TEXT,
-            requirements TEXT,
-            location TEXT,
-            posted_date DATE DEFAULT CURRENT_DATE,
-            description TEXT,
-            contact_person TEXT,
-            contact_phone TEXT,
-            email TEXT
-        );
-        '''
         try:
-            self.cursor.execute(create_table_sql)
-            self.conn.commit()
+            self.repo.create_schema()
             print("岗位表创建成功")
         except sqlite3.Error as e:
             print(f"创建表失败: {e}")
-            self.conn.rollback()
     
     def add_job(self):
         """添加新岗位"""
@@ -72,84 +70,47 @@ class JobManagementSystem:
             print("岗位名称不能为空")
             return
         
-        salary = input("薪资: ").strip()
-        requirements = input("具体要求: ").strip()
-        location = input("工作地点: ").strip()
-        description = input("岗位描述: ").strip()
-        contact_person = input("联系人: ").strip()
-        contact_phone = input("联系电话: ").strip()
-        email = input("电子邮箱: ").strip()
-        
-        # 插入数据
-        insert_sql = '''
-        INSERT INTO jobs (company_name, job_title, salary, requirements, location, 
-                         description, contact_person, contact_phone, email)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
+        record = {
+            'company_name': company_name,
+            'job_title': job_title,
+            'salary': input("薪资: ").strip(),
+            'requirements': input("具体要求: ").strip(),
+            'location': input("工作地点: ").strip(),
+            'description': input("岗位描述: ").strip(),
+            'contact_person': input("联系人: ").strip(),
+            'contact_phone': input("联系电话: ").strip(),
+            'email': input("电子邮箱: ").strip()
+        }
         
         try:
-            self.cursor.execute(insert_sql, (
-                company_name, job_title, salary, requirements, location,
-                description, contact_person, contact_phone, email
-            ))
-            self.conn.commit()
-            print(f"岗位添加成功！ID: {self.cursor.lastrowid}")
+            job_id = self.repo.insert(record)
+            print(f"岗位添加成功！ID: {job_id}")
         except sqlite3.Error as e:
             print(f"添加岗位失败: {e}")
-            self.conn.rollback()
+    
+    @staticmethod
+    def _print_job_rows(jobs):
+        """打印岗位摘要表格"""
+        print("-" * 80)
+        print(f"{'ID':<5}{'企业名称':<20}{'岗位名称':<20}{'薪资':<10}{'地点':<10}{'发布日期':<10}")
+        print("-" * 80)
+        for job in jobs:
+            print(f"{job.id:<5}{job.company_name:<20}{job.job_title:<20}{job.salary or '':<10}"
+                  f"{job.location or '':<10}{job.posted_date or '':<10}")
+        print("-" * 80)
     
     def list_jobs(self, filter_criteria=None):
         """列出岗位，支持筛选"""
         print("\n=== 岗位列表 ===")
         
-        # 构建查询SQL
-        base_query = """
-        SELECT id, company_name, job_title, salary, location, posted_date 
-        FROM jobs
-        """
-        
-        if filter_criteria:
-            # 根据筛选条件构建WHERE子句
-            conditions = []
-            params = []
-            
-            if filter_criteria.get('company_name'):
-                conditions.append("company_name LIKE ?")
-                params.append(f"%{filter_criteria['company_name']}%")
-            
-            if filter_criteria.get('job_title'):
-                conditions.append("job_title LIKE ?")
-                params.append(f"%{filter_criteria['job_title']}%")
-            
-            if filter_criteria.get('location'):
-                conditions.append("location LIKE ?")
-                params.append(f"%{filter_criteria['location']}%")
-            
-            if conditions:
-                base_query += " WHERE " + " AND ".join(conditions)
-        else:
-            params = []
-        
-        base_query += " ORDER BY posted_date DESC"
-        
         try:
-            self.cursor.execute(base_query, params)
-            jobs = self.cursor.fetchall()
+            jobs = list(self.repo.search(filter_criteria))
             
             if not jobs:
                 print("没有找到岗位记录")
                 return []
             
-            # 打印表头
-            print("-" * 80)
-            print(f"{'ID':<5}{'企业名称':<20}{'岗位名称':<20}{'薪资':<10}{'地点':<10}{'发布日期':<10}")
-            print("-" * 80)
-            
-            # 打印岗位列表
-            for job in jobs:
-                print(f"{job[0]:<5}{job[1]:<20}{job[2]:<20}{job[3] or '':<10}{job[4] or '':<10}{job[5]:<10}")
-            
-            print("-" * 80)
+            self._print_job_rows(jobs)
             print(f"共找到 {len(jobs)} 条记录")
             
             return jobs
@@ -157,6 +118,33 @@ class JobManagementSystem:
             print(f"查询岗位失败: {e}")
             return []
     
+    def browse_jobs(self):
+        """分页浏览岗位，每次只查询一页"""
+        print("\n=== 岗位列表 ===")
+        
+        try:
+            total = self.repo.count()
+            if not total:
+                print("没有找到岗位记录")
+                return
+            
+            before_id = None
+            shown = 0
+            while True:
+                jobs = self.repo.page(before_id, self.PAGE_SIZE)
+                if not jobs:
+                    break
+                self._print_job_rows(jobs)
+                shown += len(jobs)
+                before_id = jobs[-1].id
+                print(f"已显示 {shown}/{total} 条记录")
+                if shown >= total:
+                    break
+                if input("回车查看下一页，输入 q 结束浏览: ").strip().lower() == 'q':
+                    break
+        except sqlite3.Error as e:
+            print(f"查询岗位失败: {e}")
+    
     def search_jobs(self):
         """搜索岗位"""
         print("\n=== 搜索岗位 ===")
@@ -177,47 +165,52 @@ class JobManagementSystem:
     
     def view_job_detail(self, job_id):
         """查看岗位详细信息"""
-        select_sql = """
-        SELECT * FROM jobs WHERE id = ?
-        """
-        
         try:
-            self.cursor.execute(select_sql, (job_id,))
-            job = self.cursor.fetchone()
+            job = self.repo.get(job_id)
             
             if not job:
                 print(f"未找到ID为 {job_id} 的岗位")
                 return None
             
             print("\n=== 岗位详细信息 ===")
-            print(f"ID: {job[0]}")
-            print(f"企业名称: {job[1]}")
-            print(f"岗位名称: {job[2]}")
-            print(f"薪资: {job[3] or '未填写'}")
-            print(f"具体要求: {job[4] or '未填写'}")
-            print(f"工作地点: {job[5] or '未填写'}")
-            print(f"发布日期: {job[6]}")
-            print(f"岗位描述: {job[7] or '未填写'}")
-            print(f"联系人: {job[8] or '未填写'}")
-            print(f"联系电话: {job[9] or '未填写'}")
-            print(f"电子邮箱: {job[10] or '未填写'}")
+            print(f"ID: {job.id}")
+            print(f"企业名称: {job.company_name}")
+            print(f"岗位名称: {job.job_title}")
+            print(f"薪资: {job.salary or '未填写'}")
+            print(f"具体要求: {job.requirements or '未填写'}")
+            print(f"工作地点: {job.location or '未填写'}")
+            print(f"发布日期: {job.posted_date}")
+            print(f"岗位描述: {job.description or '未填写'}")
+            print(f"联系人: {job.contact_person or '未填写'}")
+            print(f"联系电话: {job.contact_phone or '未填写'}")
+            print(f"电子邮箱: {job.email or '未填写'}")
+            print(f"状态: {job.status or '未填写'}")
             
             return job
         except sqlite3.Error as e:
             print(f"查询岗位详情失败: {e}")
             return None
     
-    def update_job(self):
-        """更新岗位信息"""
-        print("\n=== 更新岗位信息 ===")
-        
-        # 先显示所有岗位
-        self.list_jobs()
+    def _prompt_job_id(self, action):
+        """输入要操作的岗位ID，可先分页浏览岗位列表；输入无效时返回None"""
+        while True:
+            choice = input(f"请输入要{action}的岗位ID (输入 l 分页浏览岗位列表): ").strip()
+            if choice.lower() != 'l':
+                break
+            self.browse_jobs()
         
         try:
-            job_id = int(input("请输入要更新的岗位ID: ").strip())
+            return int(choice)
         except ValueError:
             print("无效的ID")
+            return None
+    
+    def update_job(self):
+        """更新岗位信息"""
+        print("\n=== 更新岗位信息 ===")
+        
+        job_id = self._prompt_job_id("更新")
+        if job_id is None:
             return
         
         # 检查岗位是否存在
@@ -227,47 +220,46 @@ class JobManagementSystem:
         
         print("\n请输入更新信息 (留空表示不修改):")
         
-        # 获取用户输入，允许留空表示不修改
-        company_name = input(f"企业名称 [{job[1]}]: ").strip() or job[1]
-        job_title = input(f"岗位名称 [{job[2]}]: ").strip() or job[2]
-        salary = input(f"薪资 [{job[3] or '未填写'}]: ").strip() or job[3]
-        requirements = input(f"具体要求 [{job[4] or '未填写'}]: ").strip() or job[4]
-        location = input(f"工作地点 [{job[5] or '未填写'}]: ").strip() or job[5]
-        description = input(f"岗位描述 [{job[7] or '未填写'}]: ").strip() or job[7]
-        contact_person = input(f"联系人 [{job[8] or '未填写'}]: ").strip() or job[8]
-        contact_phone = input(f"联系电话 [{job[9] or '未填写'}]: ").strip() or job[9]
-        email = input(f"电子邮箱 [{job[10] or '未填写'}]: ").strip() or job[10]
+        # 获取用户输入，只记录有修改的字段
+        prompts = [
+            ('company_name', "企业名称"),
+            ('job_title', "岗位名称"),
+            ('salary', "薪资"),
+            ('requirements', "具体要求"),
+            ('location', "工作地点"),
+            ('description', "岗位描述"),
+            ('contact_person', "联系人"),
+            ('contact_phone', "联系电话"),
+            ('email', "电子邮箱")
+        ]
+        changes = {}
+        for field, label in prompts:
+            current = getattr(job, field)
+            value = input(f"{label} [{current or '未填写'}]: ").strip()
+            if value and value != current:
+                changes[field] = value
         
-        # 更新数据
-        update_sql = """
-        UPDATE jobs SET 
-            company_name = ?, job_title = ?, salary = ?, requirements = ?, 
-            location = ?, description = ?, contact_person = ?, contact_phone = ?, email = ?
-        WHERE id = ?
-        """
+        if not changes:
+            print("没有需要修改的内容")
+            return
         
         try:
-            self.cursor.execute(update_sql, (
-                company_name, job_title, salary, requirements, location,
-                description, contact_person, contact_phone, email, job_id
-            ))
-            self.conn.commit()
-            print(f"岗位 {job_id} 更新成功")
+            # 只有在输入期间没有其他人修改过该岗位时才写入
+            if self.repo.update(job_id, changes, expected_version=job.version):
+                print(f"岗位 {job_id} 更新成功")
+            else:
+                print(f"未找到ID为 {job_id} 的岗位")
+        except VersionConflict:
+            print(f"岗位 {job_id} 在您编辑期间已被其他人修改，未保存本次修改，请重新编辑")
         except sqlite3.Error as e:
             print(f"更新岗位失败: {e}")
-            self.conn.rollback()
     
     def delete_job(self):
         """删除岗位"""
         print("\n=== 删除岗位 ===")
         
-        # 先显示所有岗位
-        self.list_jobs()
-        
-        try:
-            job_id = int(input("请输入要删除的岗位ID: ").strip())
-        except ValueError:
-            print("无效的ID")
+        job_id = self._prompt_job_id("删除")
+        if job_id is None:
             return
         
         # 检查岗位是否存在
@@ -276,21 +268,124 @@ class JobManagementSystem:
             return
         
         # 确认删除
-        confirm = input(f"确定要删除'{job[1]} - {job[2]}'吗？(y/n): ").strip().lower()
+        confirm = input(f"确定要删除'{job.company_name} - {job.job_title}'吗？(y/n): ").strip().lower()
         if confirm != 'y':
             print("已取消删除")
             return
         
-        # 删除数据
-        delete_sql = "DELETE FROM jobs WHERE id = ?"
-        
         try:
-            self.cursor.execute(delete_sql, (job_id,))
-            self.conn.commit()
-            print(f"岗位 {job_id} 删除成功")
+            if self.repo.delete(job_id):
+                print(f"岗位 {job_id} 删除成功")
+            else:
+                print(f"未找到ID为 {job_id} 的岗位")
         except sqlite3.Error as e:
             print(f"删除岗位失败: {e}")
-            self.conn.rollback()
+    
+    def iter_jobs(self, filter_criteria=None, limit=None):
+        """
+        逐行返回岗位的全部字段（字典），不打印，供批处理使用
+        
+        Args:
+            filter_criteria: 与 list_jobs 相同的筛选条件
+            limit: 最多返回的条数
+        """
+        for job in self.repo.search(filter_criteria, newest_first=False, limit=limit):
+            yield job._asdict()
+    
+    @staticmethod
+    def _check_fields(record, index):
+        """
+        校验批量输入的字段名，返回要写入的字段字典
+
+        id 和 version 转换为整数（命令行 -f 传入的值是字符串），原地写回记录
+        """
+        unknown = [key for key in record if key not in ('id', 'version') and key not in JOB_FIELDS]
+        if unknown:
+            raise ValueError(f"第 {index} 条记录: 不支持的字段 {', '.join(unknown)}")
+        for key in ('id', 'version'):
+            value = record.get(key)
+            if value is None:
+                continue
+            try:
+                if isinstance(value, (bool, float)):
+                    raise ValueError
+                record[key] = int(value)
+            except ValueError:
+                raise ValueError(f"第 {index} 条记录: {key} 必须是整数: {value!r}") from None
+        for field in ('company_name', 'job_title'):
+            if field in record and not record[field]:
+                raise ValueError(f"第 {index} 条记录: {field} 不能为空")
+        return {key: record[key] for key in JOB_FIELDS if key in record}
+    
+    def insert_jobs(self, records, keep_ids=False):
+        """
+        在一个事务中批量添加岗位，任一记录出错时全部回滚
+        
+        Args:
+            records: 记录字典的可迭代对象
+            keep_ids: 为True时保留记录自带的ID（导入时使用），ID已存在时覆盖原记录
+        
+        Returns:
+            list: 新岗位的ID
+        """
+        def checked():
+            # 边读取边校验，出错时异常在事务内抛出，已写入的记录全部回滚
+            for index, record in enumerate(records, 1):
+                self._check_fields(record, index)
+                if not record.get('company_name') or not record.get('job_title'):
+                    raise ValueError(f"第 {index} 条记录: 企业名称和岗位名称不能为空")
+                yield record
+        
+        return self.repo.insert_many(checked(), keep_ids=keep_ids)
+    
+    def update_jobs(self, records):
+        """
+        在一个事务中批量更新岗位，每条记录需包含 id 及要修改的字段，
+        带 version 时只在岗位版本号一致时更新，任一记录出错或冲突时全部回滚
+        
+        Returns:
+            int: 更新的岗位条数
+        """
+        def checked():
+            for index, record in enumerate(records, 1):
+                if not self._check_fields(record, index):
+                    raise ValueError(f"第 {index} 条记录: 没有要修改的字段")
+                yield record
+        
+        try:
+            return self.repo.update_many(checked())
+        except KeyError as e:
+            raise ValueError(f"未找到ID为 {e.args[0]} 的岗位") from None
+        except VersionConflict as e:
+            raise ValueError(str(e)) from None
+    
+    def delete_jobs(self, job_ids):
+        """
+        在一个事务中批量删除岗位，任一ID不存在时全部回滚
+        
+        Returns:
+            int: 删除的岗位条数
+        """
+        try:
+            return self.repo.delete_many(job_ids)
+        except KeyError as e:
+            raise ValueError(f"未找到ID为 {', '.join(map(str, e.args[0]))} 的岗位") from None
+    
+    def statistics_summary(self):
+        """返回岗位统计：总数及按地点、企业、发布月份的分布"""
+        return {
+            'total': self.repo.count(),
+            'location_counts': self.repo.grouped_counts('location', 10),
+            'company_counts': self.repo.grouped_counts('company_name', 10),
+            'monthly_counts': dict(sorted(self.repo.grouped_counts("strftime('%Y-%m', posted_date)").items()))
+        }
+    
+    def close(self):
+        """关闭数据库连接"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+            print("数据库连接已关闭")
     
     def display_menu(self):
         """显示菜单"""
@@ -315,7 +410,7 @@ class JobManagementSystem:
             if choice == '1':
                 self.add_job()
             elif choice == '2':
-                self.list_jobs()
+                self.browse_jobs()
                 
                 # 询问是否查看详情
                 job_id_input = input("\n输入岗位ID查看详情 (留空返回): ").strip()
@@ -351,13 +446,125 @@ class JobManagementSystem:
     
     def __del__(self):
         """关闭数据库连接"""
-        if self.conn:
-            self.conn.close()
-            print("数据库连接已关闭")
+        self.close()
+
+
+def build_parser():
+    """构建非交互的批处理命令行"""
+    parser = argparse.ArgumentParser(
+        description="岗位管理系统（批处理模式，结果以JSON输出；不带参数运行时进入交互菜单）"
+    )
+    parser.add_argument('--db', default=DB_FILE, help="数据库文件 (默认: %(default)s)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    sub = subparsers.add_parser('add', help="添加岗位")
+    sub.add_argument('--file', help="从文件批量读取记录，'-' 表示标准输入")
+    sub.add_argument('-f', '--field', action='append', metavar='字段=值', help="单条记录的字段，可重复")
+    
+    for name, help_text in (('list', "列出岗位"), ('search', "搜索岗位")):
+        sub = subparsers.add_parser(name, help=help_text)
+        if name == 'search':
+            sub.add_argument('--company-name', default='', help="企业名称（模糊匹配）")
+            sub.add_argument('--job-title', default='', help="岗位名称（模糊匹配）")
+            sub.add_argument('--location', default='', help="工作地点（模糊匹配）")
+        sub.add_argument('--limit', type=int, help="最多输出的条数")
+    
+    sub = subparsers.add_parser('update', help="更新岗位（每条记录需包含 id）")
+    sub.add_argument('--file', help="从文件批量读取记录，'-' 表示标准输入")
+    sub.add_argument('--id', type=int, help="单条更新的岗位ID")
+    sub.add_argument('-f', '--field', action='append', metavar='字段=值', help="要修改的字段，可重复")
+    
+    sub = subparsers.add_parser('delete', help="删除岗位")
+    sub.add_argument('ids', nargs='*', type=int, help="岗位ID")
+    sub.add_argument('--file', help="从文件读取ID（JSON数组或每行一个），'-' 表示标准输入")
+    
+    sub = subparsers.add_parser('import', help="导入岗位，保留原ID（ID已存在时覆盖）")
+    sub.add_argument('file', help="JSON 数组或 JSON Lines，'-' 表示标准输入")
+    
+    sub = subparsers.add_parser('export', help="导出全部岗位")
+    sub.add_argument('--format', choices=['json', 'csv'], default='json', help="导出格式 (默认: %(default)s)")
+    sub.add_argument('-o', '--output', help="输出文件，默认输出到标准输出")
+    
+    subparsers.add_parser('stats', help="统计信息")
+    return parser
+
+
+def _batch_records(args):
+    """取得 add/update 子命令的输入记录"""
+    if args.file:
+        return read_records(args.file)
+    record = parse_fields(args.field)
+    if getattr(args, 'id', None) is not None:
+        record['id'] = args.id
+    if not record:
+        raise ValueError("请通过 --file 或 -f 字段=值 提供记录")
+    return [record]
+
+
+def run_batch(argv):
+    """
+    执行批处理子命令，每个子命令的全部修改在一个事务中完成
+    
+    Returns:
+        int: 退出码，0 表示成功
+    """
+    args = build_parser().parse_args(argv)
+    
+    with quiet_stdout() as out:
+        system = JobManagementSystem(args.db)
+        try:
+            command = args.command
+            
+            if command in ('add', 'import'):
+                records = read_records(args.file) if command == 'import' else _batch_records(args)
+                job_ids = system.insert_jobs(records, keep_ids=command == 'import')
+                result = {'added': len(job_ids), 'ids': job_ids}
+            elif command == 'update':
+                result = {'updated': system.update_jobs(_batch_records(args))}
+            elif command == 'delete':
+                job_ids = list(args.ids) + (read_ids(args.file) if args.file else [])
+                result = {'deleted': system.delete_jobs(job_ids)}
+            elif command in ('list', 'search'):
+                filter_criteria = None
+                if command == 'search':
+                    filter_criteria = {
+                        'company_name': args.company_name,
+                        'job_title': args.job_title,
+                        'location': args.location
+                    }
+                dump_json_array(system.iter_jobs(filter_criteria, args.limit), out)
+                return 0
+            elif command == 'export':
+                f = open(args.output, 'w', newline='', encoding='utf-8') if args.output else out
+                try:
+                    if args.format == 'csv':
+                        count = write_csv(system.iter_jobs(), f, CSV_COLUMNS, bom=bool(args.output))
+                    else:
+                        count = dump_json_array(system.iter_jobs(), f)
+                finally:
+                    if args.output:
+                        f.close()
+                if not args.output:
+                    return 0
+                result = {'exported': count, 'file': args.output}
+            else:
+                result = system.statistics_summary()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"错误: {e}")
+            return 1
+        finally:
+            system.close()
+        
+        dump_json(result, out)
+    return 0
 
 
 def main():
     """主函数"""
+    if len(sys.argv) > 1:
+        # 带参数运行时进入批处理模式
+        sys.exit(run_batch(sys.argv[1:]))
+    
     print("欢迎使用岗位管理系统！")
     print("本系统用于训练数据库的增删改查操作")
     
@@ -373,4 +580,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
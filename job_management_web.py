@@ -8,12 +8,18 @@
 使用Flask框架实现Web界面
 """
 
+import json
 import sqlite3
 import os
 import sys
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify
 from flask_cors import CORS  # 添加CORS支持
+from csv_export import iter_csv
+from job_change_feed import ChangeFeed
+from jobs_repository import (
+    COLUMN_LABELS, DB_FILE, DEFAULT_STATUS, JOB_FIELDS, JobRepository, VersionConflict, connect
+)
 
 # 创建Flask应用实例
 app = Flask(__name__)
@@ -22,60 +28,39 @@ app.secret_key = 'job_management_system_secret_key_2024'  # 用于flash消息的
 # 启用CORS支持，允许前端从不同端口访问API
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
-# 数据库文件名
-DB_FILE = 'job_management.db'
+# CSV导出可选的列：字段名 -> 表头，顺序即默认导出顺序
+CSV_EXPORT_COLUMNS = COLUMN_LABELS
+
+# 变更接口每次最多返回的条数
+CHANGES_PAGE_SIZE = 500
+# 按ID批量查询岗位时一次最多的ID个数
+MAX_BATCH_IDS = 500
+# 变更推送没有新变更时发送心跳的间隔（秒），防止代理断开空闲连接
+SSE_KEEPALIVE_SECONDS = 15
 
 # 初始化数据库表（仅在应用启动时执行一次）
 def init_database():
     """初始化数据库并创建表"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    create_table_sql = '''
-    CREATE TABLE IF NOT EXISTS jobs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company_name TEXT NOT NULL,
-        job_title TEXT NOT NULL,
-        salary TEXT,
-        requirements TEXT,
-        location TEXT,
-        posted_date DATE DEFAULT CURRENT_DATE,
-        description TEXT,
-        contact_person TEXT,
-        contact_phone TEXT,
-        email TEXT,
-        status TEXT DEFAULT '待申请',
-        application_date DATE,
-        notes TEXT,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    '''
-    
+    conn = connect(DB_FILE)
     try:
-        cursor.execute(create_table_sql)
-        conn.commit()
+        repo = JobRepository(conn)
+        repo.create_schema()
         print("岗位表创建成功")
+        pruned = repo.prune_changes()
+        if pruned:
+            print(f"已清理 {pruned} 条过期的变更日志")
     except sqlite3.Error as e:
         print(f"创建表失败: {e}")
-        conn.rollback()
     finally:
         conn.close()
 
 # 获取数据库连接（为每个请求创建独立连接）
 def get_db_connection():
     """获取数据库连接"""
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row  # 允许通过列名访问
-    return conn
+    return connect(DB_FILE)
 
-# 确保数据库连接在请求结束后关闭
-@app.teardown_appcontext
-def close_connection(exception):
-    conn = sqlite3.connect(DB_FILE)
-    try:
-        conn.close()
-    except:
-        pass
+# 所有变更推送连接共用一个轮询线程
+change_feed = ChangeFeed(get_db_connection)
 
 @app.route('/job_tracker.html')
 def job_tracker():
@@ -86,6 +71,13 @@ def job_tracker():
     with open(file_path, 'r', encoding='utf-8') as f:
         return f.read()
 
+@app.route('/job_tracker_benchmark.html')
+def job_tracker_benchmark():
+    """岗位跟踪器性能测试页面路由"""
+    file_path = os.path.join(app.root_path, 'job_tracker_benchmark.html')
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
 @app.route('/api_test.html')
 def api_test():
     """API测试页面"""
@@ -106,47 +98,21 @@ def index():
     job_title = request.args.get('job_title', '').strip()
     location = request.args.get('location', '').strip()
     
-    # 构建查询SQL
-    base_query = """
-    SELECT id, company_name, job_title, salary, location, posted_date 
-    FROM jobs
-    """
-    
-    conditions = []
-    params = []
-    
-    if company_name:
-        conditions.append("company_name LIKE ?")
-        params.append(f"%{company_name}%")
-    if job_title:
-        conditions.append("job_title LIKE ?")
-        params.append(f"%{job_title}%")
-    if location:
-        conditions.append("location LIKE ?")
-        params.append(f"%{location}%")
-    
-    if conditions:
-        base_query += " WHERE " + " AND ".join(conditions)
-    
-    base_query += " ORDER BY posted_date DESC"
+    filter_criteria = {'company_name': company_name, 'job_title': job_title, 'location': location}
     
     # 获取数据库连接
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(base_query, params)
-        jobs = cursor.fetchall()
-        
         # 将结果转换为字典列表，方便模板使用
         job_list = []
-        for job in jobs:
+        for job in JobRepository(conn).search(filter_criteria):
             job_list.append({
-                'id': job[0],
-                'company_name': job[1],
-                'job_title': job[2],
-                'salary': job[3] or '',
-                'location': job[4] or '',
-                'posted_date': job[5]
+                'id': job.id,
+                'company_name': job.company_name,
+                'job_title': job.job_title,
+                'salary': job.salary or '',
+                'location': job.location or '',
+                'posted_date': job.posted_date
             })
         
         return render_template('index.html', jobs=job_list, 
@@ -159,46 +125,34 @@ def index():
     finally:
         conn.close()
 
+def _form_record(source):
+    """从表单或JSON数据中取出岗位的可编辑字段"""
+    return {
+        field: (source.get(field) or '').strip()
+        for field in ('company_name', 'job_title', 'salary', 'requirements', 'location',
+                      'description', 'contact_person', 'contact_phone', 'email')
+    }
+
 @app.route('/add_job', methods=['GET', 'POST'])
 def add_job():
     """添加新岗位"""
     if request.method == 'POST':
         # 获取表单数据
-        company_name = request.form.get('company_name', '').strip()
-        job_title = request.form.get('job_title', '').strip()
-        salary = request.form.get('salary', '').strip()
-        requirements = request.form.get('requirements', '').strip()
-        location = request.form.get('location', '').strip()
-        description = request.form.get('description', '').strip()
-        contact_person = request.form.get('contact_person', '').strip()
-        contact_phone = request.form.get('contact_phone', '').strip()
-        email = request.form.get('email', '').strip()
+        record = _form_record(request.form)
         
         # 验证必填字段
-        if not company_name:
+        if not record['company_name']:
             flash('企业名称不能为空')
             return render_template('add_job.html')
-        if not job_title:
+        if not record['job_title']:
             flash('岗位名称不能为空')
             return render_template('add_job.html')
         
-        # 插入数据
-        insert_sql = '''
-        INSERT INTO jobs (company_name, job_title, salary, requirements, location, 
-                         description, contact_person, contact_phone, email)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        
         # 获取数据库连接
         conn = get_db_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(insert_sql, (
-                company_name, job_title, salary, requirements, location,
-                description, contact_person, contact_phone, email
-            ))
-            conn.commit()
-            flash(f"岗位添加成功！ID: {cursor.lastrowid}")
+            job_id = JobRepository(conn).insert(record)
+            flash(f"岗位添加成功！ID: {job_id}")
             return redirect(url_for('index'))
         except sqlite3.Error as e:
             flash(f"添加岗位失败: {str(e)}")
@@ -211,16 +165,10 @@ def add_job():
 @app.route('/view_job/<int:job_id>')
 def view_job(job_id):
     """查看岗位详细信息"""
-    select_sql = """
-    SELECT * FROM jobs WHERE id = ?
-    """
-    
     # 获取数据库连接
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(select_sql, (job_id,))
-        job = cursor.fetchone()
+        job = JobRepository(conn).get(job_id)
         
         if not job:
             flash(f"未找到ID为 {job_id} 的岗位")
@@ -228,17 +176,17 @@ def view_job(job_id):
         
         # 将结果转换为字典
         job_details = {
-            'id': job[0],
-            'company_name': job[1],
-            'job_title': job[2],
-            'salary': job[3] or '未填写',
-            'requirements': job[4] or '未填写',
-            'location': job[5] or '未填写',
-            'posted_date': job[6],
-            'description': job[7] or '未填写',
-            'contact_person': job[8] or '未填写',
-            'contact_phone': job[9] or '未填写',
-            'email': job[10] or '未填写'
+            'id': job.id,
+            'company_name': job.company_name,
+            'job_title': job.job_title,
+            'salary': job.salary or '未填写',
+            'requirements': job.requirements or '未填写',
+            'location': job.location or '未填写',
+            'posted_date': job.posted_date,
+            'description': job.description or '未填写',
+            'contact_person': job.contact_person or '未填写',
+            'contact_phone': job.contact_phone or '未填写',
+            'email': job.email or '未填写'
         }
         
         return render_template('view_job.html', job=job_details)
@@ -253,45 +201,35 @@ def update_job(job_id):
     """更新岗位信息"""
     if request.method == 'POST':
         # 获取表单数据
-        company_name = request.form.get('company_name', '').strip()
-        job_title = request.form.get('job_title', '').strip()
-        salary = request.form.get('salary', '').strip()
-        requirements = request.form.get('requirements', '').strip()
-        location = request.form.get('location', '').strip()
-        description = request.form.get('description', '').strip()
-        contact_person = request.form.get('contact_person', '').strip()
-        contact_phone = request.form.get('contact_phone', '').strip()
-        email = request.form.get('email', '').strip()
+        record = _form_record(request.form)
         
         # 验证必填字段
-        if not company_name:
+        if not record['company_name']:
             flash('企业名称不能为空')
             return redirect(url_for('update_job', job_id=job_id))
-        if not job_title:
+        if not record['job_title']:
             flash('岗位名称不能为空')
             return redirect(url_for('update_job', job_id=job_id))
         
-        # 更新数据
-        update_sql = '''
-        UPDATE jobs SET company_name=?, job_title=?, salary=?, requirements=?, location=?,
-                       description=?, contact_person=?, contact_phone=?, email=?,
-                       status=?, application_date=?, notes=?, updated_at=CURRENT_TIMESTAMP
-        WHERE id=?
-        '''
+        # 表单未包含的跟踪字段保持原值
+        for field in ('status', 'application_date', 'notes'):
+            if field in request.form:
+                record[field] = request.form[field]
+        
+        # 表单中的版本号用于检测编辑期间是否有人修改过该岗位
+        expected_version = request.form.get('version', type=int)
         
         # 获取数据库连接
         conn = get_db_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(update_sql, (
-                company_name, job_title, salary, requirements, location,
-                description, contact_person, contact_phone, email,
-                request.form.get('status', '待申请'), request.form.get('application_date'), request.form.get('notes'),
-                job_id
-            ))
-            conn.commit()
+            if not JobRepository(conn).update(job_id, record, expected_version):
+                flash(f"未找到ID为 {job_id} 的岗位")
+                return redirect(url_for('index'))
             flash(f"岗位 {job_id} 更新成功！")
             return redirect(url_for('view_job', job_id=job_id))
+        except VersionConflict:
+            flash(f"岗位 {job_id} 在您编辑期间已被其他人修改，请在最新内容的基础上重新编辑")
+            return redirect(url_for('update_job', job_id=job_id))
         except sqlite3.Error as e:
             flash(f"更新岗位失败: {str(e)}")
             return redirect(url_for('update_job', job_id=job_id))
@@ -299,16 +237,9 @@ def update_job(job_id):
             conn.close()
     
     # GET 请求：获取岗位当前信息
-    select_sql = """
-    SELECT * FROM jobs WHERE id = ?
-    """
-    
-    # 获取数据库连接
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(select_sql, (job_id,))
-        job = cursor.fetchone()
+        job = JobRepository(conn).get(job_id)
         
         if not job:
             flash(f"未找到ID为 {job_id} 的岗位")
@@ -316,20 +247,21 @@ def update_job(job_id):
         
         # 将结果转换为字典
         job_details = {
-            'id': job[0],
-            'company_name': job[1],
-            'job_title': job[2],
-            'salary': job[3] or '',
-            'requirements': job[4] or '',
-            'location': job[5] or '',
-            'posted_date': job[6],
-            'description': job[7] or '',
-            'contact_person': job[8] or '',
-            'contact_phone': job[9] or '',
-            'email': job[10] or '',
-            'status': job[11] or '待申请',
-            'application_date': job[12] or '',
-            'notes': job[13] or ''
+            'id': job.id,
+            'company_name': job.company_name,
+            'job_title': job.job_title,
+            'salary': job.salary or '',
+            'requirements': job.requirements or '',
+            'location': job.location or '',
+            'posted_date': job.posted_date,
+            'description': job.description or '',
+            'contact_person': job.contact_person or '',
+            'contact_phone': job.contact_phone or '',
+            'email': job.email or '',
+            'status': job.status or DEFAULT_STATUS,
+            'application_date': job.application_date or '',
+            'notes': job.notes or '',
+            'version': job.version
         }
         
         return render_template('update_job.html', job=job_details)
@@ -344,16 +276,9 @@ def delete_job(job_id):
     """删除岗位"""
     if request.method == 'POST':
         # 执行删除操作
-        delete_sql = "DELETE FROM jobs WHERE id = ?"
-        
-        # 获取数据库连接
         conn = get_db_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(delete_sql, (job_id,))
-            conn.commit()
-            
-            if cursor.rowcount > 0:
+            if JobRepository(conn).delete(job_id):
                 flash(f"岗位 {job_id} 已成功删除！")
             else:
                 flash(f"未找到ID为 {job_id} 的岗位")
@@ -366,25 +291,18 @@ def delete_job(job_id):
             conn.close()
     
     # GET 请求：显示确认页面
-    select_sql = """
-    SELECT id, company_name, job_title FROM jobs WHERE id = ?
-    """
-    
-    # 获取数据库连接
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(select_sql, (job_id,))
-        job = cursor.fetchone()
+        job = JobRepository(conn).get(job_id)
         
         if not job:
             flash(f"未找到ID为 {job_id} 的岗位")
             return redirect(url_for('index'))
         
         job_details = {
-            'id': job[0],
-            'company_name': job[1],
-            'job_title': job[2]
+            'id': job.id,
+            'company_name': job.company_name,
+            'job_title': job.job_title
         }
         
         return render_template('delete_job.html', job=job_details)
@@ -395,35 +313,66 @@ def delete_job(job_id):
         conn.close()
 
 # API接口，用于异步操作
+def _job_summary(job):
+    """岗位列表和变更中的岗位内容"""
+    return {
+        'id': job.id,
+        'company_name': job.company_name,
+        'job_title': job.job_title,
+        'salary': job.salary or '未填写',
+        'location': job.location or '未填写',
+        'posted_date': job.posted_date,
+        'status': job.status or DEFAULT_STATUS,
+        'application_date': job.application_date,
+        'notes': job.notes,
+        'updated_at': job.updated_at,
+        'version': job.version
+    }
+
 @app.route('/api/jobs', methods=['GET', 'POST'])
 def api_jobs():
-    """API端点：获取岗位列表或添加新岗位"""
+    """
+    API端点：获取岗位列表或添加新岗位
+    GET 查询参数: ids=逗号分隔的岗位ID，只返回这些岗位的完整内容（一条 IN 查询）
+    GET 响应带 ETag（岗位表的变更序号），请求头 If-None-Match 一致时返回304，无需查询岗位
+    """
     if request.method == 'GET':
-        print("API请求: 获取岗位列表")
+        ids_param = request.args.get('ids')
+        job_ids = None
+        if ids_param is not None:
+            try:
+                job_ids = [int(part) for part in ids_param.split(',') if part.strip()]
+            except ValueError:
+                return jsonify({'error': f"无效的岗位ID列表: {ids_param}"}), 400
+            if len(job_ids) > MAX_BATCH_IDS:
+                return jsonify({'error': f"一次最多查询 {MAX_BATCH_IDS} 个岗位"}), 400
+        print(f"API请求: 获取岗位列表{f' (ID: {ids_param})' if job_ids is not None else ''}")
+        
         # 获取数据库连接
         conn = get_db_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, company_name, job_title, salary, location, posted_date, status, application_date, notes, updated_at FROM jobs ORDER BY posted_date DESC")
-            jobs = cursor.fetchall()
+            repo = JobRepository(conn)
+            # 先取变更序号再查询列表，期间提交的变更会在之后的同步中重复收到，覆盖即可；
+            # ETag 因此只可能比内容旧，不会让客户端错过变更
+            last_seq = repo.latest_seq()
+            etag = _etag(f"jobs-{last_seq}")
+            if etag in request.headers.get('If-None-Match', ''):
+                return Response(status=304, headers={'ETag': etag})
             
-            # 转换为JSON格式
-            result = []
-            for job in jobs:
-                result.append({
-                    'id': job[0],
-                    'company_name': job[1],
-                    'job_title': job[2],
-                    'salary': job[3] or '未填写',
-                    'location': job[4] or '未填写',
-                    'posted_date': job[5],
-                    'status': job[6] or '待申请',
-                    'application_date': job[7],
-                    'notes': job[8],
-                    'updated_at': job[9]
+            if job_ids is not None:
+                found = repo.get_many(job_ids)
+                response = jsonify({
+                    'success': True,
+                    'data': [found[job_id]._asdict() for job_id in dict.fromkeys(job_ids) if job_id in found],
+                    'missing': [job_id for job_id in job_ids if job_id not in found],
+                    'last_seq': last_seq
                 })
-            
-            return jsonify({'success': True, 'data': result})
+            else:
+                # 转换为JSON格式
+                result = [_job_summary(job) for job in repo.search()]
+                response = jsonify({'success': True, 'data': result, 'last_seq': last_seq})
+            response.headers['ETag'] = etag
+            return response
         except sqlite3.Error as e:
             return jsonify({'error': str(e)}), 500
         finally:
@@ -435,85 +384,385 @@ def api_jobs():
         if not data:
             return jsonify({'error': '请求数据不能为空'}), 400
         
-        # 获取必要字段
-        company_name = data.get('company_name', '').strip()
-        job_title = data.get('job_title', '').strip()
+        record = _form_record(data)
         
         # 验证必填字段
-        if not company_name:
+        if not record['company_name']:
             return jsonify({'error': '企业名称不能为空'}), 400
-        if not job_title:
+        if not record['job_title']:
             return jsonify({'error': '岗位名称不能为空'}), 400
         
-        # 获取其他字段
-        salary = data.get('salary', '').strip()
-        requirements = data.get('requirements', '').strip()
-        location = data.get('location', '').strip()
-        description = data.get('description', '').strip()
-        contact_person = data.get('contact_person', '').strip()
-        contact_phone = data.get('contact_phone', '').strip()
-        email = data.get('email', '').strip()
-        status = data.get('status', '待申请')
-        application_date = data.get('application_date')
-        notes = data.get('notes', '').strip()
-        
-        # 插入数据
-        insert_sql = '''
-        INSERT INTO jobs (company_name, job_title, salary, requirements, location, 
-                         description, contact_person, contact_phone, email, status, application_date, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
+        record['status'] = data.get('status', DEFAULT_STATUS)
+        record['application_date'] = data.get('application_date')
+        record['notes'] = (data.get('notes') or '').strip()
         
         # 获取数据库连接
         conn = get_db_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(insert_sql, (
-                company_name, job_title, salary, requirements, location,
-                description, contact_person, contact_phone, email, status, application_date, notes
-            ))
-            conn.commit()
-            return jsonify({'success': True, 'message': '岗位添加成功', 'id': cursor.lastrowid})
+            job_id = JobRepository(conn).insert(record)
+            return jsonify({'success': True, 'message': '岗位添加成功', 'id': job_id})
         except sqlite3.Error as e:
             return jsonify({'error': str(e)}), 500
         finally:
             conn.close()
 
-@app.route('/api/job/<int:job_id>', methods=['GET', 'PUT', 'DELETE'])
-def api_job(job_id):
-    """获取单个岗位详情、更新或删除岗位的API接口"""
-    # 检查岗位是否存在
-    def check_job_exists(conn, job_id):
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-        return cursor.fetchone()
+@app.route('/api/jobs/export', methods=['GET'])
+def api_export_jobs():
+    """
+    API端点：以流式响应导出岗位CSV
+    查询参数: columns=逗号分隔的字段名（默认全部），bom=0 不输出BOM
+    """
+    columns_param = request.args.get('columns', '').strip()
+    if columns_param:
+        names = [name.strip() for name in columns_param.split(',') if name.strip()]
+        unknown = [name for name in names if name not in CSV_EXPORT_COLUMNS]
+        if unknown:
+            return jsonify({'error': f"不支持的导出字段: {', '.join(unknown)}"}), 400
+    else:
+        names = list(CSV_EXPORT_COLUMNS)
+    bom = request.args.get('bom', '1') != '0'
+    
+    columns = [(CSV_EXPORT_COLUMNS[name], name) for name in names]
+    
+    def generate():
+        # 游标逐行读取结果，连接在导出结束后关闭
+        conn = get_db_connection()
+        try:
+            yield from iter_csv(JobRepository(conn).select_columns(names), columns, bom=bom)
+        finally:
+            conn.close()
+    
+    filename = f"jobs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return Response(
+        generate(),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+def _change_dict(change):
+    """变更的JSON表示，删除的岗位 job 为None"""
+    return {
+        'seq': change.seq,
+        'operation': change.operation,
+        'job_id': change.job_id,
+        'job': _job_summary(change.job) if change.job else None
+    }
+
+def _sse_change(change):
+    """一条变更对应的 Server-Sent Events 消息，id 为变更序号，断线重连时由浏览器带回"""
+    data = json.dumps(_change_dict(change), ensure_ascii=False)
+    return f"id: {change.seq}\nevent: change\ndata: {data}\n\n"
+
+def _change_stream(since):
+    """
+    推送 since 之后的变更：先从数据库补发已有的变更，之后转发轮询线程分发的新变更
     
+    先订阅再补发，两者可能重叠，按序号跳过已发送的变更
+    """
+    subscription = change_feed.subscribe(since)
+    try:
+        conn = get_db_connection()
+        try:
+            repo = JobRepository(conn)
+            while True:
+                changes = repo.changes_since(since, CHANGES_PAGE_SIZE)
+                for change in changes:
+                    yield _sse_change(change)
+                    since = change.seq
+                if len(changes) < CHANGES_PAGE_SIZE:
+                    break
+        except LookupError:
+            yield "event: reset\ndata: {}\n\n"
+            return
+        finally:
+            conn.close()
+        
+        while True:
+            changes = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+            if changes is None:
+                # 处理太慢被移出订阅，客户端需要重新加载
+                yield "event: reset\ndata: {}\n\n"
+                return
+            if not changes:
+                yield ": keep-alive\n\n"
+                continue
+            for change in changes:
+                if change.seq > since:
+                    yield _sse_change(change)
+                    since = change.seq
+    finally:
+        change_feed.unsubscribe(subscription)
+
+@app.route('/api/jobs/changes', methods=['GET'])
+def api_job_changes():
+    """
+    API端点：获取某个变更序号之后的岗位变更（新增、修改、删除）
+    查询参数: since=客户端已同步到的序号（来自 /api/jobs 的 last_seq 或上次返回的 last_seq）
+    请求头 Accept: text/event-stream（或 stream=1）时以 Server-Sent Events 持续推送新变更
+    """
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', 0, type=int)
+    
+    if 'text/event-stream' in request.headers.get('Accept', '') or request.args.get('stream') == '1':
+        return Response(
+            _change_stream(since),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    conn = get_db_connection()
+    try:
+        repo = JobRepository(conn)
+        try:
+            changes = repo.changes_since(since, CHANGES_PAGE_SIZE)
+        except LookupError:
+            return jsonify({
+                'error': '部分变更已被清理，请重新加载全部岗位',
+                'last_seq': repo.latest_seq()
+            }), 410
+        return jsonify({
+            'success': True,
+            'changes': [_change_dict(change) for change in changes],
+            'last_seq': changes[-1].seq if changes else since,
+            'has_more': len(changes) == CHANGES_PAGE_SIZE
+        })
+    except sqlite3.Error as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+def _partial_changes(data):
+    """
+    校验部分更新的字段，只保留请求中出现的可写字段
+    
+    Returns:
+        tuple: (字段名到新值的字典, 错误信息，校验通过时为None)
+    """
+    unknown = [key for key in data if key not in JOB_FIELDS and key != 'version']
+    if unknown:
+        return None, f"不支持的字段: {', '.join(unknown)}"
+    
+    changes = {}
+    for field in JOB_FIELDS:
+        if field in data:
+            value = data[field]
+            changes[field] = value.strip() if isinstance(value, str) else value
+    if not changes:
+        return None, '没有要修改的字段'
+    if 'company_name' in changes and not changes['company_name']:
+        return None, '企业名称不能为空'
+    if 'job_title' in changes and not changes['job_title']:
+        return None, '岗位名称不能为空'
+    return changes, None
+
+def _apply_mutation(repo, mutation):
+    """
+    执行一条离线修改，返回执行结果
+    
+    结果的 status: applied 已执行（重发的修改直接返回首次执行的结果）、
+    conflict 版本冲突（附带服务器上的最新内容，以服务器为准）、
+    not_found 岗位已不存在、invalid 修改无效（附带错误信息）
+    """
+    if not isinstance(mutation, dict):
+        return {'status': 'invalid', 'error': '修改应为JSON对象'}
+    
+    mutation_id = mutation.get('mutation_id')
+    operation = mutation.get('operation')
+    job_id = mutation.get('id')
+    version = mutation.get('version')
+    result = {'mutation_id': mutation_id, 'operation': operation, 'id': job_id}
+    
+    if mutation_id is not None:
+        applied = repo.applied_mutation(str(mutation_id))
+        if applied:
+            result.update(status='applied', id=applied[0])
+            return result
+    
+    if operation not in ('insert', 'update', 'delete'):
+        result.update(status='invalid', error=f"不支持的操作: {operation}")
+        return result
+    if operation != 'insert' and (not isinstance(job_id, int) or isinstance(job_id, bool)):
+        result.update(status='invalid', error='缺少岗位ID')
+        return result
+    if version is not None and (not isinstance(version, int) or isinstance(version, bool)):
+        result.update(status='invalid', error=f"无效的版本号: {version!r}")
+        return result
+    
+    try:
+        if operation == 'delete':
+            if not repo.delete(job_id, version):
+                result['status'] = 'not_found'
+                return result
+        else:
+            changes, error = _partial_changes(mutation.get('data') or {})
+            if not error and operation == 'insert' and not (changes.get('company_name') and changes.get('job_title')):
+                error = '企业名称和岗位名称不能为空'
+            if error:
+                result.update(status='invalid', error=error)
+                return result
+            
+            if operation == 'insert':
+                job_id = result['id'] = repo.insert(changes)
+            else:
+                version = repo.update(job_id, changes, version)
+                if not version:
+                    result['status'] = 'not_found'
+                    return result
+                result['version'] = version
+    except VersionConflict as e:
+        job = repo.get(job_id)
+        result.update(status='conflict', version=e.current_version, job=_job_summary(job) if job else None)
+        return result
+    
+    if mutation_id is not None:
+        repo.record_mutation(str(mutation_id), job_id)
+    result['status'] = 'applied'
+    return result
+
+@app.route('/api/jobs/sync', methods=['POST'])
+def api_sync_jobs():
+    """
+    API端点：增量同步
+    
+    请求体: {"since": 客户端已同步到的变更序号, "mutations": [离线修改]}
+    每条离线修改为 {"mutation_id": 客户端生成的唯一ID, "operation": "insert"/"update"/"delete",
+    "id": 岗位ID（insert 不需要）, "version": 修改所基于的版本号, "data": {字段: 值}}
+    
+    先在一个事务中依次执行离线修改，再返回 since 之后的变更（包括刚执行的修改），
+    同步的数据量只与变更条数有关，与岗位总数无关。since 之后的变更已被清理时
+    返回 reset=true，客户端需重新加载全部岗位
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': '请求数据不能为空'}), 400
+    since = data.get('since', 0)
+    mutations = data.get('mutations') or []
+    if not isinstance(since, int) or isinstance(since, bool) or since < 0:
+        return jsonify({'error': f"无效的变更序号: {since!r}"}), 400
+    if not isinstance(mutations, list):
+        return jsonify({'error': 'mutations 应为数组'}), 400
+    print(f"API请求: 增量同步 (since: {since}, 离线修改: {len(mutations)} 条)")
+    
+    conn = get_db_connection()
+    try:
+        repo = JobRepository(conn)
+        with repo.transaction():
+            results = [_apply_mutation(repo, mutation) for mutation in mutations]
+        
+        try:
+            changes = repo.changes_since(since, CHANGES_PAGE_SIZE)
+        except LookupError:
+            return jsonify({
+                'success': True,
+                'results': results,
+                'changes': [],
+                'last_seq': repo.latest_seq(),
+                'has_more': False,
+                'reset': True
+            })
+        return jsonify({
+            'success': True,
+            'results': results,
+            'changes': [_change_dict(change) for change in changes],
+            'last_seq': changes[-1].seq if changes else since,
+            'has_more': len(changes) == CHANGES_PAGE_SIZE,
+            'reset': False
+        })
+    except sqlite3.Error as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+def _etag(version):
+    """岗位版本号对应的 ETag"""
+    return f'"{version}"'
+
+def _expected_version(data=None):
+    """
+    取得条件写入的预期版本号
+    
+    优先使用 If-Match 请求头（冲突时返回412），其次是请求体中的 version 字段（冲突时返回409）
+    
+    Returns:
+        tuple: (预期版本号，为None时不检查; 冲突时的状态码)
+    """
+    if_match = request.headers.get('If-Match', '').strip()
+    if if_match:
+        if if_match == '*':
+            return None, 412
+        tag = if_match.split(',')[0].strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        try:
+            return int(tag.strip('"')), 412
+        except ValueError:
+            # 无法识别的 ETag 不可能与任何版本匹配，版本号从1开始，0 总是冲突
+            return 0, 412
+    
+    version = data.get('version') if isinstance(data, dict) else None
+    if isinstance(version, int) and not isinstance(version, bool):
+        return version, 409
+    return None, 409
+
+def _conflict_response(conn, job_id, status_code):
+    """版本冲突的响应，附带岗位的最新内容和 ETag，便于客户端合并后重试"""
+    job = JobRepository(conn).get(job_id)
+    response = jsonify({
+        'error': '岗位已被其他人修改，请基于最新内容重试',
+        'data': job._asdict() if job else None
+    })
+    response.status_code = status_code
+    if job:
+        response.headers['ETag'] = _etag(job.version)
+    return response
+
+def _updated_response(message, version):
+    """更新成功的响应，ETag 为新版本"""
+    response = jsonify({'success': True, 'message': message, 'version': version})
+    response.headers['ETag'] = _etag(version)
+    return response
+
+@app.route('/api/job/<int:job_id>', methods=['GET', 'PUT', 'PATCH', 'DELETE'])
+def api_job(job_id):
+    """获取单个岗位详情、更新（PUT 整体 / PATCH 部分）或删除岗位的API接口"""
     if request.method == 'GET':
         print(f"API请求: 获取岗位详情 (ID: {job_id})")
         # 获取数据库连接
         conn = get_db_connection()
         try:
-            job = check_job_exists(conn, job_id)
+            job = JobRepository(conn).get(job_id)
             
             if not job:
                 return jsonify({'error': '岗位不存在'}), 404
             
+            etag = _etag(job.version)
+            if etag in request.headers.get('If-None-Match', ''):
+                return Response(status=304, headers={'ETag': etag})
+            
             # 转换为JSON格式
             result = {
-                'id': job[0],
-                'company_name': job[1],
-                'job_title': job[2],
-                'salary': job[3] or '未填写',
-                'requirements': job[4] or '未填写',
-                'location': job[5] or '未填写',
-                'posted_date': job[6],
-                'description': job[7] or '未填写',
-                'contact_person': job[8] or '未填写',
-                'contact_phone': job[9] or '未填写',
-                'email': job[10] or '未填写'
+                'id': job.id,
+                'company_name': job.company_name,
+                'job_title': job.job_title,
+                'salary': job.salary or '未填写',
+                'requirements': job.requirements or '未填写',
+                'location': job.location or '未填写',
+                'posted_date': job.posted_date,
+                'description': job.description or '未填写',
+                'contact_person': job.contact_person or '未填写',
+                'contact_phone': job.contact_phone or '未填写',
+                'email': job.email or '未填写',
+                'status': job.status or DEFAULT_STATUS,
+                'application_date': job.application_date,
+                'notes': job.notes,
+                'updated_at': job.updated_at,
+                'version': job.version
             }
             
-            return jsonify({'success': True, 'data': result})
+            response = jsonify({'success': True, 'data': result})
+            response.headers['ETag'] = etag
+            return response
         except sqlite3.Error as e:
             return jsonify({'error': str(e)}), 500
         finally:
@@ -526,48 +775,57 @@ def api_job(job_id):
         if not data:
             return jsonify({'error': '请求数据不能为空'}), 400
         
+        record = _form_record(data)
+        
+        # 验证必填字段
+        if not record['company_name']:
+            return jsonify({'error': '企业名称不能为空'}), 400
+        if not record['job_title']:
+            return jsonify({'error': '岗位名称不能为空'}), 400
+        
+        # 请求中未包含的跟踪字段保持原值
+        for field in ('status', 'application_date', 'notes'):
+            if field in data:
+                record[field] = data[field]
+        
+        expected_version, conflict_status = _expected_version(data)
+        
         # 获取数据库连接
         conn = get_db_connection()
         try:
-            # 检查岗位是否存在
-            if not check_job_exists(conn, job_id):
+            version = JobRepository(conn).update(job_id, record, expected_version)
+            if not version:
                 return jsonify({'error': '岗位不存在'}), 404
             
-            # 获取必要字段
-            company_name = data.get('company_name', '').strip()
-            job_title = data.get('job_title', '').strip()
-            
-            # 验证必填字段
-            if not company_name:
-                return jsonify({'error': '企业名称不能为空'}), 400
-            if not job_title:
-                return jsonify({'error': '岗位名称不能为空'}), 400
-            
-            # 获取其他字段
-            salary = data.get('salary', '').strip()
-            requirements = data.get('requirements', '').strip()
-            location = data.get('location', '').strip()
-            description = data.get('description', '').strip()
-            contact_person = data.get('contact_person', '').strip()
-            contact_phone = data.get('contact_phone', '').strip()
-            email = data.get('email', '').strip()
-            
-            # 更新数据
-            update_sql = '''
-            UPDATE jobs SET company_name = ?, job_title = ?, salary = ?, 
-                           requirements = ?, location = ?, description = ?, 
-                           contact_person = ?, contact_phone = ?, email = ?
-            WHERE id = ?
-            '''
-            
-            cursor = conn.cursor()
-            cursor.execute(update_sql, (
-                company_name, job_title, salary, requirements, location,
-                description, contact_person, contact_phone, email, job_id
-            ))
-            conn.commit()
+            return _updated_response('岗位更新成功', version)
+        except VersionConflict:
+            return _conflict_response(conn, job_id, conflict_status)
+        except sqlite3.Error as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
+            conn.close()
+    
+    elif request.method == 'PATCH':
+        print(f"API请求: 部分更新岗位 (ID: {job_id})")
+        data = request.get_json()
+        if not isinstance(data, dict) or not data:
+            return jsonify({'error': '请求数据不能为空'}), 400
+        
+        changes, error = _partial_changes(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        expected_version, conflict_status = _expected_version(data)
+        
+        conn = get_db_connection()
+        try:
+            version = JobRepository(conn).update(job_id, changes, expected_version)
+            if not version:
+                return jsonify({'error': '岗位不存在'}), 404
             
-            return jsonify({'success': True, 'message': '岗位更新成功'})
+            return _updated_response('岗位更新成功', version)
+        except VersionConflict:
+            return _conflict_response(conn, job_id, conflict_status)
         except sqlite3.Error as e:
             return jsonify({'error': str(e)}), 500
         finally:
@@ -575,20 +833,17 @@ def api_job(job_id):
     
     elif request.method == 'DELETE':
         print(f"API请求: 删除岗位 (ID: {job_id})")
+        expected_version, conflict_status = _expected_version()
+        
         # 获取数据库连接
         conn = get_db_connection()
         try:
-            # 检查岗位是否存在
-            if not check_job_exists(conn, job_id):
+            if not JobRepository(conn).delete(job_id, expected_version):
                 return jsonify({'error': '岗位不存在'}), 404
             
-            # 删除数据
-            delete_sql = "DELETE FROM jobs WHERE id = ?"
-            cursor = conn.cursor()
-            cursor.execute(delete_sql, (job_id,))
-            conn.commit()
-            
             return jsonify({'success': True, 'message': '岗位删除成功'})
+        except VersionConflict:
+            return _conflict_response(conn, job_id, conflict_status)
         except sqlite3.Error as e:
             return jsonify({'error': str(e)}), 500
         finally:
@@ -1034,55 +1289,56 @@ def create_templates():
 {% block content %}
     <h2>更新岗位信息</h2>
     
-    <form action="{{ url_for('update_job', job_id=job[0]) }}" method="post">
+    <form action="{{ url_for('update_job', job_id=job.id) }}" method="post">
+        <input type="hidden" name="version" value="{{ job.version }}">
         <div class="form-group">
             <label for="company_name">企业名称 <span style="color: red;">*</span></label>
-            <input type="text" id="company_name" name="company_name" value="{{ job[1] }}" required>
+            <input type="text" id="company_name" name="company_name" value="{{ job.company_name }}" required>
         </div>
         
         <div class="form-group">
             <label for="job_title">岗位名称 <span style="color: red;">*</span></label>
-            <input type="text" id="job_title" name="job_title" value="{{ job[2] }}" required>
+            <input type="text" id="job_title" name="job_title" value="{{ job.job_title }}" required>
         </div>
         
         <div class="form-group">
             <label for="salary">薪资</label>
-            <input type="text" id="salary" name="salary" value="{{ job[3] or '' }}">
+            <input type="text" id="salary" name="salary" value="{{ job.salary or '' }}">
         </div>
         
         <div class="form-group">
             <label for="requirements">具体要求</label>
-            <textarea id="requirements" name="requirements">{{ job[4] or '' }}</textarea>
+            <textarea id="requirements" name="requirements">{{ job.requirements or '' }}</textarea>
         </div>
         
         <div class="form-group">
             <label for="location">工作地点</label>
-            <input type="text" id="location" name="location" value="{{ job[5] or '' }}">
+            <input type="text" id="location" name="location" value="{{ job.location or '' }}">
         </div>
         
         <div class="form-group">
             <label for="description">岗位描述</label>
-            <textarea id="description" name="description">{{ job[7] or '' }}</textarea>
+            <textarea id="description" name="description">{{ job.description or '' }}</textarea>
         </div>
         
         <div class="form-group">
             <label for="contact_person">联系人</label>
-            <input type="text" id="contact_person" name="contact_person" value="{{ job[8] or '' }}">
+            <input type="text" id="contact_person" name="contact_person" value="{{ job.contact_person or '' }}">
         </div>
         
         <div class="form-group">
             <label for="contact_phone">联系电话</label>
-            <input type="text" id="contact_phone" name="contact_phone" value="{{ job[9] or '' }}">
+            <input type="text" id="contact_phone" name="contact_phone" value="{{ job.contact_phone or '' }}">
         </div>
         
         <div class="form-group">
             <label for="email">电子邮箱</label>
-            <input type="text" id="email" name="email" value="{{ job[10] or '' }}">
+            <input type="text" id="email" name="email" value="{{ job.email or '' }}">
         </div>
         
         <div class="actions">
             <button type="submit" class="btn btn-success">保存更新</button>
-            <a href="{{ url_for('view_job', job_id=job[0]) }}" class="btn btn-secondary">取消</a>
+            <a href="{{ url_for('view_job', job_id=job.id) }}" class="btn btn-secondary">取消</a>
         </div>
     </form>
 {% endblock %}'''
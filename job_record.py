@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+求职记录模型
+功能：为 seven.py 提供紧凑的求职记录类型，使用 __slots__ 代替字典存储字段，
+并对状态、地点、来源等重复率高的字符串做驻留，降低大量记录时的内存占用
+"""
+
+import sys
+
+
+class JobRecord:
+    """
+    单条求职记录
+
+    同时支持属性访问和字典式访问(job['company'])，与 JSON 之间可无损互转：
+    文件中缺失的字段保持缺失，未知字段保存在 extra 中原样写回
+    """
+
+    # 记录字段，顺序即写入 JSON 时的顺序
+    FIELDS = (
+        'id', 'company', 'position', 'salary', 'location', 'apply_date',
+        'description', 'requirements', 'contact', 'phone', 'email',
+        'source', 'status', 'notes', 'update_time'
+    )
+    # 取值重复率高、需要做字符串驻留的字段
+    INTERNED_FIELDS = frozenset(('location', 'apply_date', 'source', 'status'))
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, **fields):
+        """根据字段创建记录，未提供的字段视为缺失"""
+        self.extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """从 JSON 字典创建记录"""
+        return cls(**data)
+
+    def to_dict(self):
+        """转换为 JSON 字典"""
+        data = {}
+        for key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key in self.INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        """与 dict.get 相同"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if isinstance(other, JobRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"JobRecord({self.to_dict()!r})"
+
+
+_MISSING = object()
+_FIELD_SET = frozenset(JobRecord.FIELDS)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+求职记录倒排索引
+功能：为 seven.py 的求职记录提供基于字符 n-gram 的子串搜索（对中文友好）
+以及状态等字段的精确匹配，支持增量维护和持久化
+"""
+
+import json
+import os
+
+from job_file_sync import atomic_write_json
+
+
+class JobSearchIndex:
+    """求职记录倒排索引"""
+
+    # 支持子串搜索的字段
+    TEXT_FIELDS = ('company', 'position', 'location')
+    # 精确匹配的字段
+    EXACT_FIELDS = ('status',)
+    # 索引文件格式版本
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        """初始化空索引"""
+        # 字段 -> {n-gram -> 记录ID集合}（从文件加载的为列表，见 _mutable_ids）
+        self.grams = {field: {} for field in self.TEXT_FIELDS}
+        # 字段 -> {取值 -> 记录ID集合}
+        self.exact = {field: {} for field in self.EXACT_FIELDS}
+
+    @staticmethod
+    def _split_grams(text):
+        """把文本拆分为单字和相邻双字的 n-gram 集合"""
+        text = (text or '').lower()
+        grams = set(text)
+        grams.update(text[i:i + 2] for i in range(len(text) - 1))
+        return grams
+
+    @staticmethod
+    def _query_grams(query):
+        """查询串对应的 n-gram：单字查询用单字，否则用双字"""
+        if len(query) == 1:
+            return {query}
+        return {query[i:i + 2] for i in range(len(query) - 1)}
+
+    @staticmethod
+    def _mutable_ids(postings, key, create=False):
+        """
+        取得可修改的记录ID集合
+
+        从文件加载的倒排表保持为列表，首次修改时才转换为集合，
+        只搜索的进程不必为全部倒排表建立集合
+        """
+        ids = postings.get(key)
+        if ids is None:
+            if create:
+                ids = postings[key] = set()
+        elif not isinstance(ids, set):
+            ids = postings[key] = set(ids)
+        return ids
+
+    def build(self, jobs):
+        """根据全部记录重建索引"""
+        self.__init__()
+        for job in jobs:
+            self.add(job)
+
+    def add(self, job):
+        """把一条记录加入索引"""
+        job_id = job['id']
+        for field in self.TEXT_FIELDS:
+            postings = self.grams[field]
+            for gram in self._split_grams(job.get(field)):
+                self._mutable_ids(postings, gram, create=True).add(job_id)
+        for field in self.EXACT_FIELDS:
+            self._mutable_ids(self.exact[field], job.get(field) or '', create=True).add(job_id)
+
+    def remove(self, job):
+        """从索引中移除一条记录（需传入记录当前已索引的内容）"""
+        job_id = job['id']
+        for field in self.TEXT_FIELDS:
+            postings = self.grams[field]
+            for gram in self._split_grams(job.get(field)):
+                ids = self._mutable_ids(postings, gram)
+                if ids is not None:
+                    ids.discard(job_id)
+                    if not ids:
+                        del postings[gram]
+        for field in self.EXACT_FIELDS:
+            value = job.get(field) or ''
+            ids = self._mutable_ids(self.exact[field], value)
+            if ids is not None:
+                ids.discard(job_id)
+                if not ids:
+                    del self.exact[field][value]
+
+    def search(self, jobs_by_id, **criteria):
+        """
+        按条件搜索记录
+
+        Args:
+            jobs_by_id: 记录ID到记录的映射，用于校验子串是否真正匹配
+            **criteria: 字段名到查询值的映射，空值表示不筛选
+
+        Returns:
+            list: 按ID排序的匹配记录ID；没有任何条件时返回全部ID
+        """
+        posting_lists = []
+        substrings = []
+
+        for field, value in criteria.items():
+            if not value:
+                continue
+            if field in self.EXACT_FIELDS:
+                posting_lists.append(self.exact[field].get(value, set()))
+            elif field in self.TEXT_FIELDS:
+                query = value.lower()
+                # 不超过两个字符的查询，倒排表本身就是精确结果，无需校验
+                if len(query) > 2:
+                    substrings.append((field, query))
+                for gram in self._query_grams(query):
+                    posting_lists.append(self.grams[field].get(gram, set()))
+            else:
+                raise ValueError(f"不支持的搜索字段: {field}")
+
+        if not posting_lists:
+            return sorted(jobs_by_id)
+
+        # 从最短的倒排表开始求交集
+        posting_lists.sort(key=len)
+        candidates = set(posting_lists[0])
+        for ids in posting_lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(ids)
+
+        if not substrings:
+            return sorted(candidates)
+
+        # 双字共现并不保证子串连续，需逐条校验
+        results = []
+        for job_id in sorted(candidates):
+            job = jobs_by_id[job_id]
+            if all(query in (job.get(field) or '').lower() for field, query in substrings):
+                results.append(job_id)
+        return results
+
+    def save(self, index_file, fingerprint):
+        """
+        将索引持久化到文件
+
+        Args:
+            index_file: 索引文件路径
+            fingerprint: 对应数据文件的指纹，加载时用于判断索引是否过期
+        """
+        data = {
+            'version': self.FORMAT_VERSION,
+            'fingerprint': fingerprint,
+            'grams': {field: {gram: list(ids) for gram, ids in postings.items()}
+                      for field, postings in self.grams.items()},
+            'exact': {field: {value: list(ids) for value, ids in postings.items()}
+                      for field, postings in self.exact.items()}
+        }
+        # 写到一半崩溃时不会留下截断的索引文件
+        atomic_write_json(index_file, data, compact=True)
+
+    def load(self, index_file, fingerprint):
+        """
+        从文件加载索引
+
+        Returns:
+            bool: 索引文件存在且与数据文件指纹一致时返回True
+        """
+        if not os.path.exists(index_file):
+            return False
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get('version') != self.FORMAT_VERSION or data.get('fingerprint') != fingerprint:
+            return False
+
+        # 倒排表以列表形式载入，见 _mutable_ids
+        self.grams = {field: data['grams'].get(field, {}) for field in self.TEXT_FIELDS}
+        self.exact = {field: data['exact'].get(field, {}) for field in self.EXACT_FIELDS}
+        return True
+
+
+def file_fingerprint(path):
+    """返回文件的指纹（修改时间和大小），文件不存在时返回None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
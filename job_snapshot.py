@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+求职记录二进制快照
+功能：为 seven.py 提供紧凑的二进制数据文件格式，可内存映射打开，按需逐条解码记录，
+记录数很大时启动也无需解析整个文件。JSON 仍是交换格式，本模块提供双向转换
+
+文件布局（小端序）:
+    文件头  魔数(8) 版本(2) 保留(2) 记录数(8) 下一个ID(8) 校验和(4) 代数(4)
+    ID表    记录数 x int64
+    偏移表  (记录数 + 1) x uint64，相对数据区起点
+    数据区  每条记录为 pickle 协议5 编码的 (字段掩码, 字段值, 额外字段)
+
+用法:
+    python job_snapshot.py to-snapshot job_applications.json job_applications.snap
+    python job_snapshot.py to-json job_applications.snap job_applications.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import MutableMapping
+
+from job_record import JobRecord
+
+MAGIC = b'JOBSNAP\0'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHQQII')
+_MISSING = object()
+
+
+class SnapshotError(Exception):
+    """快照文件损坏或格式不支持"""
+
+
+def is_snapshot(path):
+    """判断文件是否为快照格式"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def encode_record(job):
+    """把一条记录编码为字节串"""
+    mask = 0
+    values = []
+    for bit, field in enumerate(JobRecord.FIELDS):
+        value = job.get(field, _MISSING)
+        if value is not _MISSING:
+            mask |= 1 << bit
+            values.append(value)
+    extra = job.extra if isinstance(job, JobRecord) else None
+    return pickle.dumps((mask, tuple(values), extra), protocol=5)
+
+
+def decode_record(data):
+    """把字节串解码为 JobRecord"""
+    mask, values, extra = pickle.loads(data)
+    job = JobRecord()
+    it = iter(values)
+    for bit, field in enumerate(JobRecord.FIELDS):
+        if mask & (1 << bit):
+            job[field] = next(it)
+    if extra:
+        job.extra = dict(extra)
+    return job
+
+
+class SnapshotReader:
+    """以内存映射方式打开的只读快照"""
+
+    def __init__(self, path, verify=True):
+        """
+        打开快照文件
+
+        Args:
+            path: 快照文件路径
+            verify: 是否校验数据区的 CRC32 校验和
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"快照文件为空: {path}")
+
+        try:
+            self._open(verify)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, verify):
+        if len(self._mmap) < HEADER.size:
+            raise SnapshotError("快照文件头不完整")
+        magic, version, _, count, next_id, checksum, generation = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError("不是求职记录快照文件")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"不支持的快照版本: {version}")
+
+        self.count = count
+        self.next_id = next_id
+        self.generation = generation
+
+        view = memoryview(self._mmap)
+        ids_end = HEADER.size + count * 8
+        offsets_end = ids_end + (count + 1) * 8
+        if len(view) < offsets_end:
+            view.release()
+            raise SnapshotError("快照文件被截断")
+        if verify and zlib.crc32(view[HEADER.size:]) != checksum:
+            view.release()
+            raise SnapshotError("快照文件校验和不匹配")
+
+        self._view = view
+        self.ids = view[HEADER.size:ids_end].cast('q')
+        self._offsets = view[ids_end:offsets_end].cast('Q')
+        self._data_start = offsets_end
+        if self._data_start + self._offsets[count] != len(view):
+            raise SnapshotError("快照文件被截断")
+
+    @staticmethod
+    def generation_from_header(header):
+        """从文件头字节中读取代数，文件头不完整时返回None"""
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            return None
+        return HEADER.unpack_from(header, 0)[6]
+
+    def raw(self, pos):
+        """返回第 pos 条记录的原始字节"""
+        start = self._data_start + self._offsets[pos]
+        end = self._data_start + self._offsets[pos + 1]
+        return self._mmap[start:end]
+
+    def decode(self, pos):
+        """解码第 pos 条记录"""
+        return decode_record(self.raw(pos))
+
+    def close(self):
+        """释放内存映射并关闭文件"""
+        for name in ('ids', '_offsets', '_view'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+class LazyRecordMap(MutableMapping):
+    """
+    记录ID到 JobRecord 的映射，值在首次访问时才从快照中解码
+
+    未解码的记录以其在快照中的位置(int)占位，保存时可直接复制原始字节
+    """
+
+    def __init__(self, reader):
+        self._reader = reader
+        self._records = dict(zip(reader.ids.tolist(), range(reader.count)))
+
+    def __getitem__(self, job_id):
+        job = self._records[job_id]
+        if type(job) is int:
+            job = self._reader.decode(job)
+            self._records[job_id] = job
+        return job
+
+    def __setitem__(self, job_id, job):
+        self._records[job_id] = job
+
+    def __delitem__(self, job_id):
+        del self._records[job_id]
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, job_id):
+        return job_id in self._records
+
+    def raw_items(self):
+        """按顺序返回 (记录ID, 编码后的字节)，未解码的记录直接复制原始字节"""
+        for job_id, job in self._records.items():
+            if type(job) is int:
+                yield job_id, self._reader.raw(job)
+            else:
+                yield job_id, encode_record(job)
+
+    def rebind(self, reader):
+        """
+        快照文件被重写后切换到新的快照，并更新未解码记录的位置
+        （旧快照需由调用方先行关闭）
+        """
+        positions = dict(zip(reader.ids.tolist(), range(reader.count)))
+        for job_id, job in self._records.items():
+            if type(job) is int:
+                self._records[job_id] = positions[job_id]
+        self._reader = reader
+
+    def close(self):
+        """关闭底层快照"""
+        self._reader.close()
+
+
+def _to_little_endian(values):
+    """把数组转为小端序字节"""
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_snapshot(path, items, count, next_id, generation=0):
+    """
+    把快照写入临时文件，由调用方用 os.replace 原子替换目标文件
+
+    Args:
+        path: 目标文件路径
+        items: 按顺序产生 (记录ID, 编码后字节) 的可迭代对象
+        count: 记录条数
+        next_id: 下一个待分配的记录ID
+        generation: 数据文件的代数，每次保存递增，用于多进程间的变更检测
+
+    Returns:
+        str: 写好的临时文件路径
+    """
+    tmp_path = f"{path}.tmp"
+    ids_size = count * 8
+    offsets_size = (count + 1) * 8
+
+    with open(tmp_path, 'w+b') as f:
+        # 先预留文件头、ID表和偏移表，写完数据区后回填
+        f.write(b'\0' * (HEADER.size + ids_size + offsets_size))
+        ids = []
+        offsets = [0]
+        for job_id, data in items:
+            ids.append(job_id)
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+        if len(ids) != count:
+            raise ValueError(f"记录数不一致: 预期 {count}，实际 {len(ids)}")
+
+        f.seek(HEADER.size)
+        f.write(_to_little_endian(array('q', ids)))
+        f.write(_to_little_endian(array('Q', offsets)))
+
+        # 计算 CRC32 后回填文件头
+        f.flush()
+        f.seek(HEADER.size)
+        checksum = 0
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            checksum = zlib.crc32(chunk, checksum)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, next_id, checksum, generation))
+        f.flush()
+        os.fsync(f.fileno())
+
+    return tmp_path
+
+
+def json_to_snapshot(json_file, snapshot_file):
+    """把 JSON 数据文件转换为快照，返回记录条数"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        jobs, next_id, generation = data, None, 0
+    else:
+        jobs, next_id, generation = data.get('jobs', []), data.get('next_id'), data.get('generation', 0)
+    if next_id is None:
+        next_id = max((job['id'] for job in jobs), default=0) + 1
+
+    items = ((job['id'], encode_record(JobRecord.from_dict(job))) for job in jobs)
+    os.replace(write_snapshot(snapshot_file, items, len(jobs), next_id, generation), snapshot_file)
+    return len(jobs)
+
+
+def snapshot_to_json(snapshot_file, json_file):
+    """把快照转换为 JSON 数据文件，返回记录条数"""
+    reader = SnapshotReader(snapshot_file)
+    try:
+        data = {
+            'generation': reader.generation,
+            'next_id': reader.next_id,
+            'jobs': [reader.decode(pos).to_dict() for pos in range(reader.count)]
+        }
+    finally:
+        reader.close()
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return len(data['jobs'])
+
+
+def main():
+    """命令行入口：JSON 与快照格式互相转换"""
+    parser = argparse.ArgumentParser(description="求职记录 JSON 与二进制快照格式互相转换")
+    parser.add_argument('command', choices=['to-snapshot', 'to-json'], help="转换方向")
+    parser.add_argument('source', help="源文件")
+    parser.add_argument('target', help="目标文件")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'to-snapshot':
+            count = json_to_snapshot(args.source, args.target)
+        else:
+            count = snapshot_to_json(args.source, args.target)
+    except (OSError, ValueError, SnapshotError) as e:
+        print(f"转换失败: {e}")
+        return 1
+
+    print(f"成功转换 {count} 条记录: {args.source} -> {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
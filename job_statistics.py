@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+求职记录增量统计
+功能：为 seven.py 维护按状态/地点/来源的计数、最近投递的 Top-K 堆、
+状态流程的转化漏斗、各来源的回复率以及按周的投递时间序列。
+在新增、更新、删除记录时增量维护，查看统计时无需遍历全部记录
+"""
+
+import datetime
+import heapq
+import json
+import os
+import secrets
+from collections import Counter
+
+from job_file_sync import atomic_write_json
+
+# 求职流程的各个阶段，按先后顺序
+PIPELINE = ["已投递", "待面试", "面试中", "已通过"]
+# 视为收到企业回复的状态
+RESPONDED_STATUSES = frozenset(("待面试", "面试中", "已通过", "已拒绝"))
+
+
+def week_of(apply_date):
+    """返回投递日期所在的ISO周（如 2024-W03），日期无效时返回None"""
+    try:
+        year, week, _ = datetime.date.fromisoformat(apply_date).isocalendar()
+    except (TypeError, ValueError):
+        return None
+    return f"{year}-W{week:02d}"
+
+
+class JobStatistics:
+    """求职记录增量统计"""
+
+    # 统计文件格式版本（2: 统计内容与数据文件指纹分开存放）
+    FORMAT_VERSION = 2
+    # 最近投递堆保留的条数，多于展示条数以便删除后无需立即重建
+    RECENT_CAPACITY = 20
+
+    def __init__(self):
+        """初始化空统计"""
+        self.total = 0
+        self.status_counts = Counter()
+        self.location_counts = Counter()
+        self.source_totals = Counter()
+        self.source_responses = Counter()
+        self.weekly_counts = Counter()
+        # 记录ID -> 曾经到达的最高流程阶段，更新状态时不会回退
+        self.stage_history = {}
+        # 最高流程阶段 -> 记录数
+        self.stage_counts = Counter()
+        # (投递日期, 记录ID) 的小顶堆，保存最近的若干条投递
+        self.recent = []
+        # 堆中是否包含全部记录里最近的 RECENT_CAPACITY 条
+        self.recent_complete = True
+        # 上次保存或加载后统计是否有变化，没有变化时保存只需更新指纹
+        self.dirty = True
+        # 统计文件内容的标识，指纹文件通过它确认与统计内容对应
+        self._saved_token = None
+        # 更新记录时先扣除再计入：(记录ID, 计入统计的字段, 是否在最近投递堆中, recent_complete)，
+        # 计入时字段不变则统计与扣除前相同，不标记为有变化
+        self._pending_update = None
+
+    def build(self, jobs):
+        """根据全部记录重建统计，保留仍存在的记录的阶段历史"""
+        history = self.stage_history
+        jobs = list(jobs)
+        self.__init__()
+        existing = {job['id'] for job in jobs}
+        self.stage_history = {job_id: stage for job_id, stage in history.items()
+                              if job_id in existing}
+        for job in jobs:
+            self.add(job)
+
+    @staticmethod
+    def _source(job):
+        return job.get('source') or "未知"
+
+    @classmethod
+    def _counted_fields(cls, job):
+        """记录中参与统计的字段"""
+        return (job.get('status') or '', job.get('location') or '', cls._source(job), job.get('apply_date') or '')
+
+    def add(self, job):
+        """把一条记录计入统计"""
+        pending, self._pending_update = self._pending_update, None
+        job_id = job['id']
+        status = job.get('status') or ''
+        source = self._source(job)
+
+        self.total += 1
+        self.status_counts[status] += 1
+        self.location_counts[job.get('location') or ''] += 1
+        self.source_totals[source] += 1
+        if status in RESPONDED_STATUSES:
+            self.source_responses[source] += 1
+        week = week_of(job.get('apply_date'))
+        if week:
+            self.weekly_counts[week] += 1
+
+        stage = PIPELINE.index(status) if status in PIPELINE else 0
+        stage = max(stage, self.stage_history.get(job_id, 0))
+        self.stage_history[job_id] = stage
+        self.stage_counts[stage] += 1
+
+        entry = (job.get('apply_date') or '', job_id)
+        if len(self.recent) < self.RECENT_CAPACITY:
+            heapq.heappush(self.recent, entry)
+        elif entry > self.recent[0]:
+            heapq.heapreplace(self.recent, entry)
+
+        if pending is not None and pending[:3] == (job_id, self._counted_fields(job), entry in self.recent):
+            # 原样放回了刚扣除的记录（如只修改了备注）
+            self.recent_complete = pending[3]
+        else:
+            self.dirty = True
+
+    def remove(self, job, deleted=False):
+        """
+        把一条记录从统计中扣除（需传入记录当前已计入的内容）
+
+        Args:
+            job: 记录
+            deleted: 记录是否被删除；更新记录时为False，保留其阶段历史
+        """
+        if self._pending_update is not None:
+            self.dirty = True
+        job_id = job['id']
+        status = job.get('status') or ''
+        source = self._source(job)
+        entry = (job.get('apply_date') or '', job_id)
+        if deleted:
+            self.dirty = True
+            self._pending_update = None
+        else:
+            self._pending_update = (job_id, self._counted_fields(job), entry in self.recent, self.recent_complete)
+
+        self.total -= 1
+        self._decrement(self.status_counts, status)
+        self._decrement(self.location_counts, job.get('location') or '')
+        self._decrement(self.source_totals, source)
+        if status in RESPONDED_STATUSES:
+            self._decrement(self.source_responses, source)
+        week = week_of(job.get('apply_date'))
+        if week:
+            self._decrement(self.weekly_counts, week)
+
+        stage = self.stage_history.get(job_id, 0)
+        self._decrement(self.stage_counts, stage)
+        if deleted:
+            self.stage_history.pop(job_id, None)
+
+        if entry in self.recent:
+            self.recent.remove(entry)
+            heapq.heapify(self.recent)
+            # 堆中少了一条，未入堆的记录里可能有更近的投递
+            if self.total > len(self.recent):
+                self.recent_complete = False
+
+    @staticmethod
+    def _decrement(counter, key):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def recent_ids(self, limit=5):
+        """返回最近投递的记录ID（需 recent_complete 为True）"""
+        return [job_id for _, job_id in heapq.nlargest(limit, self.recent)]
+
+    def refill_recent(self, jobs):
+        """根据全部记录重新填充最近投递堆"""
+        self.dirty = True
+        self._pending_update = None
+        self.recent = heapq.nlargest(
+            self.RECENT_CAPACITY, ((job.get('apply_date') or '', job['id']) for job in jobs)
+        )
+        heapq.heapify(self.recent)
+        self.recent_complete = True
+
+    def funnel(self):
+        """返回转化漏斗：[(阶段, 到达该阶段的记录数, 相对上一阶段的转化率)]"""
+        result = []
+        reached = 0
+        rows = []
+        for stage in range(len(PIPELINE) - 1, -1, -1):
+            reached += self.stage_counts.get(stage, 0)
+            rows.append((PIPELINE[stage], reached))
+        rows.reverse()
+
+        previous = None
+        for name, count in rows:
+            rate = count / previous if previous else None
+            result.append((name, count, rate))
+            previous = count
+        return result
+
+    def source_response_rates(self):
+        """返回各来源的 (来源, 投递数, 回复数, 回复率)，按投递数降序"""
+        return [
+            (source, total, self.source_responses.get(source, 0),
+             self.source_responses.get(source, 0) / total)
+            for source, total in self.source_totals.most_common()
+        ]
+
+    def weekly_series(self, weeks=12):
+        """返回最近若干周的 (周, 投递数)，按时间升序"""
+        return sorted(self.weekly_counts.items())[-weeks:]
+
+    def save(self, stats_file, fingerprint):
+        """
+        将统计持久化到文件，fingerprint 为对应数据文件的指纹
+
+        统计内容写入 stats_file，数据文件指纹写入较小的 stats_file.stamp；
+        统计没有变化时（如只修改了备注）只重写指纹文件，不再重写全部统计
+        """
+        if self.dirty or self._saved_token is None or not os.path.exists(stats_file):
+            token = secrets.token_hex(8)
+            atomic_write_json(stats_file, {
+                'version': self.FORMAT_VERSION,
+                'token': token,
+                'total': self.total,
+                'status_counts': dict(self.status_counts),
+                'location_counts': dict(self.location_counts),
+                'source_totals': dict(self.source_totals),
+                'source_responses': dict(self.source_responses),
+                'weekly_counts': dict(self.weekly_counts),
+                'stage_history': self.stage_history,
+                'recent': sorted(self.recent),
+                'recent_complete': self.recent_complete
+            }, compact=True)
+            self._saved_token = token
+            self.dirty = False
+        # 统计内容先于指纹落盘，两次写入之间崩溃时标识不一致，下次加载会重建
+        atomic_write_json(stats_file + '.stamp', {
+            'token': self._saved_token,
+            'fingerprint': fingerprint
+        }, compact=True)
+
+    def load(self, stats_file, fingerprint):
+        """
+        从文件加载统计
+
+        指纹不一致时只恢复阶段历史（它无法从当前记录推算），其余统计需调用 build 重建
+
+        Returns:
+            bool: 统计文件存在且与数据文件指纹一致时返回True
+        """
+        data = self._read_json(stats_file)
+        if data is None or data.get('version') not in (1, self.FORMAT_VERSION):
+            return False
+
+        self.stage_history = {int(job_id): stage
+                              for job_id, stage in data.get('stage_history', {}).items()}
+        # 旧格式的统计文件只恢复阶段历史
+        if data['version'] != self.FORMAT_VERSION:
+            return False
+        stamp = self._read_json(stats_file + '.stamp')
+        if stamp is None or stamp.get('token') != data.get('token') or \
+                stamp.get('fingerprint') != fingerprint:
+            return False
+
+        self.total = data['total']
+        self.status_counts = Counter(data['status_counts'])
+        self.location_counts = Counter(data['location_counts'])
+        self.source_totals = Counter(data['source_totals'])
+        self.source_responses = Counter(data['source_responses'])
+        self.weekly_counts = Counter(data['weekly_counts'])
+        self.stage_counts = Counter(self.stage_history.values())
+        self.recent = [tuple(entry) for entry in data['recent']]
+        heapq.heapify(self.recent)
+        self.recent_complete = data['recent_complete']
+        self._saved_token = data['token']
+        self.dirty = False
+        return True
+
+    @staticmethod
+    def _read_json(path):
+        """读取JSON文件，文件不存在或已损坏时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
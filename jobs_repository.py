@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+岗位表数据访问层
+功能：岗位表的唯一表结构定义，以及命令行版(job_management_system.py)和
+网页版(job_management_web.py)共用的增删改查、批量操作和行对象。
+所有写操作在同一事务中追加变更日志(job_changes)，客户端可按序号增量同步
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+# 数据库文件名
+DB_FILE = 'job_management.db'
+# 连接的预编译语句缓存大小
+STATEMENT_CACHE_SIZE = 256
+# 新岗位的默认状态
+DEFAULT_STATUS = '待申请'
+# 变更日志的保留天数，更早的变更由 prune_changes 清理
+CHANGE_RETENTION_DAYS = 30
+
+
+class Job(NamedTuple):
+    """岗位表的一行，可按列名属性或位置访问"""
+    id: int
+    company_name: str
+    job_title: str
+    salary: Optional[str] = None
+    requirements: Optional[str] = None
+    location: Optional[str] = None
+    posted_date: Optional[str] = None
+    description: Optional[str] = None
+    contact_person: Optional[str] = None
+    contact_phone: Optional[str] = None
+    email: Optional[str] = None
+    status: Optional[str] = DEFAULT_STATUS
+    application_date: Optional[str] = None
+    notes: Optional[str] = None
+    updated_at: Optional[str] = None
+    version: int = 1
+
+
+class JobChange(NamedTuple):
+    """变更日志中的一条变更，同一岗位只保留最新的一条"""
+    seq: int
+    job_id: int
+    # 'insert'、'update' 或 'delete'
+    operation: str
+    # 岗位的当前内容，已删除时为None
+    job: Optional[Job]
+
+
+# 列定义，顺序与 Job 的字段一致
+COLUMN_DEFINITIONS = {
+    'id': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+    'company_name': 'TEXT NOT NULL',
+    'job_title': 'TEXT NOT NULL',
+    'salary': 'TEXT',
+    'requirements': 'TEXT',
+    'location': 'TEXT',
+    'posted_date': 'DATE DEFAULT CURRENT_DATE',
+    'description': 'TEXT',
+    'contact_person': 'TEXT',
+    'contact_phone': 'TEXT',
+    'email': 'TEXT',
+    'status': f"TEXT DEFAULT '{DEFAULT_STATUS}'",
+    'application_date': 'DATE',
+    'notes': 'TEXT',
+    'updated_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+    # 乐观并发控制的版本号，每次修改加一
+    'version': 'INTEGER NOT NULL DEFAULT 1'
+}
+COLUMNS = tuple(Job._fields)
+
+# 可由调用方写入的字段（id 由数据库分配，updated_at 和 version 在写入时自动更新）
+JOB_FIELDS = [name for name in COLUMNS if name not in ('id', 'updated_at', 'version')]
+
+# 各字段的中文名称，顺序即CSV默认导出顺序
+COLUMN_LABELS = {
+    'id': 'ID',
+    'company_name': '企业名称',
+    'job_title': '岗位名称',
+    'salary': '薪资',
+    'location': '工作地点',
+    'posted_date': '发布日期',
+    'application_date': '投递日期',
+    'status': '状态',
+    'requirements': '具体要求',
+    'description': '岗位描述',
+    'contact_person': '联系人',
+    'contact_phone': '联系电话',
+    'email': '电子邮箱',
+    'notes': '备注',
+    'updated_at': '更新时间',
+    'version': '版本'
+}
+
+# 插入时未提供值（None）则使用的默认值，与表定义一致
+INSERT_DEFAULTS = {'posted_date': 'CURRENT_DATE', 'status': f"'{DEFAULT_STATUS}'"}
+_INSERT_VALUES = ', '.join(f"COALESCE(?, {INSERT_DEFAULTS[field]})" if field in INSERT_DEFAULTS else '?'
+                           for field in JOB_FIELDS)
+
+
+class VersionConflict(Exception):
+    """条件更新时岗位的版本号与预期不一致（已被其他人修改）"""
+
+    def __init__(self, job_id, current_version):
+        super().__init__(f"岗位 {job_id} 已被修改，当前版本为 {current_version}")
+        self.job_id = job_id
+        self.current_version = current_version
+
+
+def connect(db_file=DB_FILE):
+    """
+    打开数据库连接
+
+    关闭 sqlite3 的隐式事务（由 JobRepository 显式控制），
+    查询结果为 sqlite3.Row，可按列名访问
+    """
+    conn = sqlite3.connect(db_file, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class JobRepository:
+    """
+    岗位表的数据访问层
+
+    SQL 语句均为固定文本，重复执行时直接命中 sqlite3 连接的预编译语句缓存，
+    不会每次重新解析；写操作在显式事务中执行，批量操作共用一个事务
+    """
+
+    SQL_CREATE_TABLE = "CREATE TABLE IF NOT EXISTS jobs (\n    {}\n)".format(
+        ',\n    '.join(f"{name} {definition}" for name, definition in COLUMN_DEFINITIONS.items())
+    )
+    # 列表按发布日期倒序展示，索引避免每次排序全表
+    SQL_CREATE_INDEXES = [
+        "CREATE INDEX IF NOT EXISTS idx_jobs_posted_date ON jobs (posted_date, id)",
+        # 查询变更时按岗位找最新一条
+        "CREATE INDEX IF NOT EXISTS idx_job_changes_job ON job_changes (job_id, seq)"
+    ]
+    SQL_INSERT = f"INSERT INTO jobs (id, {', '.join(JOB_FIELDS)}) VALUES (?, {_INSERT_VALUES})"
+    # 导入时ID已存在则原地更新（不能用 INSERT OR REPLACE：它会删除后重新插入，版本号被重置为1）
+    SQL_UPSERT = (
+        f"INSERT INTO jobs (id, {', '.join(JOB_FIELDS)}) VALUES (?, {_INSERT_VALUES}) "
+        f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{field} = excluded.{field}' for field in JOB_FIELDS)}, "
+        "updated_at = CURRENT_TIMESTAMP, version = version + 1"
+    )
+    SQL_GET = f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?"
+    SQL_DELETE = "DELETE FROM jobs WHERE id = ?"
+    SQL_EXISTS = "SELECT 1 FROM jobs WHERE id = ?"
+    SQL_VERSION = "SELECT version FROM jobs WHERE id = ?"
+    SQL_COUNT = "SELECT COUNT(*) FROM jobs"
+    # 变更日志：seq 单调递增且不复用（AUTOINCREMENT），清理旧变更后也不会回退
+    SQL_CREATE_CHANGES = """CREATE TABLE IF NOT EXISTS job_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    operation TEXT NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
+    SQL_LOG_CHANGE = "INSERT INTO job_changes (job_id, operation) VALUES (?, ?)"
+    SQL_LATEST_SEQ = "SELECT seq FROM sqlite_sequence WHERE name = 'job_changes'"
+    SQL_OLDEST_SEQ = "SELECT MIN(seq) FROM job_changes"
+    # 每个岗位只取序号之后的最新一条变更，连同岗位当前内容一起返回
+    SQL_CHANGES_SINCE = f"""
+    SELECT c.seq, c.job_id, c.operation, {', '.join('j.' + name for name in COLUMNS)}
+    FROM job_changes c LEFT JOIN jobs j ON j.id = c.job_id
+    WHERE c.seq > ? AND c.seq = (SELECT MAX(seq) FROM job_changes WHERE job_id = c.job_id)
+    ORDER BY c.seq LIMIT ?
+    """
+    SQL_PRUNE_CHANGES = "DELETE FROM job_changes WHERE changed_at < datetime('now', ?)"
+    # 已执行的离线修改（由客户端生成的ID标识），客户端重发同一修改时不会重复执行
+    SQL_CREATE_SYNC_MUTATIONS = """CREATE TABLE IF NOT EXISTS job_sync_mutations (
+    mutation_id TEXT PRIMARY KEY,
+    job_id INTEGER,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
+    SQL_GET_MUTATION = "SELECT job_id FROM job_sync_mutations WHERE mutation_id = ?"
+    SQL_RECORD_MUTATION = "INSERT INTO job_sync_mutations (mutation_id, job_id) VALUES (?, ?)"
+    SQL_PRUNE_MUTATIONS = "DELETE FROM job_sync_mutations WHERE applied_at < datetime('now', ?)"
+    # 按ID倒序分页（最新添加的在前），用上一页最后的ID定位，翻页开销与页码无关
+    SQL_PAGE_FIRST = f"SELECT {', '.join(COLUMNS)} FROM jobs ORDER BY id DESC LIMIT ?"
+    SQL_PAGE_AFTER = f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id < ? ORDER BY id DESC LIMIT ?"
+
+    def __init__(self, conn):
+        """
+        Args:
+            conn: 由 connect() 打开的连接，事务由本类显式控制
+        """
+        self.conn = conn
+        self._transaction_depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """显式事务，可以嵌套（只有最外层提交或回滚），出现异常时回滚"""
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        # 立即获取写锁，避免多个连接同时由读升级为写时死锁
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._transaction_depth = 1
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        else:
+            try:
+                self.conn.execute("COMMIT")
+            except BaseException:
+                # 提交失败（如 SQLITE_BUSY）时事务仍然打开，先回滚，否则连接无法再开始新事务
+                try:
+                    self.conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+                raise
+        finally:
+            self._transaction_depth = 0
+
+    def create_schema(self):
+        """创建岗位表、变更日志表和索引，并为旧版本创建的表补齐缺少的列"""
+        with self.transaction():
+            self.conn.execute(self.SQL_CREATE_TABLE)
+            self.conn.execute(self.SQL_CREATE_CHANGES)
+            self.conn.execute(self.SQL_CREATE_SYNC_MUTATIONS)
+            existing = {row['name'] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in COLUMN_DEFINITIONS.items():
+                if name in existing:
+                    continue
+                column_type, _, default = definition.partition(' DEFAULT ')
+                if default.startswith('CURRENT_'):
+                    # ALTER TABLE 不支持非常量默认值，补齐列后用当前时间填充已有的行
+                    self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+                    self.conn.execute(f"UPDATE jobs SET {name} = {default}")
+                else:
+                    self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+            for sql in self.SQL_CREATE_INDEXES:
+                self.conn.execute(sql)
+
+    @staticmethod
+    def _to_job(row):
+        return Job._make(row) if row is not None else None
+
+    def _log_change(self, job_id, operation):
+        """在当前事务中追加一条变更日志"""
+        self.conn.execute(self.SQL_LOG_CHANGE, (job_id, operation))
+
+    def insert(self, record, keep_id=False):
+        """
+        添加一条岗位，返回新岗位ID
+
+        Args:
+            record: 字段名到值的字典，未提供的字段使用默认值
+            keep_id: 为True时使用记录自带的ID，ID已存在时覆盖原记录
+        """
+        job_id = record.get('id') if keep_id else None
+        params = [job_id] + [record.get(field) for field in JOB_FIELDS]
+        with self.transaction():
+            if job_id is not None and self.exists(job_id):
+                # 覆盖已有岗位按修改处理：版本号加一，变更日志记为 update
+                self.conn.execute(self.SQL_UPSERT, params)
+                self._log_change(job_id, 'update')
+                return job_id
+            job_id = self.conn.execute(self.SQL_INSERT, params).lastrowid
+            self._log_change(job_id, 'insert')
+            return job_id
+
+    def insert_many(self, records, keep_ids=False):
+        """在一个事务中批量添加岗位，返回新岗位的ID列表"""
+        with self.transaction():
+            return [self.insert(record, keep_ids) for record in records]
+
+    def get(self, job_id):
+        """按ID查询岗位，不存在时返回None"""
+        return self._to_job(self.conn.execute(self.SQL_GET, (job_id,)).fetchone())
+
+    def get_many(self, job_ids, chunk_size=500):
+        """
+        按ID批量查询岗位，每次用一条 IN 查询取一批
+
+        Returns:
+            dict: 岗位ID -> Job，不存在的ID不在结果中
+        """
+        job_ids = list(dict.fromkeys(job_ids))
+        result = {}
+        for start in range(0, len(job_ids), chunk_size):
+            chunk = job_ids[start:start + chunk_size]
+            query = f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id IN ({', '.join('?' * len(chunk))})"
+            for row in self.conn.execute(query, chunk):
+                result[row['id']] = self._to_job(row)
+        return result
+
+    def exists(self, job_id):
+        """岗位是否存在"""
+        return self.conn.execute(self.SQL_EXISTS, (job_id,)).fetchone() is not None
+
+    def update(self, job_id, changes, expected_version=None):
+        """
+        修改岗位的部分字段，同时刷新更新时间并把版本号加一
+        
+        版本检查与写入在同一条 UPDATE 语句中完成（WHERE id = ? AND version = ?），
+        不需要先查询岗位是否存在，也不会覆盖他人在此期间的修改
+
+        Args:
+            job_id: 岗位ID
+            changes: 字段名到新值的字典，只写入其中属于 JOB_FIELDS 的字段
+            expected_version: 预期的当前版本号，为None时不检查
+
+        Returns:
+            int: 更新后的版本号；岗位不存在时返回None
+
+        Raises:
+            VersionConflict: 岗位存在但版本号与预期不一致
+        """
+        fields = [field for field in JOB_FIELDS if field in changes]
+        # 字段按固定顺序拼接，同一组字段总是得到相同的SQL文本，可以命中语句缓存
+        assignments = [f'{field} = ?' for field in fields]
+        assignments += ['updated_at = CURRENT_TIMESTAMP', 'version = version + 1']
+        update_sql = f"UPDATE jobs SET {', '.join(assignments)} WHERE id = ?"
+        params = [changes[field] for field in fields] + [job_id]
+        if expected_version is not None:
+            update_sql += " AND version = ?"
+            params.append(expected_version)
+        
+        with self.transaction():
+            if self.conn.execute(update_sql, params).rowcount == 1:
+                self._log_change(job_id, 'update')
+                if expected_version is not None:
+                    return expected_version + 1
+                return self.conn.execute(self.SQL_VERSION, (job_id,)).fetchone()[0]
+            
+            # 没有更新任何行：区分岗位不存在和版本冲突
+            row = self.conn.execute(self.SQL_VERSION, (job_id,)).fetchone()
+            if row is None:
+                return None
+            raise VersionConflict(job_id, row[0])
+    
+    def update_many(self, records):
+        """
+        在一个事务中批量修改岗位，每条记录需包含 id（可带 version 做冲突检查），
+        任一岗位不存在或版本冲突时全部回滚
+
+        Returns:
+            int: 修改的岗位条数
+
+        Raises:
+            KeyError: 岗位不存在，参数为其ID
+            VersionConflict: 岗位版本号与记录中的 version 不一致
+        """
+        count = 0
+        with self.transaction():
+            for record in records:
+                if not self.update(record.get('id'), record, record.get('version')):
+                    raise KeyError(record.get('id'))
+                count += 1
+        return count
+
+    def delete(self, job_id, expected_version=None):
+        """
+        删除岗位，岗位存在并已删除时返回True
+
+        Raises:
+            VersionConflict: 指定了 expected_version 且与岗位当前版本号不一致
+        """
+        with self.transaction():
+            if expected_version is None:
+                deleted = self.conn.execute(self.SQL_DELETE, (job_id,)).rowcount == 1
+            else:
+                deleted = self.conn.execute(self.SQL_DELETE + " AND version = ?",
+                                            (job_id, expected_version)).rowcount == 1
+            if deleted:
+                self._log_change(job_id, 'delete')
+                return True
+            if expected_version is None:
+                return False
+            row = self.conn.execute(self.SQL_VERSION, (job_id,)).fetchone()
+            if row is None:
+                return False
+            raise VersionConflict(job_id, row[0])
+
+    def delete_many(self, job_ids):
+        """
+        在一个事务中批量删除岗位，任一岗位不存在时全部回滚
+
+        Returns:
+            int: 删除的岗位条数
+
+        Raises:
+            KeyError: 有岗位不存在，参数为不存在的ID列表
+        """
+        job_ids = list(dict.fromkeys(job_ids))
+        with self.transaction():
+            missing = [job_id for job_id in job_ids if not self.delete(job_id)]
+            if missing:
+                raise KeyError(missing)
+        return len(job_ids)
+
+    def count(self):
+        """岗位总数"""
+        return self.conn.execute(self.SQL_COUNT).fetchone()[0]
+
+    def page(self, before_id=None, limit=20):
+        """
+        返回一页岗位，按ID倒序
+
+        Args:
+            before_id: 上一页最后一条的ID，为None时返回第一页
+            limit: 每页条数
+        """
+        if before_id is None:
+            rows = self.conn.execute(self.SQL_PAGE_FIRST, (limit,))
+        else:
+            rows = self.conn.execute(self.SQL_PAGE_AFTER, (before_id, limit))
+        return [self._to_job(row) for row in rows]
+
+    @staticmethod
+    def _filter_clause(filter_criteria):
+        """根据筛选条件构建WHERE子句，返回 (SQL片段, 参数列表)"""
+        conditions = []
+        params = []
+
+        for field in ('company_name', 'job_title', 'location'):
+            if filter_criteria and filter_criteria.get(field):
+                conditions.append(f"{field} LIKE ?")
+                params.append(f"%{filter_criteria[field]}%")
+
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
+
+    def search(self, filter_criteria=None, newest_first=True, limit=None):
+        """
+        按条件模糊查询岗位，逐行返回 Job
+
+        Args:
+            filter_criteria: 企业名称/岗位名称/工作地点的筛选条件
+            newest_first: 为True时按发布日期倒序，否则按ID升序
+            limit: 最多返回的条数
+        """
+        where_sql, params = self._filter_clause(filter_criteria)
+        order_sql = "posted_date DESC, id DESC" if newest_first else "id"
+        query = f"SELECT {', '.join(COLUMNS)} FROM jobs{where_sql} ORDER BY {order_sql}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(query, params):
+            yield self._to_job(row)
+
+    def select_columns(self, names):
+        """
+        按ID顺序逐行返回指定的列（sqlite3.Row），用于导出
+
+        Args:
+            names: 列名，需在 COLUMNS 中
+        """
+        unknown = [name for name in names if name not in COLUMNS]
+        if unknown:
+            raise ValueError(f"未知的字段: {', '.join(unknown)}")
+        # 列名均来自白名单，可以安全地拼接到SQL中
+        return self.conn.execute(f"SELECT {', '.join(names)} FROM jobs ORDER BY id")
+
+    def grouped_counts(self, expression, limit=None):
+        """按表达式分组计数，返回 {分组: 条数}，按条数降序"""
+        query = f"""
+        SELECT COALESCE({expression}, '') AS name, COUNT(*) FROM jobs
+        GROUP BY name ORDER BY COUNT(*) DESC, name
+        """
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return dict(self.conn.execute(query).fetchall())
+
+    def latest_seq(self):
+        """最新一条变更的序号，还没有任何变更时为0"""
+        row = self.conn.execute(self.SQL_LATEST_SEQ).fetchone()
+        return row[0] if row else 0
+
+    def oldest_since(self):
+        """changes_since 可接受的最小序号，更早的变更已被清理"""
+        oldest = self.conn.execute(self.SQL_OLDEST_SEQ).fetchone()[0]
+        return (oldest or self.latest_seq() + 1) - 1
+
+    def changes_since(self, since, limit=500):
+        """
+        返回序号 since 之后的变更，按序号升序
+
+        同一岗位的多次变更合并为最新的一条，客户端按 岗位ID 覆盖或删除本地副本即可；
+        在 since 之后才新增的岗位，合并后也可能是 'update'，客户端应按插入处理
+
+        Args:
+            since: 客户端已同步到的序号
+            limit: 最多返回的条数，返回条数等于 limit 时应以最后一条的序号继续查询
+
+        Returns:
+            list: JobChange 列表
+
+        Raises:
+            LookupError: since 之后的部分变更已被清理，客户端需重新加载全部岗位
+        """
+        if since < self.oldest_since():
+            raise LookupError(since)
+
+        changes = []
+        for row in self.conn.execute(self.SQL_CHANGES_SINCE, (since, limit)):
+            job = Job._make(row[3:]) if row['id'] is not None else None
+            operation = row['operation'] if job is not None else 'delete'
+            changes.append(JobChange(row['seq'], row['job_id'], operation, job))
+        return changes
+
+    def prune_changes(self, days=CHANGE_RETENTION_DAYS):
+        """清理早于指定天数的变更日志和离线修改记录，返回清理的变更条数"""
+        age = f'-{int(days)} days'
+        with self.transaction():
+            self.conn.execute(self.SQL_PRUNE_MUTATIONS, (age,))
+            return self.conn.execute(self.SQL_PRUNE_CHANGES, (age,)).rowcount
+
+    def applied_mutation(self, mutation_id):
+        """
+        查询离线修改是否已经执行过
+
+        Returns:
+            tuple: (岗位ID,)；未执行过时返回None
+        """
+        row = self.conn.execute(self.SQL_GET_MUTATION, (mutation_id,)).fetchone()
+        return tuple(row) if row is not None else None
+
+    def record_mutation(self, mutation_id, job_id):
+        """记录已执行的离线修改，应与修改本身在同一事务中调用"""
+        with self.transaction():
+            self.conn.execute(self.SQL_RECORD_MUTATION, (mutation_id, job_id))
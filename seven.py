@@ -6,43 +6,352 @@ IT岗位求职记录系统
 功能：记录和管理适合自己的IT岗位求职信息
 """
 
+import argparse
 import json
 import os
+import sys
 import datetime
 import time
 from tabulate import tabulate
+from job_search_index import JobSearchIndex, file_fingerprint
+from job_record import JobRecord
+from job_statistics import JobStatistics, PIPELINE
+from csv_export import write_csv
+from job_snapshot import (
+    LazyRecordMap, SnapshotReader, encode_record, is_snapshot, write_snapshot
+)
+from job_file_sync import FileLock, atomic_write_json, read_generation
+from job_batch import (
+    dump_json, dump_json_array, parse_fields, quiet_stdout, read_ids, read_records
+)
+
+# 求职状态选项
+STATUS_OPTIONS = ["已投递", "待面试", "面试中", "已通过", "已拒绝", "已放弃"]
+
+# CSV导出的列：(表头, 字段名)
+CSV_COLUMNS = [
+    ("ID", 'id'),
+    ("公司", 'company'),
+    ("岗位", 'position'),
+    ("薪资", 'salary'),
+    ("地点", 'location'),
+    ("投递日期", 'apply_date'),
+    ("状态", 'status'),
+    ("来源", lambda job: job.get('source') or ""),
+    ("更新时间", 'update_time')
+]
 
 class JobApplicationSystem:
     def __init__(self, data_file='job_applications.json'):
         """初始化系统"""
         self.data_file = data_file
-        self.jobs = []
+        # ID -> 记录 的索引，按插入顺序保存，查找/更新/删除均为 O(1)
+        self._jobs_by_id = {}
+        # 单调递增的ID分配器，随数据一起持久化，删除记录后ID不会被复用
+        self.next_id = 1
+        # 公司/岗位/地点/状态的倒排索引，与数据文件一起持久化，首次搜索时才加载或建立
+        self.index_file = data_file + '.idx'
+        self.search_index = JobSearchIndex()
+        self._search_index_ready = False
+        # 增量维护的统计信息，与数据文件一起持久化，首次查看统计时才加载或建立
+        self.stats_file = data_file + '.stats'
+        self.statistics = JobStatistics()
+        self._statistics_ready = False
+        # 加载后记录是否有过修改（有修改时不能再信任旧的索引/统计文件）
+        self._records_changed = False
+        # 数据文件是否使用二进制快照格式（.snap 后缀或文件头为快照魔数）
+        self.use_snapshot = data_file.endswith('.snap')
+        # 多进程共享数据文件：读写文件时分别加共享/排他锁，并记下已知的文件代数用于变更检测
+        self._file_lock = FileLock(data_file + '.lock')
+        self.generation = 0
+        self._disk_fingerprint = None
+        # 本进程尚未写入文件的修改：新增或更新的记录ID、其中新分配的ID、已删除的记录ID
+        self._dirty_ids = set()
+        self._new_ids = set()
+        self._deleted_ids = set()
         self.load_data()
     
+    @property
+    def jobs(self):
+        """按插入顺序返回全部求职记录（只读视图）"""
+        return self._jobs_by_id.values()
+    
     def load_data(self):
         """从文件加载求职记录数据"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.jobs = json.load(f)
-                print(f"成功加载 {len(self.jobs)} 条求职记录")
-            else:
-                print("未找到数据文件，将创建新的记录系统")
+            with self._file_lock.shared():
+                if os.path.exists(self.data_file) and is_snapshot(self.data_file):
+                    # 快照格式：内存映射打开，记录在首次访问时才解码
+                    self.use_snapshot = True
+                    reader = SnapshotReader(self.data_file)
+                    self._search_index_ready = False
+                    self._statistics_ready = False
+                    self._records_changed = False
+                    self._jobs_by_id = LazyRecordMap(reader)
+                    self.next_id = reader.next_id
+                    self.generation = reader.generation
+                    print(f"成功加载 {len(self._jobs_by_id)} 条求职记录")
+                elif os.path.exists(self.data_file):
+                    jobs, next_id, self.generation = self._read_json()
+                    self._rebuild_index([JobRecord.from_dict(job) for job in jobs], next_id)
+                    print(f"成功加载 {len(self._jobs_by_id)} 条求职记录")
+                else:
+                    print("未找到数据文件，将创建新的记录系统")
+                self._disk_fingerprint = file_fingerprint(self.data_file)
         except Exception as e:
             print(f"加载数据失败: {e}")
-            self.jobs = []
+            self._rebuild_index([], 1)
+    
+    def _read_json(self):
+        """读取JSON数据文件，返回 (记录列表, 下一个ID, 代数)"""
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        # 兼容旧格式：文件内容直接是记录列表
+        if isinstance(data, list):
+            return data, 1, 0
+        return data.get('jobs', []), data.get('next_id', 1), data.get('generation', 0)
+    
+    def _rebuild_index(self, jobs, next_id=1):
+        """根据记录列表重建ID索引，并校正ID分配器"""
+        self._jobs_by_id = {}
+        self.next_id = next_id
+        self._search_index_ready = False
+        self._statistics_ready = False
+        self._records_changed = False
+        
+        for job in jobs:
+            if job.get('id') in self._jobs_by_id:
+                # 重复的ID重新分配，避免覆盖已有记录
+                job['id'] = None
+            if isinstance(job.get('id'), int):
+                self._jobs_by_id[job['id']] = job
+                self.next_id = max(self.next_id, job['id'] + 1)
+        
+        for job in jobs:
+            if not isinstance(job.get('id'), int):
+                job['id'] = self._allocate_id()
+                self._jobs_by_id[job['id']] = job
+                self._records_changed = True
+    
+    def _ensure_search_index(self):
+        """返回可用的倒排索引：优先加载未过期的索引文件，否则根据当前记录重建"""
+        if not self._search_index_ready:
+            # 加载后有过未入索引的修改时，索引文件已不可信，直接重建
+            if self._records_changed or \
+                    not self.search_index.load(self.index_file, file_fingerprint(self.data_file)):
+                self.search_index.build(self.jobs)
+                # 只读的会话（如批处理 search）不会调用 save_data，重建后立即保存，下次启动直接加载
+                self._save_derived(self.search_index.save, self.index_file)
+            self._search_index_ready = True
+        return self.search_index
+    
+    def _ensure_statistics(self):
+        """返回可用的统计：优先加载未过期的统计文件，否则根据当前记录重建"""
+        if not self._statistics_ready:
+            # 即使统计文件已过期，load 也会恢复无法从记录推算的阶段历史
+            loaded = self.statistics.load(self.stats_file, file_fingerprint(self.data_file))
+            if self._records_changed or not loaded:
+                self.statistics.build(self.jobs)
+                # 与索引相同，只读的会话（如批处理 stats）重建后立即保存
+                self._save_derived(self.statistics.save, self.stats_file)
+            self._statistics_ready = True
+        return self.statistics
+    
+    def _save_derived(self, save, path):
+        """
+        把根据当前记录重建的索引或统计保存到文件
+
+        只有内存中的记录与数据文件一致时才保存（以加载时的文件指纹为准）；
+        在共享锁内确认数据文件未被修改，此时其他进程无法写入数据文件
+        """
+        if self._records_changed or self._disk_fingerprint is None:
+            return
+        try:
+            with self._file_lock.shared():
+                if file_fingerprint(self.data_file) == self._disk_fingerprint:
+                    save(path, self._disk_fingerprint)
+        except OSError as e:
+            print(f"保存 {path} 失败: {e}")
+    
+    def _track_add(self, job, new=False):
+        """记录新增或更新后记为待保存，并计入索引和统计"""
+        self._dirty_ids.add(job['id'])
+        if new:
+            self._new_ids.add(job['id'])
+        self._derive_add(job)
+    
+    def _track_remove(self, job, deleted=False):
+        """记录删除或更新前从索引和统计中移出，删除时记为待保存"""
+        if deleted:
+            job_id = job['id']
+            self._dirty_ids.discard(job_id)
+            if job_id in self._new_ids:
+                # 尚未写入文件的新记录，文件中不存在，无需记录删除
+                self._new_ids.discard(job_id)
+            else:
+                self._deleted_ids.add(job_id)
+        self._derive_remove(job, deleted)
+    
+    def _derive_add(self, job):
+        """把记录计入索引和统计（尚未建立时跳过，建立时会包含该记录）"""
+        self._records_changed = True
+        if self._search_index_ready:
+            self.search_index.add(job)
+        if self._statistics_ready:
+            self.statistics.add(job)
+    
+    def _derive_remove(self, job, deleted=False):
+        """把记录从索引和统计中移出"""
+        self._records_changed = True
+        if self._search_index_ready:
+            self.search_index.remove(job)
+        if self._statistics_ready:
+            self.statistics.remove(job, deleted)
+    
+    def _allocate_id(self):
+        """分配一个新的记录ID"""
+        job_id = self.next_id
+        self.next_id += 1
+        return job_id
     
     def save_data(self):
-        """保存求职记录数据到文件"""
+        """保存求职记录数据到文件，文件已被其他进程修改时先合并再写入"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.jobs, f, ensure_ascii=False, indent=2)
+            with self._file_lock.exclusive():
+                if self._disk_changed():
+                    self._merge_from_disk()
+                
+                generation = self.generation + 1
+                if self.use_snapshot:
+                    self._save_snapshot(generation)
+                else:
+                    self._save_json(generation)
+                self.generation = generation
+                self._disk_fingerprint = file_fingerprint(self.data_file)
+                self._dirty_ids.clear()
+                self._new_ids.clear()
+                self._deleted_ids.clear()
+                
+                if self._search_index_ready:
+                    self.search_index.save(self.index_file, self._disk_fingerprint)
+                if self._statistics_ready:
+                    self.statistics.save(self.stats_file, self._disk_fingerprint)
             print("数据保存成功")
             return True
         except Exception as e:
             print(f"保存数据失败: {e}")
             return False
     
+    def _save_json(self, generation):
+        """以JSON格式保存数据（代数放在最前面，便于只读文件开头做变更检测）"""
+        data = {
+            'generation': generation,
+            'next_id': self.next_id,
+            'jobs': [job.to_dict() for job in self._jobs_by_id.values()]
+        }
+        atomic_write_json(self.data_file, data)
+    
+    def _save_snapshot(self, generation):
+        """以二进制快照格式保存数据，未修改过的记录直接复制原始字节"""
+        if isinstance(self._jobs_by_id, LazyRecordMap):
+            items = self._jobs_by_id.raw_items()
+        else:
+            items = ((job_id, encode_record(job)) for job_id, job in self._jobs_by_id.items())
+        
+        tmp_file = write_snapshot(self.data_file, items, len(self._jobs_by_id), self.next_id, generation)
+        if isinstance(self._jobs_by_id, LazyRecordMap):
+            # 先关闭旧快照的内存映射再替换文件（Windows下映射中的文件不能被替换），然后切换到新快照
+            self._jobs_by_id.close()
+            try:
+                os.replace(tmp_file, self.data_file)
+            finally:
+                self._jobs_by_id.rebind(SnapshotReader(self.data_file, verify=False))
+        else:
+            os.replace(tmp_file, self.data_file)
+    
+    def _disk_changed(self):
+        """数据文件是否已被其他进程修改（只读取文件开头的代数，旧格式文件比较修改时间和大小）"""
+        if not os.path.exists(self.data_file):
+            return False
+        generation = read_generation(self.data_file)
+        if generation is None:
+            return file_fingerprint(self.data_file) != self._disk_fingerprint
+        return generation != self.generation
+    
+    def _merge_from_disk(self):
+        """把数据文件中其他进程写入的修改增量合并到内存，本进程尚未保存的修改优先"""
+        # 先取出本进程尚未保存的记录，合并完文件内容后再放回
+        local = []
+        for job_id in self._dirty_ids:
+            job = self._jobs_by_id.pop(job_id)
+            self._derive_remove(job, deleted=job_id in self._new_ids)
+            local.append(job)
+        
+        if is_snapshot(self.data_file):
+            # 快照按需解码，无法逐条比较，直接切换到新快照，索引和统计在下次使用时重建
+            reader = SnapshotReader(self.data_file)
+            if isinstance(self._jobs_by_id, LazyRecordMap):
+                self._jobs_by_id.close()
+            self._jobs_by_id = LazyRecordMap(reader)
+            self._search_index_ready = False
+            self._statistics_ready = False
+            self._records_changed = True
+            disk_next_id, self.generation = reader.next_id, reader.generation
+        else:
+            jobs, disk_next_id, self.generation = self._read_json()
+            disk_ids = set()
+            for data in jobs:
+                job = JobRecord.from_dict(data)
+                disk_ids.add(job['id'])
+                current = self._jobs_by_id.get(job['id'])
+                if current is not None and current == job:
+                    continue
+                if current is not None:
+                    self._derive_remove(current)
+                self._jobs_by_id[job['id']] = job
+                self._derive_add(job)
+            for job_id in [job_id for job_id in self._jobs_by_id if job_id not in disk_ids]:
+                self._derive_remove(self._jobs_by_id.pop(job_id), deleted=True)
+            disk_next_id = max(disk_next_id, max(disk_ids, default=0) + 1)
+        
+        self._disk_fingerprint = file_fingerprint(self.data_file)
+        self.next_id = max(self.next_id, disk_next_id)
+        
+        # 重新应用本进程的删除和修改
+        for job_id in self._deleted_ids:
+            job = self._jobs_by_id.pop(job_id, None)
+            if job is not None:
+                self._derive_remove(job, deleted=True)
+        for job in local:
+            job_id = job['id']
+            if job_id in self._jobs_by_id:
+                if job_id in self._new_ids:
+                    # 其他进程已用同一ID保存了另一条记录，为本进程的新记录重新分配ID
+                    self._dirty_ids.discard(job_id)
+                    self._new_ids.discard(job_id)
+                    job['id'] = self._allocate_id()
+                    self._dirty_ids.add(job['id'])
+                    self._new_ids.add(job['id'])
+                    print(f"记录ID {job_id} 已被其他进程使用，新记录的ID改为 {job['id']}")
+                else:
+                    self._derive_remove(self._jobs_by_id[job_id])
+            self._jobs_by_id[job['id']] = job
+            self._derive_add(job)
+    
+    def refresh(self):
+        """检测其他进程对数据文件的修改，有修改时增量重新加载"""
+        try:
+            if not self._disk_changed():
+                return False
+            with self._file_lock.shared():
+                self._merge_from_disk()
+            print("检测到数据文件已被其他进程修改，已重新加载")
+            return True
+        except Exception as e:
+            print(f"重新加载数据失败: {e}")
+            return False
+    
     def add_job(self):
         """添加新的求职记录"""
         print("\n=== 添加新的IT岗位求职记录 ===")
@@ -75,7 +384,7 @@ class JobApplicationSystem:
         source = input("招聘来源 (如: 拉勾网、BOSS直聘等): ").strip()
         
         # 状态选项
-        status_options = ["已投递", "待面试", "面试中", "已通过", "已拒绝", "已放弃"]
+        status_options = STATUS_OPTIONS
         print(f"\n请选择当前状态: {', '.join([f'{i+1}.{opt}' for i, opt in enumerate(status_options)])}")
         
         while True:
@@ -92,26 +401,27 @@ class JobApplicationSystem:
         notes = input("备注信息: ").strip()
         
         # 创建新记录
-        job_id = len(self.jobs) + 1
-        new_job = {
-            'id': job_id,
-            'company': company,
-            'position': position,
-            'salary': salary,
-            'location': location,
-            'apply_date': apply_date,
-            'description': description,
-            'requirements': requirements,
-            'contact': contact,
-            'phone': phone,
-            'email': email,
-            'source': source,
-            'status': status,
-            'notes': notes,
-            'update_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        job_id = self._allocate_id()
+        new_job = JobRecord(
+            id=job_id,
+            company=company,
+            position=position,
+            salary=salary,
+            location=location,
+            apply_date=apply_date,
+            description=description,
+            requirements=requirements,
+            contact=contact,
+            phone=phone,
+            email=email,
+            source=source,
+            status=status,
+            notes=notes,
+            update_time=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
         
-        self.jobs.append(new_job)
+        self._jobs_by_id[job_id] = new_job
+        self._track_add(new_job, new=True)
         print("\n=== 记录添加成功 ===")
         print(f"记录ID: {job_id}")
         self.save_data()
@@ -188,7 +498,7 @@ class JobApplicationSystem:
         position = input("岗位名称: ").strip().lower()
         location = input("工作地点: ").strip().lower()
         
-        status_options = ["", "已投递", "待面试", "面试中", "已通过", "已拒绝", "已放弃"]
+        status_options = [""] + STATUS_OPTIONS
         print(f"状态筛选: {', '.join([f'{i}.{opt}' for i, opt in enumerate(status_options)])}")
         
         try:
@@ -201,25 +511,19 @@ class JobApplicationSystem:
             status = ""
         
         # 执行搜索
-        results = []
-        for job in self.jobs:
-            match = True
-            
-            if company and company not in job['company'].lower():
-                match = False
-            if position and position not in job['position'].lower():
-                match = False
-            if location and location not in job['location'].lower():
-                match = False
-            if status and status != job['status']:
-                match = False
-            
-            if match:
-                results.append(job)
+        results = self.find_jobs(company, position, location, status)
         
         print(f"\n找到 {len(results)} 条匹配的记录")
         self.display_jobs(results)
     
+    def find_jobs(self, company='', position='', location='', status=''):
+        """通过倒排索引查找匹配的记录，文本条件为不区分大小写的子串匹配"""
+        job_ids = self._ensure_search_index().search(
+            self._jobs_by_id,
+            company=company, position=position, location=location, status=status
+        )
+        return [self._jobs_by_id[job_id] for job_id in job_ids]
+    
     def update_job(self):
         """更新求职记录"""
         if not self.jobs:
@@ -240,6 +544,9 @@ class JobApplicationSystem:
             print(f"\n=== 更新记录 (ID: {job_id}) ===")
             print("提示: 直接回车保留原有值")
             
+            # 先按旧值移出索引，更新后再重新加入
+            self._track_remove(job)
+            
             # 更新字段
             job['company'] = input(f"公司名称 [{job['company']}]: ").strip() or job['company']
             job['position'] = input(f"岗位名称 [{job['position']}]: ").strip() or job['position']
@@ -264,7 +571,7 @@ class JobApplicationSystem:
             job['source'] = input(f"招聘来源 [{job['source']}]: ").strip() or job['source']
             
             # 更新状态
-            status_options = ["已投递", "待面试", "面试中", "已通过", "已拒绝", "已放弃"]
+            status_options = STATUS_OPTIONS
             current_status_idx = status_options.index(job['status']) if job['status'] in status_options else 0
             print(f"状态: {', '.join([f'{i+1}.{opt}' for i, opt in enumerate(status_options)])}")
             
@@ -279,6 +586,7 @@ class JobApplicationSystem:
             
             job['notes'] = input(f"备注信息 [{job['notes']}]: ").strip() or job['notes']
             job['update_time'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._track_add(job)
             
             print("\n=== 记录更新成功 ===")
             self.save_data()
@@ -306,10 +614,8 @@ class JobApplicationSystem:
             # 确认删除
             confirm = input(f"确定要删除 {job['company']} - {job['position']} 的记录吗？(y/n): ").strip().lower()
             if confirm == 'y':
-                self.jobs.remove(job)
-                # 重新编号
-                for i, j in enumerate(self.jobs, 1):
-                    j['id'] = i
+                del self._jobs_by_id[job_id]
+                self._track_remove(job, deleted=True)
                 print("\n=== 记录删除成功 ===")
                 self.save_data()
             else:
@@ -320,84 +626,206 @@ class JobApplicationSystem:
     
     def _find_job_by_id(self, job_id):
         """根据ID查找求职记录"""
-        for job in self.jobs:
-            if job['id'] == job_id:
-                return job
-        return None
+        return self._jobs_by_id.get(job_id)
     
     def show_statistics(self):
-        """显示求职统计信息"""
+        """显示求职统计信息（基于增量维护的统计，与记录总数无关）"""
         if not self.jobs:
             print("没有求职记录，无法生成统计信息")
             return
         
+        stats = self._ensure_statistics()
+        if not stats.recent_complete:
+            stats.refill_recent(self.jobs)
+        
         print("\n=== 求职记录统计信息 ===")
-        print(f"总记录数: {len(self.jobs)}")
+        print(f"总记录数: {stats.total}")
         
         # 按状态统计
-        status_count = {}
-        for job in self.jobs:
-            status = job['status']
-            status_count[status] = status_count.get(status, 0) + 1
-        
         print("\n按状态统计:")
-        for status, count in sorted(status_count.items()):
-            percentage = (count / len(self.jobs)) * 100
+        for status, count in sorted(stats.status_counts.items()):
+            percentage = (count / stats.total) * 100
             print(f"{status}: {count} 条 ({percentage:.1f}%)")
         
         # 按地点统计
-        location_count = {}
-        for job in self.jobs:
-            location = job['location']
-            location_count[location] = location_count.get(location, 0) + 1
-        
         print("\n按地点统计 (前10):")
-        sorted_locations = sorted(location_count.items(), key=lambda x: x[1], reverse=True)[:10]
-        for location, count in sorted_locations:
+        for location, count in stats.location_counts.most_common(10):
             print(f"{location}: {count} 条")
         
-        # 按投递日期统计最近的投递
-        recent_jobs = sorted(self.jobs, key=lambda x: x['apply_date'], reverse=True)[:5]
-        if recent_jobs:
+        # 转化漏斗：按记录曾到达的最高阶段统计
+        print(f"\n转化漏斗 ({' → '.join(PIPELINE)}):")
+        for stage, count, rate in stats.funnel():
+            rate_text = f" (转化率 {rate * 100:.1f}%)" if rate is not None else ""
+            print(f"{stage}: {count} 条{rate_text}")
+        
+        # 各来源回复率
+        print("\n各来源回复率:")
+        for source, total, responses, rate in stats.source_response_rates():
+            print(f"{source}: 投递 {total} 条，回复 {responses} 条 ({rate * 100:.1f}%)")
+        
+        # 按周投递数量
+        weekly = stats.weekly_series()
+        if weekly:
+            print("\n最近12周投递数量:")
+            for week, count in weekly:
+                print(f"{week}: {count} 条")
+        
+        # 最近的投递
+        recent_ids = stats.recent_ids(5)
+        if recent_ids:
             print("\n最近的5条投递:")
-            for job in recent_jobs:
+            for job_id in recent_ids:
+                job = self._jobs_by_id[job_id]
                 print(f"{job['apply_date']}: {job['company']} - {job['position']}")
     
-    def export_to_csv(self):
-        """导出求职记录到CSV文件"""
+    def export_to_csv(self, csv_file=None, columns=None, bom=True):
+        """导出求职记录到CSV文件，逐行写入，内存占用与记录条数无关"""
         if not self.jobs:
             print("没有求职记录可导出")
             return
         
         try:
-            csv_file = f"job_applications_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
-                # 写入表头
-                headers = ["ID", "公司", "岗位", "薪资", "地点", "投递日期", "状态", "来源", "更新时间"]
-                f.write(",".join([f'"{h}"' for h in headers]) + "\n")
-                
-                # 写入数据
-                for job in self.jobs:
-                    row = [
-                        str(job['id']),
-                        job['company'],
-                        job['position'],
-                        job['salary'],
-                        job['location'],
-                        job['apply_date'],
-                        job['status'],
-                        job['source'] if job['source'] else "",
-                        job['update_time']
-                    ]
-                    f.write(",".join([f'"{cell.replace("\"", "\"\"")}"' for cell in row]) + "\n")
+            if csv_file is None:
+                csv_file = f"job_applications_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+                count = write_csv(self.jobs, f, columns or CSV_COLUMNS, bom=bom)
             
-            print(f"成功导出 {len(self.jobs)} 条记录到文件: {csv_file}")
+            print(f"成功导出 {count} 条记录到文件: {csv_file}")
         except Exception as e:
             print(f"导出失败: {e}")
     
+    @staticmethod
+    def _validate_fields(record):
+        """校验批量输入记录中的日期和状态，有错误时抛出 ValueError"""
+        apply_date = record.get('apply_date')
+        if apply_date:
+            try:
+                datetime.datetime.strptime(apply_date, '%Y-%m-%d')
+            except (TypeError, ValueError):
+                raise ValueError(f"日期格式错误，请使用 YYYY-MM-DD 格式: {apply_date}") from None
+        status = record.get('status')
+        if status and status not in STATUS_OPTIONS:
+            raise ValueError(f"无效的状态: {status}，可选: {', '.join(STATUS_OPTIONS)}")
+    
+    def _new_record(self, record, job_id, now):
+        """根据批量输入创建新记录，未提供的字段使用与交互添加相同的默认值"""
+        self._validate_fields(record)
+        if not record.get('company') or not record.get('position'):
+            raise ValueError("公司名称和岗位名称不能为空")
+        job = JobRecord.from_dict({field: '' for field in JobRecord.FIELDS})
+        for key, value in record.items():
+            job[key] = value
+        job['id'] = job_id
+        job['apply_date'] = record.get('apply_date') or now[:10]
+        job['status'] = record.get('status') or STATUS_OPTIONS[0]
+        job['update_time'] = now
+        return job
+    
+    def add_records(self, records, keep_ids=False):
+        """
+        批量添加记录，全部校验通过后才写入内存（调用方负责 save_data）
+        
+        Args:
+            records: 记录字典的可迭代对象
+            keep_ids: 为True时保留记录自带的ID（导入时使用），ID已被占用或未提供时重新分配
+        
+        Returns:
+            list: 新记录（保存时若ID已被其他进程占用会重新分配，应在保存后再读取ID）
+        """
+        now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        next_id = self.next_id
+        taken = set()
+        new_jobs = []
+        for index, record in enumerate(records, 1):
+            job_id = record.get('id') if keep_ids else None
+            if not isinstance(job_id, int) or job_id in self._jobs_by_id or job_id in taken:
+                # 预先分配ID，校验全部通过后才更新分配器
+                while next_id in self._jobs_by_id or next_id in taken:
+                    next_id += 1
+                job_id = next_id
+            taken.add(job_id)
+            try:
+                new_jobs.append(self._new_record(record, job_id, now))
+            except ValueError as e:
+                raise ValueError(f"第 {index} 条记录: {e}") from None
+        
+        for job in new_jobs:
+            self._jobs_by_id[job['id']] = job
+            self._track_add(job, new=True)
+        self.next_id = max([next_id] + [job_id + 1 for job_id in taken])
+        return new_jobs
+    
+    def update_records(self, records):
+        """
+        批量更新记录，每条记录需包含 id 及要修改的字段，全部校验通过后才修改
+        
+        Returns:
+            int: 更新的记录条数
+        """
+        now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        changes = []
+        for index, record in enumerate(records, 1):
+            job_id = record.get('id')
+            if job_id not in self._jobs_by_id:
+                raise ValueError(f"第 {index} 条记录: 未找到ID为 {job_id} 的记录")
+            try:
+                self._validate_fields(record)
+            except ValueError as e:
+                raise ValueError(f"第 {index} 条记录: {e}") from None
+            changes.append(record)
+        
+        for record in changes:
+            job = self._jobs_by_id[record['id']]
+            self._track_remove(job)
+            for key, value in record.items():
+                if key != 'id':
+                    job[key] = value
+            job['update_time'] = now
+            self._track_add(job)
+        return len(changes)
+    
+    def delete_records(self, job_ids):
+        """
+        批量删除记录，任一ID不存在时不删除任何记录
+        
+        Returns:
+            int: 删除的记录条数
+        """
+        job_ids = list(dict.fromkeys(job_ids))
+        missing = [job_id for job_id in job_ids if job_id not in self._jobs_by_id]
+        if missing:
+            raise ValueError(f"未找到ID为 {', '.join(map(str, missing))} 的记录")
+        
+        for job_id in job_ids:
+            job = self._jobs_by_id.pop(job_id)
+            self._track_remove(job, deleted=True)
+        return len(job_ids)
+    
+    def statistics_summary(self):
+        """以字典形式返回统计信息，内容与 show_statistics 相同"""
+        stats = self._ensure_statistics()
+        if not stats.recent_complete:
+            stats.refill_recent(self.jobs)
+        return {
+            'total': stats.total,
+            'status_counts': dict(sorted(stats.status_counts.items())),
+            'location_counts': dict(stats.location_counts.most_common(10)),
+            'funnel': [
+                {'stage': stage, 'count': count, 'rate': rate}
+                for stage, count, rate in stats.funnel()
+            ],
+            'source_response_rates': [
+                {'source': source, 'total': total, 'responses': responses, 'rate': rate}
+                for source, total, responses, rate in stats.source_response_rates()
+            ],
+            'weekly': dict(stats.weekly_series()),
+            'recent_ids': stats.recent_ids(5)
+        }
+    
     def run(self):
         """运行系统主界面"""
         while True:
+            self.refresh()
             self._clear_screen()
             print("=" * 50)
             print("        IT岗位求职记录系统        ")
@@ -458,8 +886,133 @@ def check_and_install_dependencies():
             print("您可以手动安装: pip install tabulate")
             print("或者继续使用，但表格显示功能将不可用")
 
+def build_parser():
+    """构建非交互的批处理命令行"""
+    parser = argparse.ArgumentParser(
+        description="IT岗位求职记录系统（批处理模式，结果以JSON输出；不带参数运行时进入交互菜单）"
+    )
+    parser.add_argument('--data-file', default='job_applications.json', help="数据文件 (默认: %(default)s)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    def add_search_options(sub):
+        sub.add_argument('--company', default='', help="公司名称（子串匹配）")
+        sub.add_argument('--position', default='', help="岗位名称（子串匹配）")
+        sub.add_argument('--location', default='', help="工作地点（子串匹配）")
+        sub.add_argument('--status', default='', choices=[''] + STATUS_OPTIONS, help="状态")
+    
+    sub = subparsers.add_parser('add', help="添加记录")
+    sub.add_argument('--file', help="从文件批量读取记录，'-' 表示标准输入")
+    sub.add_argument('-f', '--field', action='append', metavar='字段=值', help="单条记录的字段，可重复")
+    
+    sub = subparsers.add_parser('list', help="列出记录")
+    sub.add_argument('--limit', type=int, help="最多输出的条数")
+    
+    sub = subparsers.add_parser('search', help="搜索记录")
+    add_search_options(sub)
+    sub.add_argument('--limit', type=int, help="最多输出的条数")
+    
+    sub = subparsers.add_parser('update', help="更新记录（每条记录需包含 id）")
+    sub.add_argument('--file', help="从文件批量读取记录，'-' 表示标准输入")
+    sub.add_argument('--id', type=int, help="单条更新的记录ID")
+    sub.add_argument('-f', '--field', action='append', metavar='字段=值', help="要修改的字段，可重复")
+    
+    sub = subparsers.add_parser('delete', help="删除记录")
+    sub.add_argument('ids', nargs='*', type=int, help="记录ID")
+    sub.add_argument('--file', help="从文件读取ID（JSON数组或每行一个），'-' 表示标准输入")
+    
+    sub = subparsers.add_parser('import', help="导入记录，保留未被占用的原ID")
+    sub.add_argument('file', help="JSON 数组、JSON Lines 或数据文件，'-' 表示标准输入")
+    
+    sub = subparsers.add_parser('export', help="导出全部记录")
+    sub.add_argument('--format', choices=['json', 'csv'], default='json', help="导出格式 (默认: %(default)s)")
+    sub.add_argument('-o', '--output', help="输出文件，默认输出到标准输出")
+    
+    subparsers.add_parser('stats', help="统计信息")
+    return parser
+
+
+def _batch_records(args):
+    """取得 add/update 子命令的输入记录"""
+    if args.file:
+        return read_records(args.file)
+    record = parse_fields(args.field)
+    if getattr(args, 'id', None) is not None:
+        record['id'] = args.id
+    if not record:
+        raise ValueError("请通过 --file 或 -f 字段=值 提供记录")
+    return [record]
+
+
+def run_batch(argv):
+    """
+    执行批处理子命令，每个子命令的全部修改只保存一次
+    
+    Returns:
+        int: 退出码，0 表示成功
+    """
+    args = build_parser().parse_args(argv)
+    
+    with quiet_stdout() as out:
+        try:
+            system = JobApplicationSystem(args.data_file)
+            command = args.command
+            
+            if command in ('add', 'import'):
+                records = read_records(args.file) if command == 'import' else _batch_records(args)
+                new_jobs = system.add_records(records, keep_ids=command == 'import')
+                if new_jobs and not system.save_data():
+                    return 1
+                result = {'added': len(new_jobs), 'ids': [job['id'] for job in new_jobs]}
+            elif command == 'update':
+                count = system.update_records(_batch_records(args))
+                if count and not system.save_data():
+                    return 1
+                result = {'updated': count}
+            elif command == 'delete':
+                job_ids = list(args.ids) + (read_ids(args.file) if args.file else [])
+                count = system.delete_records(job_ids)
+                if count and not system.save_data():
+                    return 1
+                result = {'deleted': count}
+            elif command in ('list', 'search'):
+                if command == 'search':
+                    jobs = system.find_jobs(args.company.lower(), args.position.lower(),
+                                            args.location.lower(), args.status)
+                else:
+                    jobs = system.jobs
+                if args.limit is not None:
+                    jobs = list(jobs)[:args.limit]
+                dump_json_array((job.to_dict() for job in jobs), out)
+                return 0
+            elif command == 'export':
+                f = open(args.output, 'w', newline='', encoding='utf-8') if args.output else out
+                try:
+                    if args.format == 'csv':
+                        write_csv(system.jobs, f, CSV_COLUMNS, bom=bool(args.output))
+                    else:
+                        dump_json_array((job.to_dict() for job in system.jobs), f)
+                finally:
+                    if args.output:
+                        f.close()
+                if not args.output:
+                    return 0
+                result = {'exported': len(system.jobs), 'file': args.output}
+            else:
+                result = system.statistics_summary()
+        except (OSError, ValueError) as e:
+            print(f"错误: {e}")
+            return 1
+        
+        dump_json(result, out)
+    return 0
+
+
 def main():
     """主函数"""
+    if len(sys.argv) > 1:
+        # 带参数运行时进入批处理模式
+        sys.exit(run_batch(sys.argv[1:]))
+    
     print("正在初始化IT岗位求职记录系统...")
     
     # 检查依赖
@@ -472,4 +1025,4 @@ def main():
     system.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()